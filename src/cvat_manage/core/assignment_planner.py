@@ -0,0 +1,186 @@
+"""
+프레임 수 / 작업자 처리 속도 기반 Job 배분 계획
+
+- Job 가중치 = 프레임 수 (stop_frame - start_frame + 1), 마지막 segment 처럼 짧은 Job 도 정확히 반영
+- 작업자 처리 속도(frames/day)는 omission.py 가 남긴 일별 CSV(core/csv/cvat_job_report_*.csv)에서 추정
+  · 연속된 두 스냅샷 사이에 새로 완료된 Job 의 프레임 수를 담당자에게 귀속
+  · 작업자별 (완료 프레임 합 / 할당 Job 이 있던 날 수), 기록이 없는 작업자는 전체 중앙값 사용
+  · CSV 의 assignee 는 표시명이므로 .env USERMAP_<username>=<표시명> 을 역으로 매핑
+- 배분: LPT(큰 Job 부터, 예상 종료 시각이 가장 빠른 작업자에게) → 최대 부하 작업자에서 옮기기/맞바꾸기 로컬 탐색
+  · 수천 개 Job 도 수십 ms 내 계획
+
+사용 예)
+    tp = load_throughput(usernames=assignees)
+    plan = plan_assignment(jobs, assignees, throughput=tp)   # {username: [job, ...]}
+    print_plan_summary(plan, tp)
+"""
+
+import csv
+import os
+import statistics
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+DONE_STATES = {("annotation", "completed"), ("validation", "completed"), ("acceptance", "completed"),
+               ("validation", "new"), ("validation", "in progress"), ("acceptance", "new"),
+               ("acceptance", "in progress")}
+
+
+def job_frames(job: dict) -> int:
+    """Job 프레임 수 (start/stop 이 없으면 1)"""
+    start, stop = job.get("start_frame"), job.get("stop_frame")
+    if start is None or stop is None or stop < start:
+        return 1
+    return stop - start + 1
+
+
+def _frames_from_range(frame_range: str) -> int:
+    try:
+        start, stop = (int(x) for x in frame_range.split("~"))
+    except (AttributeError, ValueError):
+        return 0
+    return stop - start + 1 if stop >= start else 0
+
+
+def _display_to_username() -> Dict[str, str]:
+    return {v: k[len("USERMAP_"):] for k, v in os.environ.items() if k.startswith("USERMAP_")}
+
+
+def load_throughput(csv_dir: Optional[Path] = None, usernames: Optional[Iterable[str]] = None,
+                    days: Optional[int] = None) -> Dict[str, float]:
+    """
+    작업자별 처리 속도(frames/day) 추정. usernames 를 주면 해당 작업자 모두에 값을 채워 반환
+    (기록이 없으면 알려진 작업자의 중앙값, 아무 기록도 없으면 1.0 → 프레임 수 균등 배분과 동일)
+    csv_dir / days 미지정 시 .env OMISSION_CSV_DIR / THROUGHPUT_DAYS (호출 시점에 읽음, 기본 core/csv, 30일)
+    """
+    csv_dir = Path(csv_dir or os.getenv("OMISSION_CSV_DIR") or Path(__file__).resolve().parent / "csv")
+    if days is None:
+        days = int(os.getenv("THROUGHPUT_DAYS", "30"))
+    reports = sorted(csv_dir.glob("cvat_job_report_*.csv"))[-(days + 1):] if csv_dir.exists() else []
+    to_username = _display_to_username()
+
+    done_frames: Dict[str, int] = defaultdict(int)
+    active_days: Dict[str, int] = defaultdict(int)
+    prev_done = None
+    for path in reports:
+        done, active = set(), set()
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                user = to_username.get(row.get("assignee"), row.get("assignee"))
+                if not user or user == "(Unassigned)":
+                    continue
+                active.add(user)
+                if (row.get("stage"), row.get("state")) in DONE_STATES:
+                    done.add((row.get("task_id"), row.get("frame_range"), user))
+        if prev_done is not None:
+            for task_id, frame_range, user in done - prev_done:
+                done_frames[user] += _frames_from_range(frame_range)
+            for user in active:
+                active_days[user] += 1
+        prev_done = done
+
+    throughput = {u: done_frames[u] / active_days[u] for u in active_days if done_frames[u] > 0}
+    fallback = statistics.median(throughput.values()) if throughput else 1.0
+    if usernames is not None:
+        throughput = {u: throughput.get(u, fallback) for u in usernames}
+    return throughput
+
+
+def plan_assignment(jobs: List[dict], assignees: List[str], throughput: Optional[Dict[str, float]] = None,
+                    base_load: Optional[Dict[str, float]] = None, weight=job_frames,
+                    min_one_each: bool = False, refine_rounds: int = 200) -> Dict[str, List[dict]]:
+    """
+    jobs 를 assignees 에게 배분 (예상 종료 시각 = 부하 프레임 / 처리 속도 의 최댓값 최소화)
+    - base_load    : 이미 맡고 있는 프레임 수 (배치 단위로 여러 번 호출할 때 누적용)
+    - min_one_each : Job 수가 충분하면 모두 최소 1개 (redistribute 의 기존 정책)
+    """
+    if not assignees:
+        return {}
+    speed = {u: max(1e-6, float((throughput or {}).get(u, 1.0))) for u in assignees}
+    load = {u: float((base_load or {}).get(u, 0.0)) for u in assignees}
+    plan: Dict[str, List[dict]] = {u: [] for u in assignees}
+
+    # LPT: 큰 Job 부터, 이 Job 을 받았을 때 가장 빨리 끝나는 작업자에게
+    ordered = sorted(jobs, key=lambda j: (-weight(j), j.get("id", 0)))
+    if min_one_each and len(ordered) >= len(assignees):
+        # 빠른 작업자가 큰 Job 을 먼저 받도록 1개씩 선지급
+        for u, job in zip(sorted(assignees, key=lambda u: -speed[u]), ordered):
+            plan[u].append(job)
+            load[u] += weight(job)
+        ordered = ordered[len(assignees):]
+    for job in ordered:
+        w = weight(job)
+        best = min(assignees, key=lambda u: ((load[u] + w) / speed[u], u))
+        plan[best].append(job)
+        load[best] += w
+
+    _refine(plan, load, speed, weight, refine_rounds, keep_one=min_one_each)
+    return plan
+
+
+def _refine(plan, load, speed, weight, rounds, keep_one=False):
+    """최대 부하 작업자의 Job 을 다른 작업자로 옮기거나 맞바꿔 makespan 을 줄임"""
+    # 같은 가중치의 Job 은 효과가 같으므로 작업자별로 가중치 → Job 목록을 유지하고 가중치 단위로만 비교
+    index = {u: defaultdict(list) for u in plan}
+    for u, jobs in plan.items():
+        for j in jobs:
+            index[u][weight(j)].append(j)
+
+    def move(job, w, src, dst):
+        index[src][w].remove(job)
+        if not index[src][w]:
+            del index[src][w]
+        index[dst][w].append(job)
+        plan[src].remove(job)
+        plan[dst].append(job)
+        load[src] -= w
+        load[dst] += w
+
+    for _ in range(rounds):
+        worst = max(plan, key=lambda u: load[u] / speed[u])
+        makespan = load[worst] / speed[worst]
+        if keep_one and len(plan[worst]) <= 1:
+            return
+        best = None   # (새 makespan 후보, 옮길 가중치, 대상, 교환 가중치)
+        for w in index[worst]:
+            for other in plan:
+                if other == worst:
+                    continue
+                # 옮기기
+                cand = max((load[worst] - w) / speed[worst], (load[other] + w) / speed[other])
+                if cand < makespan - 1e-9 and (best is None or cand < best[0]):
+                    best = (cand, w, other, None)
+                # 맞바꾸기 (더 작은 Job 과)
+                for w2 in index[other]:
+                    if w2 >= w:
+                        continue
+                    cand = max((load[worst] - w + w2) / speed[worst], (load[other] - w2 + w) / speed[other])
+                    if cand < makespan - 1e-9 and (best is None or cand < best[0]):
+                        best = (cand, w, other, w2)
+        if best is None:
+            return
+        _, w, other, w2 = best
+        job = index[worst][w][-1]
+        job2 = index[other][w2][-1] if w2 is not None else None
+        move(job, w, worst, other)
+        if job2 is not None:
+            move(job2, w2, other, worst)
+
+
+def print_plan_summary(plan: Dict[str, List[dict]], throughput: Optional[Dict[str, float]] = None,
+                       base_load: Optional[Dict[str, float]] = None):
+    """작업자별 Job 수 / 프레임 수 / 예상 소요(일) 출력"""
+    print("====== 배분 계획 (프레임 × 처리 속도 기준) ======")
+    etas = []
+    for u, jobs in plan.items():
+        frames = sum(job_frames(j) for j in jobs) + (base_load or {}).get(u, 0)
+        speed = (throughput or {}).get(u)
+        eta = frames / speed if speed else None
+        if eta is not None:
+            etas.append(eta)
+        eta_str = f" | 예상 {eta:.2f}일 ({speed:.0f} frames/day)" if eta is not None else ""
+        print(f" - {u} ← {len(jobs)} jobs / {frames} frames{eta_str}")
+    if etas:
+        print(f"   최대 {max(etas):.2f}일 / 최소 {min(etas):.2f}일")
+    print("=================================================")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Task 생성 프로파일 벤치마크
+
+프로파일(precompressed / lazy / lazy_large ...)별로 동일한 이미지 묶음을 업로드하여
+  - ingest 시간   : Task 생성 → 데이터 업로드 → 프레임 인덱싱 완료(size>0)
+  - 프레임 로딩   : 첫 chunk (cold) / 같은 chunk 재요청 (warm) / 개별 프레임 중앙값
+을 측정하고 CSV 로 저장합니다. 측정용 Task 는 기본적으로 삭제합니다(--keep 으로 보존).
+
+예)
+    python benchmark_task_profiles.py --org_name labeling --project_name bench_project \
+        --image_dir /data/sample_frames --num_images 200 --repeat 2
+"""
+
+import os
+import csv
+import time
+import argparse
+import statistics
+from pathlib import Path
+from datetime import datetime
+
+import requests
+from dotenv import load_dotenv
+
+from cvat_upload import upload_task_data
+from task_profiles import TASK_PROFILES, get_task_profile, task_create_payload, task_data_fields
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+CVAT_URL = os.getenv("CVAT_URL_2")
+TOKEN = os.getenv("TOKEN_2")
+LOG_DIR = Path(os.getenv("ASSIGN_LOG_DIR", "./logs"))
+
+
+def build_headers(org_slug):
+    return {
+        "Authorization": f"Token {TOKEN}",
+        "Content-Type": "application/json",
+        "X-Organization": org_slug
+    }
+
+
+def get_project_id_by_name(project_name, headers, org_slug):
+    res = requests.get(f"{CVAT_URL}/api/projects", headers=headers, params={"search": project_name, "org": org_slug})
+    res.raise_for_status()
+    for p in res.json().get("results", []):
+        if p.get("name") == project_name:
+            return p["id"]
+    raise ValueError(f"프로젝트를 찾을 수 없습니다: {project_name}")
+
+
+def _timed_get(url, headers, params):
+    t = time.perf_counter()
+    res = requests.get(url, headers=headers, params=params)
+    elapsed = time.perf_counter() - t
+    res.raise_for_status()
+    return elapsed, len(res.content)
+
+
+def run_one(profile_name, project_id, images, headers, org_slug, frame_samples, timeout, keep):
+    profile = get_task_profile(profile_name=profile_name, default_quality=70)
+    name = f"bench_{profile_name}_{datetime.now().strftime('%H%M%S')}"
+    row = {"profile": profile_name, "num_images": len(images)}
+
+    t0 = time.perf_counter()
+    res = requests.post(
+        f"{CVAT_URL}/api/tasks?org={org_slug}", headers=headers,
+        json={"name": name, "project_id": project_id, **task_create_payload(profile)},
+    )
+    res.raise_for_status()
+    task_id = res.json()["id"]
+
+    fields = {**task_data_fields(profile), "sorting_method": "lexicographical"}
+    res = upload_task_data(
+        f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}", headers, fields,
+        image_paths=images, zip_name=f"{name}.zip",
+    )
+    res.raise_for_status()
+    row["upload_sec"] = round(time.perf_counter() - t0, 3)
+
+    size = 0
+    while time.perf_counter() - t0 < timeout:
+        info = requests.get(f"{CVAT_URL}/api/tasks/{task_id}?org={org_slug}", headers=headers)
+        info.raise_for_status()
+        size = info.json().get("size", 0)
+        if size > 0:
+            break
+        time.sleep(0.5)
+    row["ingest_sec"] = round(time.perf_counter() - t0, 3) if size > 0 else None
+
+    data_url = f"{CVAT_URL}/api/tasks/{task_id}/data"
+    try:
+        if size > 0:
+            chunk_params = {"type": "chunk", "number": 0, "quality": "compressed", "org": org_slug}
+            row["chunk_cold_ms"] = round(_timed_get(data_url, headers, chunk_params)[0] * 1000, 1)
+            row["chunk_warm_ms"] = round(_timed_get(data_url, headers, chunk_params)[0] * 1000, 1)
+
+            step = max(1, size // max(1, frame_samples))
+            latencies = [
+                _timed_get(data_url, headers, {"type": "frame", "number": k, "quality": "compressed", "org": org_slug})[0]
+                for k in range(0, size, step)[:frame_samples]
+            ]
+            row["frame_median_ms"] = round(statistics.median(latencies) * 1000, 1)
+            row["frame_max_ms"] = round(max(latencies) * 1000, 1)
+    finally:
+        if not keep:
+            requests.delete(f"{CVAT_URL}/api/tasks/{task_id}?org={org_slug}", headers=headers)
+
+    row["task_id"] = task_id
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task 생성 프로파일별 ingest 시간 / 프레임 로딩 지연 벤치마크")
+    parser.add_argument("--org_name", required=True, help="조직 slug")
+    parser.add_argument("--project_name", required=True, help="측정용 Task 를 만들 프로젝트 이름")
+    parser.add_argument("--image_dir", required=True)
+    parser.add_argument("--profiles", nargs="+", default=sorted(TASK_PROFILES), choices=sorted(TASK_PROFILES))
+    parser.add_argument("--num_images", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--frame_samples", type=int, default=10, help="프로파일별 개별 프레임 요청 수")
+    parser.add_argument("--timeout", type=float, default=1800, help="Task 준비 대기 최대 시간(초)")
+    parser.add_argument("--keep", action="store_true", help="측정용 Task 삭제하지 않음")
+    args = parser.parse_args()
+
+    headers = build_headers(args.org_name)
+    project_id = get_project_id_by_name(args.project_name, headers, args.org_name)
+
+    images = sorted(
+        f for f in Path(args.image_dir).rglob("*")
+        if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp"]
+    )[:args.num_images]
+    if not images:
+        raise SystemExit(f"이미지가 없습니다: {args.image_dir}")
+    print(f"🧪 이미지 {len(images)}장 | 프로파일: {args.profiles} | 반복 {args.repeat}회")
+
+    rows = []
+    for r in range(args.repeat):
+        for profile_name in args.profiles:
+            row = run_one(
+                profile_name, project_id, images, headers, args.org_name,
+                args.frame_samples, args.timeout, args.keep,
+            )
+            row["round"] = r + 1
+            rows.append(row)
+            print(
+                f" - [{profile_name}] upload {row['upload_sec']}s | ingest {row['ingest_sec']}s | "
+                f"chunk cold {row.get('chunk_cold_ms')}ms / warm {row.get('chunk_warm_ms')}ms | "
+                f"frame median {row.get('frame_median_ms')}ms"
+            )
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = LOG_DIR / f"task_profile_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    fieldnames = [
+        "round", "profile", "num_images", "task_id", "upload_sec", "ingest_sec",
+        "chunk_cold_ms", "chunk_warm_ms", "frame_median_ms", "frame_max_ms",
+    ]
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"📄 결과 저장: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
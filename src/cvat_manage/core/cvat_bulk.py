@@ -0,0 +1,224 @@
+"""
+CVAT Job 일괄 변경(PATCH / DELETE) 실행기
+
+- 동시 실행 수 제한 (스레드 풀, 스레드별 requests.Session 재사용)
+- 초당 요청 수 제한 (모든 스레드가 공유하는 rate limiter, 429 는 Retry-After 준수)
+- 재시도 + 멱등성 확인: 타임아웃/5xx 뒤에는 Job 을 다시 GET 하여
+  이미 반영된 변경(PATCH) 또는 이미 삭제된 Job(DELETE 404)은 성공으로 처리
+- dry_run: 실제 요청 없이 계획만 출력
+- 실행 후 결과 요약 (성공 / 이미 반영 / 실패 건수, 실패 목록)
+
+.env (선택)
+    BULK_CONCURRENCY=8      동시 요청 수
+    BULK_RATE_PER_SEC=20    초당 최대 요청 수 (0 이면 제한 없음)
+    BULK_MAX_RETRIES=4
+
+사용 예)
+    bulk = BulkJobExecutor(CVAT_URL, headers, org_slug, dry_run=args.dry_run)
+    for job in jobs:
+        bulk.patch(job["id"], {"assignee": uid}, label=f"→ {username}")
+    summary = bulk.run()
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class _RateLimiter:
+    """요청 시작 간격을 1/rate 초 이상으로 유지 (스레드 공유)"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        """429 응답 시 모든 스레드의 다음 요청을 뒤로 미룸"""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def _already_applied(job: dict, payload: dict) -> bool:
+    """GET 으로 받은 Job 이 payload 를 이미 반영하고 있는지"""
+    for key, want in payload.items():
+        have = job.get(key)
+        if key == "assignee":
+            have = (have or {}).get("id") if isinstance(have, dict) else have
+        if have != want:
+            return False
+    return True
+
+
+class BulkJobExecutor:
+    """Job PATCH / DELETE 를 모아 두었다가 run() 에서 병렬 실행"""
+
+    def __init__(self, base_url: str, headers: dict, org_slug: str = "",
+                 concurrency: Optional[int] = None, rate_per_sec: Optional[float] = None,
+                 max_retries: Optional[int] = None, dry_run: bool = False, verbose: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.org_slug = org_slug
+        # .env BULK_* 는 생성 시점에 읽음 (가져오는 스크립트가 import 후에 load_dotenv 하므로)
+        if not concurrency:
+            concurrency = int(os.getenv("BULK_CONCURRENCY", "8"))
+        if rate_per_sec is None:
+            rate_per_sec = float(os.getenv("BULK_RATE_PER_SEC", "20"))
+        if max_retries is None:
+            max_retries = int(os.getenv("BULK_MAX_RETRIES", "4"))
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.dry_run = dry_run
+        self.verbose = verbose
+        self._limiter = _RateLimiter(rate_per_sec)
+        self._local = threading.local()
+        self._ops: List[dict] = []
+
+    # ---- 계획 ----
+    def patch(self, job_id: int, payload: dict, label: str = ""):
+        self._ops.append({"method": "PATCH", "job_id": job_id, "payload": payload, "label": label})
+
+    def delete(self, job_id: int, label: str = ""):
+        self._ops.append({"method": "DELETE", "job_id": job_id, "payload": None, "label": label})
+
+    def plan(self) -> List[dict]:
+        return list(self._ops)
+
+    def __len__(self):
+        return len(self._ops)
+
+    # ---- 실행 ----
+    def run(self) -> Dict[str, object]:
+        """계획된 요청을 모두 실행하고 요약 반환 (실행 후 계획은 비워짐)"""
+        ops, self._ops = self._ops, []
+        start = time.perf_counter()
+
+        if self.dry_run:
+            for op in ops:
+                print(f"🧪 [DRY_RUN] {op['method']} job {op['job_id']} {op['payload'] or ''} {op['label']}".rstrip())
+            results = [dict(op, status="dry_run") for op in ops]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                results = list(pool.map(self._execute, ops))
+
+        summary = self._summarize(results, time.perf_counter() - start)
+        if self.verbose:
+            self.print_summary(summary)
+        return summary
+
+    def fetch(self, job_ids: Iterable[int], suffix: str = "") -> Dict[int, Optional[dict]]:
+        """여러 Job 의 GET /api/jobs/{id}{suffix} 를 병렬 조회 (실패 시 None)"""
+        job_ids = list(job_ids)
+
+        def _get(job_id):
+            try:
+                res = self._request("GET", f"/api/jobs/{job_id}{suffix}")
+                res.raise_for_status()
+                return res.json()
+            except requests.RequestException as e:
+                print(f"⚠️ Job {job_id}{suffix} 조회 실패: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            return dict(zip(job_ids, pool.map(_get, job_ids)))
+
+    @staticmethod
+    def print_summary(summary: Dict[str, object]):
+        print(
+            f"📊 일괄 처리 결과: 성공 {summary['ok']} | 이미 반영 {summary['already']} | "
+            f"실패 {summary['failed']} | dry_run {summary['dry_run']} | {summary['elapsed_sec']}s"
+        )
+        for r in summary["failures"][:20]:
+            print(f"   ❌ {r['method']} job {r['job_id']}: {r.get('error')}")
+        if len(summary["failures"]) > 20:
+            print(f"   ... 외 {len(summary['failures']) - 20}건")
+
+    # ---- 내부 ----
+    def _session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = requests.Session()
+            s.mount("http://", HTTPAdapter(pool_maxsize=self.concurrency))
+            s.mount("https://", HTTPAdapter(pool_maxsize=self.concurrency))
+            self._local.session = s
+        return s
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> requests.Response:
+        self._limiter.acquire()
+        params = {"org": self.org_slug} if self.org_slug else None
+        return self._session().request(
+            method, f"{self.base_url}{path}", headers=self.headers, params=params, json=payload, timeout=30,
+        )
+
+    def _verify(self, op: dict) -> bool:
+        """재시도 전 현재 상태 확인: 이미 반영되었으면 True"""
+        try:
+            res = self._request("GET", f"/api/jobs/{op['job_id']}")
+        except requests.RequestException:
+            return False
+        if op["method"] == "DELETE":
+            return res.status_code == 404
+        return res.ok and _already_applied(res.json(), op["payload"])
+
+    def _execute(self, op: dict) -> dict:
+        path = f"/api/jobs/{op['job_id']}"
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt and self._verify(op):
+                return self._done(op, "already")
+            try:
+                res = self._request(op["method"], path, op["payload"])
+            except requests.RequestException as e:
+                error = str(e)
+            else:
+                if res.ok or (op["method"] == "DELETE" and res.status_code == 404):
+                    return self._done(op, "ok")
+                error = f"{res.status_code} - {res.text[:200]}"
+                if res.status_code not in RETRY_STATUS:
+                    break
+                if res.status_code == 429:
+                    self._limiter.pause(float(res.headers.get("Retry-After") or 1))
+            if attempt < self.max_retries:
+                time.sleep(min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+        return self._done(op, "failed", error)
+
+    def _done(self, op: dict, status: str, error: Optional[str] = None) -> dict:
+        if self.verbose:
+            if status == "failed":
+                print(f"⚠️ Job {op['job_id']} {op['method']} 실패: {error}")
+            else:
+                mark = "✅" if status == "ok" else "☑️"
+                print(f"{mark} Job {op['job_id']} {op['label'] or op['method']}".rstrip())
+        return dict(op, status=status, error=error)
+
+    @staticmethod
+    def _summarize(results: List[dict], elapsed: float) -> Dict[str, object]:
+        count = lambda s: sum(1 for r in results if r["status"] == s)
+        return {
+            "total": len(results),
+            "ok": count("ok"),
+            "already": count("already"),
+            "failed": count("failed"),
+            "dry_run": count("dry_run"),
+            "elapsed_sec": round(elapsed, 2),
+            "results": results,
+            "failures": [r for r in results if r["status"] == "failed"],
+        }
@@ -0,0 +1,64 @@
+"""
+프로젝트 단위 Job 조회 (/api/jobs 서버 측 필터)
+
+- Task 목록 → Task 별 Job 목록(N+1 요청) 대신 /api/jobs?project_id=... 한 종류의 요청만 사용
+- stage / state / assignee(username) 는 쿼리 파라미터로, "할당 여부" 는 JSON-logic filter 로 서버에서 거름
+- 큰 page_size 로 페이지를 따라가며 결과를 스트리밍(yield) → 전체 목록을 모아 두지 않아도 됨
+
+사용 예)
+    for job in iter_project_jobs(CVAT_URL, headers, project_id, org_slug,
+                                 stage="annotation", state="new", has_assignee=True):
+        ...
+"""
+
+import json
+from typing import Dict, Iterator, Optional
+
+import requests
+
+JOBS_PAGE_SIZE = 500
+
+# CVAT JSON-logic: assignee 가 비어 있지 않음 / 비어 있음 (JsonLogicFilter 는 "!=" 미지원 → "!" + "==")
+_ASSIGNED_FILTER = {"!": {"==": [{"var": "assignee"}, None]}}
+_UNASSIGNED_FILTER = {"==": [{"var": "assignee"}, None]}
+
+
+def iter_project_jobs(
+    base_url: str,
+    headers: dict,
+    project_id: int,
+    org_slug: str = "",
+    stage: Optional[str] = None,
+    state: Optional[str] = None,
+    assignee: Optional[str] = None,
+    has_assignee: Optional[bool] = None,
+    page_size: int = JOBS_PAGE_SIZE,
+    session: Optional[requests.Session] = None,
+) -> Iterator[Dict]:
+    """
+    프로젝트의 Job 을 서버 측 필터로 조회하며 하나씩 반환
+    - assignee     : 특정 username 에게 할당된 Job 만
+    - has_assignee : True=할당된 Job 만, False=미할당 Job 만, None=전체
+    """
+    params = {"project_id": project_id, "page_size": page_size}
+    if org_slug:
+        params["org"] = org_slug
+    if stage:
+        params["stage"] = stage
+    if state:
+        params["state"] = state
+    if assignee:
+        params["assignee"] = assignee
+    if has_assignee is not None:
+        params["filter"] = json.dumps(_ASSIGNED_FILTER if has_assignee else _UNASSIGNED_FILTER)
+
+    http = session or requests
+    url = f"{base_url.rstrip('/')}/api/jobs"
+    while url:
+        res = http.get(url, headers=headers, params=params, timeout=60)
+        res.raise_for_status()
+        data = res.json() or {}
+        yield from data.get("results", []) or []
+        # next URL 에 필터/페이지 쿼리가 모두 포함되어 있음
+        url = data.get("next")
+        params = None
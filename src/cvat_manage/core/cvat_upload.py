@@ -0,0 +1,472 @@
+"""
+CVAT Task 데이터 업로드 공용 헬퍼
+
+- 이미지 파일들을 디스크에 ZIP으로 쓰지 않고, HTTP 본문으로 바로 흘려보내는 스트리밍 업로더
+- JPEG/PNG는 이미 압축된 포맷이므로 ZIP_DEFLATED 대신 STORED(무압축) ZIP을 즉석에서 생성
+- 본문 전체 길이를 미리 계산하므로 Content-Length 가 정상적으로 설정됨 (chunked 전송 불필요)
+- CVAT_UPLOAD_MODE=tus 이면 CVAT의 TUS(재개 가능 업로드) 프로토콜로 청크 단위 전송
+  · 청크 실패 시 HEAD 로 서버 오프셋을 확인하고 그 위치부터 재전송 (처음부터 다시 올리지 않음)
+  · CVAT TUS 는 concatenation 확장을 지원하지 않으므로 한 파일의 청크는 순차 전송,
+    병렬성(TUS_PARALLEL)은 파일 단위로 적용됨 (files 모드에서 효과)
+
+사용 예)
+    res = upload_task_data(data_url, headers, fields, image_paths=batch_files, zip_name="a_01.zip")
+
+.env 설정
+    CVAT_UPLOAD_MODE=multipart|tus   (기본 multipart)
+    TUS_CHUNK_MB=16                  (TUS 청크 크기, 이보다 작은 파일은 multipart 묶음 전송)
+    TUS_PARALLEL=4                   (동시 업로드 파일/묶음 수)
+    TUS_MAX_RETRIES=5                (청크별 연속 실패 허용 횟수)
+"""
+
+import base64
+import os
+import struct
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+import requests
+
+BLOCK_SIZE = 1024 * 1024
+TUS_VERSION = "1.0.0"
+
+# ZIP 레코드 고정 길이 (파일명 제외)
+_LOCAL_HEADER_LEN = 30
+_CENTRAL_HEADER_LEN = 46
+_EOCD_LEN = 22
+_ZIP32_LIMIT = 0xFFFFFFFF
+_ZIP32_MAX_ENTRIES = 0xFFFF
+
+
+def _dos_datetime(ts: float) -> Tuple[int, int]:
+    """mtime → (dos_time, dos_date). 1980년 이전은 1980-01-01로 보정"""
+    t = time.localtime(ts)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    dos_time = (t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2)
+    dos_date = ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday
+    return dos_time, dos_date
+
+
+def _iter_file_blocks(path: Path, offset: int = 0, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        if offset:
+            f.seek(offset)
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            yield block
+
+
+class StoredZipStream:
+    """
+    이미지 파일 목록을 STORED ZIP 바이트열로 즉석 생성하는 스트림.
+    - 임시 ZIP 파일을 만들지 않음 (디스크 I/O 1회, deflate 비용 0)
+    - len() 으로 최종 ZIP 크기를 미리 알 수 있음
+    - iter_bytes(offset) 으로 임의 위치부터 다시 생성 가능 (재개 업로드용)
+    """
+
+    def __init__(self, paths: Sequence[Union[str, Path]], arcnames: Optional[Sequence[str]] = None):
+        self.paths = [Path(p) for p in paths]
+        names = list(arcnames) if arcnames is not None else [p.name for p in self.paths]
+        if len(names) != len(self.paths):
+            raise ValueError("arcnames 개수가 파일 개수와 일치하지 않습니다.")
+        if len(self.paths) > _ZIP32_MAX_ENTRIES:
+            raise ValueError(f"STORED ZIP 스트림은 최대 {_ZIP32_MAX_ENTRIES}개 파일까지만 지원합니다.")
+
+        self._entries = []
+        offset = 0
+        for path, name in zip(self.paths, names):
+            st = path.stat()
+            encoded = name.encode("utf-8")
+            flags = 0x800 if not name.isascii() else 0  # UTF-8 파일명 플래그
+            dos_time, dos_date = _dos_datetime(st.st_mtime)
+            self._entries.append({
+                "path": path,
+                "name": encoded,
+                "flags": flags,
+                "size": st.st_size,
+                "dos_time": dos_time,
+                "dos_date": dos_date,
+                "offset": offset,
+                "crc": None,
+            })
+            offset += _LOCAL_HEADER_LEN + len(encoded) + st.st_size
+
+        self._cd_offset = offset
+        self._cd_size = sum(_CENTRAL_HEADER_LEN + len(e["name"]) for e in self._entries)
+        self._total = self._cd_offset + self._cd_size + _EOCD_LEN
+        if self._cd_offset > _ZIP32_LIMIT or self._total > _ZIP32_LIMIT:
+            raise ValueError("STORED ZIP 스트림은 4GB 미만만 지원합니다. 배치 크기를 줄이세요.")
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.iter_bytes()
+
+    # ---- 내부: 레코드 생성 ----
+    def _read_entry(self, entry) -> bytes:
+        data = entry["path"].read_bytes()
+        if len(data) != entry["size"]:
+            raise IOError(f"업로드 중 파일 크기가 변경되었습니다: {entry['path']}")
+        entry["crc"] = zlib.crc32(data) & 0xFFFFFFFF
+        return data
+
+    def _entry_crc(self, entry) -> int:
+        if entry["crc"] is None:
+            crc = 0
+            for block in _iter_file_blocks(entry["path"]):
+                crc = zlib.crc32(block, crc)
+            entry["crc"] = crc & 0xFFFFFFFF
+        return entry["crc"]
+
+    def _local_header(self, entry) -> bytes:
+        return struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50, 20, entry["flags"], 0,
+            entry["dos_time"], entry["dos_date"],
+            entry["crc"], entry["size"], entry["size"],
+            len(entry["name"]), 0,
+        ) + entry["name"]
+
+    def _central_header(self, entry) -> bytes:
+        return struct.pack(
+            "<IHHHHHHIIIHHHHHII",
+            0x02014B50, 20, 20, entry["flags"], 0,
+            entry["dos_time"], entry["dos_date"],
+            self._entry_crc(entry), entry["size"], entry["size"],
+            len(entry["name"]), 0, 0, 0, 0, 0o644 << 16,
+            entry["offset"],
+        ) + entry["name"]
+
+    def _eocd(self) -> bytes:
+        n = len(self._entries)
+        return struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, n, n, self._cd_size, self._cd_offset, 0)
+
+    def iter_bytes(self, offset: int = 0) -> Iterator[bytes]:
+        """offset 위치부터 ZIP 바이트열을 순서대로 생성"""
+        for entry in self._entries:
+            entry_len = _LOCAL_HEADER_LEN + len(entry["name"]) + entry["size"]
+            if entry["offset"] + entry_len <= offset:
+                continue
+            data = self._read_entry(entry)
+            record = self._local_header(entry) + data
+            skip = max(0, offset - entry["offset"])
+            for i in range(skip, len(record), BLOCK_SIZE):
+                yield record[i:i + BLOCK_SIZE]
+
+        tail = b"".join(self._central_header(e) for e in self._entries) + self._eocd()
+        skip = max(0, offset - self._cd_offset)
+        if skip < len(tail):
+            yield tail[skip:]
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        """[offset, offset+size) 구간 바이트 (TUS 청크 재전송용)"""
+        buf = bytearray()
+        for block in self.iter_bytes(offset):
+            buf += block
+            if len(buf) >= size:
+                break
+        return bytes(buf[:size])
+
+
+FileSource = Union[str, Path, StoredZipStream]
+
+
+def _source_len(source: FileSource) -> int:
+    if isinstance(source, StoredZipStream):
+        return len(source)
+    return Path(source).stat().st_size
+
+
+def _source_iter(source: FileSource) -> Iterable[bytes]:
+    if isinstance(source, StoredZipStream):
+        return source.iter_bytes()
+    return _iter_file_blocks(Path(source))
+
+
+def _source_read_at(source: FileSource, offset: int, size: int) -> bytes:
+    if isinstance(source, StoredZipStream):
+        return source.read_at(offset, size)
+    with open(source, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+class MultipartStream:
+    """
+    multipart/form-data 본문을 메모리에 올리지 않고 순차 생성.
+    (requests 의 files= 인자는 파일 전체를 메모리로 읽어 본문을 만든다)
+    """
+
+    def __init__(self, fields: Dict[str, object], files: List[Tuple[str, str, str, FileSource]]):
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self._parts = []  # (head_bytes, source or None)
+
+        for key, value in fields.items():
+            head = (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{key}"\r\n\r\n'
+                f"{value}\r\n"
+            ).encode("utf-8")
+            self._parts.append((head, None))
+
+        for field_name, filename, mime, source in files:
+            head = (
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+                f"Content-Type: {mime}\r\n\r\n"
+            ).encode("utf-8")
+            self._parts.append((head, source))
+
+        self._tail = f"--{self.boundary}--\r\n".encode("utf-8")
+        self._length = len(self._tail)
+        for head, source in self._parts:
+            self._length += len(head)
+            if source is not None:
+                self._length += _source_len(source) + 2  # 본문 뒤 \r\n
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        for head, source in self._parts:
+            yield head
+            if source is not None:
+                yield from _source_iter(source)
+                yield b"\r\n"
+        yield self._tail
+
+
+def guess_image_mime(path: Path) -> str:
+    ext = path.suffix.lower()
+    return {
+        ".jpg": "image/jpeg",
+        ".jpeg": "image/jpeg",
+        ".png": "image/png",
+        ".bmp": "image/bmp",
+        ".webp": "image/webp",
+    }.get(ext, "application/octet-stream")
+
+
+def build_client_files(
+    image_paths: Optional[Sequence[Path]] = None,
+    zip_path: Optional[Union[str, Path]] = None,
+    as_zip: bool = True,
+    zip_name: str = "images.zip",
+) -> List[Tuple[str, str, str, FileSource]]:
+    """
+    client_files[i] 파트 목록 구성
+    - zip_path 지정: 기존 ZIP 파일을 그대로 스트리밍
+    - image_paths + as_zip=True : STORED ZIP 을 즉석 생성하여 client_files[0] 한 개로 전송
+    - image_paths + as_zip=False: 이미지 각각을 client_files[i] 로 전송
+    """
+    if zip_path is not None:
+        zip_path = Path(zip_path)
+        return [("client_files[0]", zip_path.name, "application/zip", zip_path)]
+    if not image_paths:
+        raise ValueError("업로드할 이미지가 없습니다.")
+    image_paths = [Path(p) for p in image_paths]
+    if as_zip:
+        return [("client_files[0]", zip_name, "application/zip", StoredZipStream(image_paths))]
+    return [
+        (f"client_files[{i}]", p.name, guess_image_mime(p), p)
+        for i, p in enumerate(image_paths)
+    ]
+
+
+def load_upload_options() -> Dict[str, object]:
+    """.env 의 업로드 방식 설정 로드"""
+    mode = (os.getenv("CVAT_UPLOAD_MODE") or "multipart").strip().lower()
+    if mode not in ("multipart", "tus"):
+        raise ValueError(f"CVAT_UPLOAD_MODE 값이 올바르지 않습니다: {mode} (multipart|tus)")
+    return {
+        "mode": mode,
+        "chunk_size": int(float(os.getenv("TUS_CHUNK_MB", "16")) * 1024 * 1024),
+        "parallel": max(1, int(os.getenv("TUS_PARALLEL", "4"))),
+        "max_retries": max(0, int(os.getenv("TUS_MAX_RETRIES", "5"))),
+    }
+
+
+def _multipart_headers(headers: dict, body: MultipartStream) -> dict:
+    h = headers.copy()
+    h.pop("Content-Type", None)
+    h["Content-Type"] = body.content_type
+    return h
+
+
+# =========================
+# TUS (재개 가능 청크 업로드)
+# =========================
+def _tus_url(data_url: str) -> str:
+    """CVAT TUS 엔드포인트는 트레일링 슬래시 필요: /api/tasks/{id}/data/"""
+    parts = urlsplit(data_url)
+    return urlunsplit(parts._replace(path=parts.path.rstrip("/") + "/"))
+
+
+def _tus_headers(headers: dict, **extra) -> dict:
+    h = headers.copy()
+    h.pop("Content-Type", None)
+    h["Tus-Resumable"] = TUS_VERSION
+    h.update(extra)
+    return h
+
+
+def _tus_create(tus_url: str, headers: dict, filename: str, mime: str, length: int,
+                timeout: Optional[float]) -> str:
+    meta = ",".join(
+        f"{k} {base64.b64encode(v.encode('utf-8')).decode('ascii')}"
+        for k, v in (("filename", filename), ("filetype", mime))
+    )
+    h = _tus_headers(headers, **{"Upload-Length": str(length), "Upload-Metadata": meta})
+    res = requests.post(tus_url, headers=h, timeout=timeout)
+    res.raise_for_status()
+    return urljoin(tus_url, res.headers["Location"])
+
+
+def _tus_offset(location: str, headers: dict, timeout: Optional[float]) -> int:
+    res = requests.head(location, headers=_tus_headers(headers), timeout=timeout)
+    res.raise_for_status()
+    return int(res.headers["Upload-Offset"])
+
+
+def _tus_upload_file(tus_url: str, headers: dict, filename: str, mime: str, source: FileSource,
+                     chunk_size: int, max_retries: int, timeout: Optional[float]) -> None:
+    """파일 1개를 TUS 로 전송. 실패 시 서버 오프셋부터 재개"""
+    length = _source_len(source)
+    location = _tus_create(tus_url, headers, filename, mime, length, timeout)
+    offset = 0
+    failures = 0
+    while offset < length:
+        chunk = _source_read_at(source, offset, chunk_size)
+        h = _tus_headers(headers, **{
+            "Upload-Offset": str(offset),
+            "Content-Type": "application/offset+octet-stream",
+        })
+        try:
+            res = requests.patch(location, headers=h, data=chunk, timeout=timeout)
+            res.raise_for_status()
+            offset = int(res.headers.get("Upload-Offset", offset + len(chunk)))
+            failures = 0
+        except requests.RequestException as e:
+            failures += 1
+            if failures > max_retries:
+                raise
+            wait = min(30, 2 ** failures)
+            print(f"⚠️ TUS 청크 전송 실패 ({filename} @ {offset}/{length}): {e} → {wait}s 후 서버 오프셋에서 재개")
+            time.sleep(wait)
+            try:
+                offset = _tus_offset(location, headers, timeout)
+            except requests.RequestException as he:
+                print(f"⚠️ TUS 오프셋 조회 실패 ({filename}): {he} → 기존 오프셋 {offset} 유지")
+
+
+def _bulk_upload_group(tus_url: str, headers: dict, group: List[Tuple[str, str, str, FileSource]],
+                       max_retries: int, timeout: Optional[float]) -> None:
+    """작은 파일 묶음을 multipart 1회로 전송 (Upload-Multiple)"""
+    for attempt in range(max_retries + 1):
+        files = [(f"client_files[{i}]", name, mime, src) for i, (_, name, mime, src) in enumerate(group)]
+        body = MultipartStream({}, files)
+        h = _multipart_headers(headers, body)
+        h["Upload-Multiple"] = "true"
+        try:
+            res = requests.post(tus_url, headers=h, data=body, timeout=timeout)
+            res.raise_for_status()
+            return
+        except requests.RequestException as e:
+            if attempt >= max_retries:
+                raise
+            wait = min(30, 2 ** (attempt + 1))
+            print(f"⚠️ 묶음 업로드 실패 ({len(group)}개 파일): {e} → {wait}s 후 재시도")
+            time.sleep(wait)
+
+
+def tus_upload_task_data(
+    data_url: str,
+    headers: dict,
+    fields: Dict[str, object],
+    files: List[Tuple[str, str, str, FileSource]],
+    chunk_size: int,
+    parallel: int = 1,
+    max_retries: int = 5,
+    timeout: Optional[float] = None,
+) -> requests.Response:
+    """
+    CVAT TUS 업로드 절차
+      1) POST .../data/  (Upload-Start)
+      2) chunk_size 이상 파일 → TUS(create + PATCH 청크), 미만 파일 → Upload-Multiple 묶음 전송
+      3) POST .../data/  (Upload-Finish + Task 데이터 필드)  → 202 + rq_id
+    """
+    tus_url = _tus_url(data_url)
+    res = requests.post(tus_url, headers=_tus_headers(headers, **{"Upload-Start": "true"}), timeout=timeout)
+    res.raise_for_status()
+
+    large = [f for f in files if _source_len(f[3]) >= chunk_size]
+    small = [f for f in files if _source_len(f[3]) < chunk_size]
+    groups, group, group_size = [], [], 0
+    for f in small:
+        size = _source_len(f[3])
+        if group and group_size + size > chunk_size:
+            groups.append(group)
+            group, group_size = [], 0
+        group.append(f)
+        group_size += size
+    if group:
+        groups.append(group)
+
+    with ThreadPoolExecutor(max_workers=max(1, parallel)) as ex:
+        futures = [
+            ex.submit(_tus_upload_file, tus_url, headers, name, mime, src, chunk_size, max_retries, timeout)
+            for _, name, mime, src in large
+        ]
+        futures += [ex.submit(_bulk_upload_group, tus_url, headers, g, max_retries, timeout) for g in groups]
+        for fut in futures:
+            fut.result()
+
+    finish_headers = headers.copy()
+    finish_headers["Content-Type"] = "application/json"
+    finish_headers["Upload-Finish"] = "true"
+    return requests.post(tus_url, headers=finish_headers, json=fields, timeout=timeout)
+
+
+def upload_task_data(
+    data_url: str,
+    headers: dict,
+    fields: Dict[str, object],
+    image_paths: Optional[Sequence[Path]] = None,
+    zip_path: Optional[Union[str, Path]] = None,
+    as_zip: bool = True,
+    zip_name: str = "images.zip",
+    timeout: Optional[float] = None,
+    options: Optional[Dict[str, object]] = None,
+) -> requests.Response:
+    """
+    /api/tasks/{id}/data 로 데이터 업로드 (raise_for_status 는 호출측에서)
+    - options 미지정 시 .env(CVAT_UPLOAD_MODE 등) 기준
+    - multipart: 본문 스트리밍 1회 POST, headers 의 Content-Type 은 multipart boundary 로 교체
+    - tus      : 청크 단위 재개 가능 업로드 (마지막 Upload-Finish 응답 반환)
+    """
+    options = options or load_upload_options()
+    files = build_client_files(image_paths=image_paths, zip_path=zip_path, as_zip=as_zip, zip_name=zip_name)
+    if not as_zip and zip_path is None:
+        fields = {k: v for k, v in fields.items() if k != "upload_format"}
+
+    if options["mode"] == "tus":
+        return tus_upload_task_data(
+            data_url, headers, fields, files,
+            chunk_size=options["chunk_size"],
+            parallel=options["parallel"],
+            max_retries=options["max_retries"],
+            timeout=timeout,
+        )
+
+    body = MultipartStream(fields, files)
+    return requests.post(data_url, headers=_multipart_headers(headers, body), data=body, timeout=timeout)
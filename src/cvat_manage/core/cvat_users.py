@@ -0,0 +1,158 @@
+"""
+CVAT 사용자 디렉터리 (username → user_id) 캐시
+
+- 조직별로 한 번만 조회: /api/memberships (조직) 또는 /api/users (개인 워크스페이스), 큰 page_size 사용
+  · memberships 조회 권한이 없으면 /api/users 로 대체
+- 조회 결과는 디스크(JSON)에 TTL 동안 캐시하여 다음 실행에서도 재사용
+  · .env USER_CACHE_DIR (기본 ~/.cache/cvat_manage), USER_CACHE_TTL (초, 기본 3600, 0 이면 디스크 캐시 미사용)
+- 캐시에 없는 username 을 찾으면 실행 중 1회에 한해 서버에서 다시 불러옴 (새로 가입한 작업자 대응)
+
+사용 예)
+    users = get_user_directory(CVAT_URL, headers, org_slug)
+    uid = users.get_id("worker01")
+    workers = users.usernames(role="worker")
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import requests
+
+PAGE_SIZE = 500
+
+
+def user_cache_dir() -> Path:
+    """호출 시점의 환경변수 기준 (가져오는 스크립트가 import 후에 load_dotenv 하므로 지연 평가)"""
+    return Path(os.getenv("USER_CACHE_DIR") or Path.home() / ".cache" / "cvat_manage").expanduser()
+
+
+def user_cache_ttl() -> float:
+    return float(os.getenv("USER_CACHE_TTL", "3600"))
+
+
+# 실행 중 (base_url, org_slug) 별 디렉터리 공유
+_DIRECTORIES: Dict[tuple, "UserDirectory"] = {}
+
+
+class UserDirectory:
+    """조직 단위 username → {id, role} 매핑"""
+
+    def __init__(self, base_url: str, headers: dict, org_slug: str = "",
+                 ttl: Optional[float] = None, cache_dir: Optional[Path] = None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.org_slug = org_slug
+        self.ttl = user_cache_ttl() if ttl is None else ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else user_cache_dir()
+        self._users: Optional[Dict[str, dict]] = None
+        self._refreshed = False
+
+    # ---- 조회 ----
+    def get_id(self, username: str) -> Optional[int]:
+        """username 의 user_id (없으면 None)"""
+        users = self._load()
+        if username not in users and not self._refreshed:
+            users = self._load(refresh=True)
+        entry = users.get(username)
+        return entry["id"] if entry else None
+
+    def ids_for(self, usernames: Iterable[str]) -> Dict[str, Optional[int]]:
+        """여러 username 을 한 번에 매핑 (없는 이름은 None)"""
+        return {name: self.get_id(name) for name in usernames}
+
+    def usernames(self, role: Optional[str] = None) -> List[str]:
+        """전체 (또는 특정 role) username 목록"""
+        users = self._load()
+        return sorted(name for name, u in users.items() if role is None or u.get("role") == role)
+
+    def refresh(self):
+        self._load(refresh=True)
+
+    # ---- 내부 ----
+    def _cache_path(self) -> Path:
+        host = hashlib.sha1(self.base_url.encode("utf-8")).hexdigest()[:10]
+        return self.cache_dir / f"users_{host}_{self.org_slug or 'personal'}.json"
+
+    def _load(self, refresh: bool = False) -> Dict[str, dict]:
+        if self._users is not None and not refresh:
+            return self._users
+        if not refresh:
+            cached = self._read_cache()
+            if cached is not None:
+                self._users = cached
+                return cached
+        self._users = self._fetch()
+        self._refreshed = True
+        self._write_cache(self._users)
+        return self._users
+
+    def _read_cache(self) -> Optional[Dict[str, dict]]:
+        if self.ttl <= 0:
+            return None
+        path = self._cache_path()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("fetched_at", 0) > self.ttl:
+            return None
+        return data.get("users") or {}
+
+    def _write_cache(self, users: Dict[str, dict]):
+        if self.ttl <= 0:
+            return
+        path = self._cache_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"fetched_at": time.time(), "users": users}, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️ 사용자 캐시 저장 실패: {e}")
+
+    def _iter_pages(self, path: str):
+        url = f"{self.base_url}{path}"
+        params = {"page_size": PAGE_SIZE}
+        if self.org_slug:
+            params["org"] = self.org_slug
+        while url:
+            res = requests.get(url, headers=self.headers, params=params)
+            res.raise_for_status()
+            data = res.json() or {}
+            yield from data.get("results", []) or []
+            url = data.get("next")
+            params = None   # next URL 에 쿼리가 포함되어 있음
+
+    def _fetch(self) -> Dict[str, dict]:
+        users: Dict[str, dict] = {}
+        if self.org_slug:
+            try:
+                for m in self._iter_pages("/api/memberships"):
+                    u = (m or {}).get("user") or {}
+                    if u.get("username") and u.get("id") is not None:
+                        users[u["username"]] = {"id": u["id"], "role": m.get("role")}
+            except requests.HTTPError as e:
+                print(f"⚠️ memberships 조회 실패({e.response.status_code}) → /api/users 로 대체")
+                users = {}
+        if not users:
+            for u in self._iter_pages("/api/users"):
+                if u.get("username") and u.get("id") is not None:
+                    users[u["username"]] = {"id": u["id"], "role": None}
+        print(f"👥 사용자 디렉터리 로드: {len(users)}명 (org={self.org_slug or '-'})")
+        return users
+
+
+def get_user_directory(base_url: str, headers: dict, org_slug: str = "") -> UserDirectory:
+    """실행 중 조직별로 하나의 UserDirectory 를 공유"""
+    if not org_slug:
+        org_slug = (headers or {}).get("X-Organization") or ""
+    key = (base_url.rstrip("/"), org_slug)
+    if key not in _DIRECTORIES:
+        _DIRECTORIES[key] = UserDirectory(base_url, headers, org_slug)
+    return _DIRECTORIES[key]
@@ -11,6 +11,12 @@ import pandas as pd
 import csv
 from itertools import cycle
 
+from cvat_upload import upload_task_data
+from task_profiles import TASK_PROFILES, get_task_profile, task_create_payload, task_data_fields
+from task_waiter import extract_rq_id, wait_for_task
+from cvat_users import get_user_directory
+from cvat_bulk import BulkJobExecutor
+
 # ====== ENV ======
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -118,15 +124,15 @@ def create_project(name, labels, headers, org_slug):
             last_err = e
     raise last_err
 
-def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
+def create_task_with_zip(name, project_id, zip_path, headers, org_slug, profile=None):
     """Task 생성 + ZIP 업로드. org 쿼리 병행 및 트레일링 슬래시 호환."""
+    profile = profile or get_task_profile(profile_name="precompressed", default_quality=100)
     base = f"{CVAT_URL}/api/tasks"
     url_candidates = [f"{base}/?org={org_slug}", f"{base}?org={org_slug}", f"{base}/", base]
     payload = {
         "name": name,
         "project_id": project_id,
-        "image_quality": 100,
-        "segment_size": 100
+        **task_create_payload(profile),
     }
     task_id = None
     last_err = None
@@ -145,40 +151,24 @@ def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
     if task_id is None:
         raise last_err
 
-    # ---- 데이터 업로드 (files 업로드 시 Content-Type 제거 필수) ----
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
-    with open(zip_path, "rb") as zip_file:
-        files = {"client_files[0]": (os.path.basename(zip_path), zip_file, "application/zip")}
-        data = {
-            "image_quality": 100,
-            "use_zip_chunks": "false",
-            "use_cache": "false",
-            "sorting_method": "lexicographical",
-            "upload_format": "zip"
-        }
-        data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
-        res = requests.post(data_url, headers=upload_headers, files=files, data=data)
-        if res.status_code >= 400:
-            _debug_http_error("Task data upload", res)
-        res.raise_for_status()
-        print(f"📦 Uploaded ZIP to task {task_id}")
+    # ---- 데이터 업로드 (multipart 스트리밍 또는 TUS, .env CVAT_UPLOAD_MODE) ----
+    data = {
+        **task_data_fields(profile),
+        "sorting_method": "lexicographical",
+        "upload_format": "zip"
+    }
+    data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
+    res = upload_task_data(data_url, headers, data, zip_path=zip_path)
+    if res.status_code >= 400:
+        _debug_http_error("Task data upload", res)
+    res.raise_for_status()
+    print(f"📦 Uploaded ZIP to task {task_id}")
 
-    return task_id
+    return task_id, extract_rq_id(res)
 
-def wait_until_task_ready(task_id, headers, org_slug, timeout=120):
-    """프레임 인덱싱 완료까지 대기 (size>0)"""
-    start = time.time()
-    while time.time() - start < timeout:
-        res = requests.get(f"{CVAT_URL}/api/tasks/{task_id}?org={org_slug}", headers=headers)
-        if res.status_code != 200:
-            print(f"❌ Task 상태 확인 실패: {res.status_code}")
-            break
-        task_info = res.json()
-        if task_info.get("size", 0) > 0:
-            return True
-        time.sleep(2)
-    return False
+def wait_until_task_ready(task_id, headers, org_slug, timeout=None, rq_id=None, upload_bytes=0):
+    """프레임 인덱싱 완료까지 대기 (rq_id 추적, 구버전 서버는 size>0 확인)"""
+    return wait_for_task(CVAT_URL, task_id, headers, org_slug, rq_id=rq_id, upload_bytes=upload_bytes, timeout=timeout)
 
 def upload_annotations(task_id, json_path, headers, org_slug):
     """COCO 1.0 어노테이션 업로드 (정확한 org 전달)"""
@@ -240,29 +230,13 @@ def get_jobs(task_id, headers, org_slug):
 #             return user["id"]
 #     return None
 
-def get_user_id(username: str, headers: dict, org_slug: str, page_size: int = 100):
+def get_user_id(username: str, headers: dict, org_slug: str):
     """
     특정 username 에 해당하는 user.id 반환
-    - 조직 내 모든 페이지를 순회하며 검색
+    - 조직 사용자 디렉터리를 실행당 1회만 조회 (디스크 캐시, cvat_users.py 참고)
     - 없으면 None 반환
     """
-    url = f"{CVAT_URL}/api/users?org={org_slug}&page_size={page_size}"
-
-    while url:
-        res = requests.get(url, headers=headers)
-        res.raise_for_status()
-        data = res.json()
-
-        # 현재 페이지에서 username 매칭 검사
-        for user in data.get("results", []) or []:
-            if user.get("username") == username:
-                return user.get("id")
-
-        # 다음 페이지로 이동
-        url = data.get("next")
-
-    # 끝까지 못 찾으면 None
-    return None
+    return get_user_directory(CVAT_URL, headers, org_slug).get_id(username)
 
 
 def assign_jobs_to_one_user(jobs, headers, assignee_name, org_slug):
@@ -270,19 +244,12 @@ def assign_jobs_to_one_user(jobs, headers, assignee_name, org_slug):
     if not user_id:
         print(f"❌ 사용자 '{assignee_name}'를 찾을 수 없습니다.")
         return
+    bulk = BulkJobExecutor(CVAT_URL, headers, org_slug)
     for job in jobs:
         if job.get("assignee"): 
             continue
-        try:
-            res = requests.patch(
-                f"{CVAT_URL}/api/jobs/{job['id']}?org={org_slug}",
-                headers=headers,
-                json={"assignee": user_id}
-            )
-            res.raise_for_status()
-            print(f"✅ Job {job['id']} → '{assignee_name}' 할당 완료")
-        except requests.HTTPError as e:
-            print(f"⚠️ 할당 실패: {e.response.status_code} - {e.response.text}")
+        bulk.patch(job["id"], {"assignee": user_id}, label=f"→ '{assignee_name}' 할당 완료")
+    bulk.run()
 
 def get_user_display_name(username):
     return os.getenv(f"USERMAP_{username}", username)
@@ -454,7 +421,8 @@ def compress_and_upload_all(
     project_name,
     organization="",
     batch_size=100,
-    org_slug=""
+    org_slug="",
+    task_profile=None,
 ):
     """
     [기능 요약]
@@ -494,7 +462,7 @@ def compress_and_upload_all(
         # 이미지 파일만 수집
         image_files = sorted([
             f for f in group_dir.glob("*")
-            if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp"]
+            if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp", ".webp"]
         ])
         if not image_files:
             continue  # 이 폴더에 이미지가 없으면 다음 폴더로
@@ -525,8 +493,8 @@ def compress_and_upload_all(
             # --- 3) CVAT Task 생성 + ZIP 업로드 ---
             task_name = zip_path.stem  # 확장자 제외(= ZIP 이름)
             try:
-                task_id = create_task_with_zip(
-                    task_name, project_id, zip_path, headers, org_slug=org_slug
+                task_id, rq_id = create_task_with_zip(
+                    task_name, project_id, zip_path, headers, org_slug=org_slug, profile=task_profile
                 )
             except Exception as e:
                 print(f"❌ Task 생성/ZIP 업로드 실패: {task_name} | 에러: {e}")
@@ -534,7 +502,7 @@ def compress_and_upload_all(
                 continue
 
             # --- 4) Task 준비(프레임 인덱싱) 대기 ---
-            if not wait_until_task_ready(task_id, headers, org_slug):
+            if not wait_until_task_ready(task_id, headers, org_slug, rq_id=rq_id, upload_bytes=zip_path.stat().st_size):
                 print(f"[CVAT] Task {task_name} 초기화 실패(프레임 인덱싱 미완료)")
                 # 디버깅을 위해 파일 보존
                 continue
@@ -586,6 +554,8 @@ if __name__ == "__main__":
     parser.add_argument("--project_name", required=True)
     parser.add_argument("--labels", type=str, nargs="+", required=True)
     parser.add_argument("--assignees", type=str, nargs="+", required=True)
+    parser.add_argument("--task_profile", choices=sorted(TASK_PROFILES), default=None,
+                        help="Task 생성 프로파일 (미지정 시 json/task_profiles.json 의 프로젝트 매핑)")
     args = parser.parse_args()
     
     ORGANIZATION = args.org_name
@@ -604,9 +574,13 @@ if __name__ == "__main__":
     # 프로젝트 생성(중복 라벨 방지)
     project_id = create_project(args.project_name, labels=args.labels, headers=headers, org_slug=org_slug)
 
+    task_profile = get_task_profile(args.project_name, args.task_profile, default_quality=100)
+    print(f"⚙️ Task 생성 프로파일: {task_profile['name']}")
+
     # 본 처리
     compress_and_upload_all(
         image_dir, project_id, headers,
         assignees=args.assignees, project_name=args.project_name,
-        organization=ORGANIZATION, batch_size=100, org_slug=org_slug
+        organization=ORGANIZATION, batch_size=100, org_slug=org_slug,
+        task_profile=task_profile,
     )
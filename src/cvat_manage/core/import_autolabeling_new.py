@@ -1,4 +1,4 @@
-import os, json, zipfile, argparse, torch, time
+import os, io, sys, json, argparse, torch, time
 from pathlib import Path
 from ultralytics import YOLO
 from PIL import Image
@@ -12,6 +12,18 @@ import csv
 from itertools import cycle
 from typing import Optional, Set, Iterable, List, Dict
 
+from cvat_upload import upload_task_data
+from task_profiles import TASK_PROFILES, get_task_profile, task_create_payload, task_data_fields
+from task_waiter import TaskReadinessPoller, extract_rq_id
+from cvat_users import get_user_directory
+from cvat_bulk import BulkJobExecutor
+from assignment_planner import job_frames, load_throughput, plan_assignment
+
+# utils/ 공용 모듈 (근접 중복 프레임 제거, 추출기가 만든 ZIP 배치 읽기)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "utils"))
+from frame_dedup import print_dedup_summary, split_distinct  # noqa: E402
+from frame_zip import read_zip_images  # noqa: E402
+
 # ====== ENV ======
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -119,17 +131,18 @@ def create_project(name, labels, headers, org_slug):
             last_err = e
     raise last_err
 
-def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
-    """Task 생성 + ZIP 업로드. org 쿼리 병행 및 트레일링 슬래시 호환."""
+def _default_profile():
+    return get_task_profile(profile_name="precompressed", default_quality=100)
+
+def _create_task(name, project_id, headers, org_slug, profile):
+    """Task 생성. org 쿼리 병행 및 트레일링 슬래시 호환."""
     base = f"{CVAT_URL}/api/tasks"
     url_candidates = [f"{base}/?org={org_slug}", f"{base}?org={org_slug}", f"{base}/", base]
     payload = {
         "name": name,
         "project_id": project_id,
-        "image_quality": 100,
-        "segment_size": 100
+        **task_create_payload(profile),
     }
-    task_id = None
     last_err = None
     for url in url_candidates:
         res = requests.post(url, headers=headers, json=payload)
@@ -139,47 +152,52 @@ def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
             res.raise_for_status()
             task_id = res.json()["id"]
             print(f"✅ Task created via {url} → id={task_id}")
-            break
+            return task_id
         except requests.HTTPError as e:
             last_err = e
             continue
-    if task_id is None:
-        raise last_err
+    raise last_err
 
-    # ---- 데이터 업로드 (files 업로드 시 Content-Type 제거 필수) ----
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
-    with open(zip_path, "rb") as zip_file:
-        files = {"client_files[0]": (os.path.basename(zip_path), zip_file, "application/zip")}
-        data = {
-            "image_quality": 100,
-            "use_zip_chunks": "false",
-            "use_cache": "false",
-            "sorting_method": "lexicographical",
-            "upload_format": "zip"
-        }
-        data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
-        res = requests.post(data_url, headers=upload_headers, files=files, data=data)
-        if res.status_code >= 400:
-            _debug_http_error("Task data upload", res)
-        res.raise_for_status()
-        print(f"📦 Uploaded ZIP to task {task_id}")
+def _upload_task_data(task_id, headers, org_slug, profile, image_paths=None, zip_path=None, as_zip=True, zip_name="images.zip"):
+    """Task 데이터 스트리밍 업로드 (Content-Type 은 multipart boundary 로 교체됨)"""
+    data = {
+        **task_data_fields(profile),
+        "sorting_method": "lexicographical",
+        "upload_format": "zip"
+    }
+    data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
+    res = upload_task_data(
+        data_url, headers, data,
+        image_paths=image_paths, zip_path=zip_path, as_zip=as_zip, zip_name=zip_name,
+    )
+    if res.status_code >= 400:
+        _debug_http_error("Task data upload", res)
+    res.raise_for_status()
+    return res
 
-    return task_id
+def create_task_with_zip(name, project_id, zip_path, headers, org_slug, profile=None):
+    """Task 생성 + 기존 ZIP 파일 스트리밍 업로드."""
+    profile = profile or _default_profile()
+    task_id = _create_task(name, project_id, headers, org_slug, profile)
+    res = _upload_task_data(task_id, headers, org_slug, profile, zip_path=zip_path)
+    print(f"📦 Uploaded ZIP to task {task_id}")
+    return task_id, extract_rq_id(res)
 
-def wait_until_task_ready(task_id, headers, org_slug, timeout=120):
-    """프레임 인덱싱 완료까지 대기 (size>0)"""
-    start = time.time()
-    while time.time() - start < timeout:
-        res = requests.get(f"{CVAT_URL}/api/tasks/{task_id}?org={org_slug}", headers=headers)
-        if res.status_code != 200:
-            print(f"❌ Task 상태 확인 실패: {res.status_code}")
-            break
-        task_info = res.json()
-        if task_info.get("size", 0) > 0:
-            return True
-        time.sleep(2)
-    return False
+def create_task_with_images(name, project_id, image_paths, headers, org_slug, as_zip=True, profile=None):
+    """
+    Task 생성 + 이미지 직접 업로드 (임시 ZIP 파일 없음)
+    - as_zip=True : STORED ZIP 을 요청 본문에서 즉석 생성 (client_files[0] = <name>.zip)
+    - as_zip=False: 이미지 각각을 client_files[i] 로 전송
+    """
+    profile = profile or _default_profile()
+    task_id = _create_task(name, project_id, headers, org_slug, profile)
+    res = _upload_task_data(
+        task_id, headers, org_slug, profile,
+        image_paths=image_paths, as_zip=as_zip, zip_name=f"{name}.zip",
+    )
+    mode = "STORED ZIP 스트림" if as_zip else "client_files"
+    print(f"📦 Uploaded {len(image_paths)} images to task {task_id} ({mode})")
+    return task_id, extract_rq_id(res)
 
 def upload_annotations(task_id, json_path, headers, org_slug):
     """COCO 1.0 어노테이션 업로드 (정확한 org 전달)"""
@@ -227,18 +245,9 @@ def get_jobs(task_id, headers, org_slug):
     res.raise_for_status()
     return res.json().get("results", [])
 
-def get_user_id(username: str, headers: dict, org_slug: str, page_size: int = 100):
-    """특정 username 에 해당하는 user.id 반환 (끝 페이지까지 탐색)."""
-    url = f"{CVAT_URL}/api/users?org={org_slug}&page_size={page_size}"
-    while url:
-        res = requests.get(url, headers=headers)
-        res.raise_for_status()
-        data = res.json()
-        for user in data.get("results", []) or []:
-            if user.get("username") == username:
-                return user.get("id")
-        url = data.get("next")
-    return None
+def get_user_id(username: str, headers: dict, org_slug: str):
+    """특정 username 에 해당하는 user.id 반환 (조직 사용자 디렉터리 캐시 사용)."""
+    return get_user_directory(CVAT_URL, headers, org_slug).get_id(username)
 
 # ====== memberships 페이지네이션 & role=worker 필터 ======
 def _iter_paginated(url: str, headers: dict):
@@ -256,19 +265,12 @@ def get_all_memberships(headers: dict, org_slug: str, page_size: int = 100):
     start_url = f"{CVAT_URL}/api/memberships?org={org_slug}&page_size={page_size}"
     return list(_iter_paginated(start_url, headers))
 
-def get_worker_usernames(headers: dict, org_slug: str, page_size: int = 100) -> Set[str]:
+def get_worker_usernames(headers: dict, org_slug: str) -> Set[str]:
     """
     조직에서 role이 'worker'인 사용자들의 username 집합을 반환.
-    memberships 항목 예시: { "user": {...}, "role": "worker", ... }
+    memberships 기반 사용자 디렉터리를 그대로 사용 (user_id 조회와 같은 1회 로드를 공유)
     """
-    workers = set()
-    for m in get_all_memberships(headers, org_slug, page_size=page_size):
-        role = (m or {}).get("role")
-        u = (m or {}).get("user") or {}
-        uname = u.get("username")
-        if role == "worker" and uname:
-            workers.add(uname)
-    return workers
+    return set(get_user_directory(CVAT_URL, headers, org_slug).usernames(role="worker"))
 
 def filter_assignees_by_role_and_exclude(
     candidates: Iterable[str],
@@ -294,22 +296,26 @@ def assign_jobs_round_robin(
     headers: dict,
     assignees: List[str],
     org_slug: str,
+    balance: str = "jobs",
+    throughput: Optional[Dict[str, float]] = None,
+    load: Optional[Dict[str, float]] = None,
 ) -> Dict[str, int]:
     """
-    여러 명(assignees) 사이에서 'Job 단위'로 균등 분배(라운드로빈)
+    여러 명(assignees) 사이에서 Job 분배
+    - balance="jobs"  : 'Job 단위' 균등 분배(라운드로빈)
+    - balance="frames": 프레임 수 / 작업자 처리 속도(throughput) 기준 균형 배분 (assignment_planner)
+                        load 에 작업자별 누적 프레임을 기록하므로 배치마다 같은 dict 를 넘기면 전체가 균형을 이룸
     반환값: {username: 할당된 job 개수}
     """
     if not assignees:
         print("⛔ 라운드로빈 대상자가 없습니다.")
         return {}
 
-    # username → user_id 캐시
-    id_cache: Dict[str, Optional[int]] = {}
-    for name in assignees:
-        uid = get_user_id(name, headers, org_slug)
+    # username → user_id (조직 사용자 디렉터리, 배치마다 재조회하지 않음)
+    id_cache: Dict[str, Optional[int]] = get_user_directory(CVAT_URL, headers, org_slug).ids_for(assignees)
+    for name, uid in id_cache.items():
         if not uid:
             print(f"❌ 사용자 '{name}'의 user_id를 찾지 못했습니다. 분배 대상에서 제외합니다.")
-        id_cache[name] = uid
     assignees = [a for a in assignees if id_cache.get(a)]
     if not assignees:
         print("⛔ 유효한 user_id가 있는 라운드로빈 대상자가 없습니다.")
@@ -321,22 +327,31 @@ def assign_jobs_round_robin(
     # 안정적 분배를 위해 job id 기준 정렬
     jobs_sorted = sorted(jobs, key=lambda j: j.get("id", 0))
 
-    for job in jobs_sorted:
-        if job.get("assignee"):
-            continue
-        assignee = next(cyc)
-        user_id = id_cache[assignee]
-        try:
-            res = requests.patch(
-                f"{CVAT_URL}/api/jobs/{job['id']}?org={org_slug}",
-                headers=headers,
-                json={"assignee": user_id}
-            )
-            res.raise_for_status()
+    # 계획은 순서대로 세우고, PATCH 는 BulkJobExecutor 로 병렬 실행
+    bulk = BulkJobExecutor(CVAT_URL, headers, org_slug)
+    planned: Dict[int, str] = {}
+    unassigned = [job for job in jobs_sorted if not job.get("assignee")]
+    if balance == "frames":
+        load = load if load is not None else {}
+        plan = plan_assignment(unassigned, assignees, throughput=throughput, base_load=load)
+        for assignee, planned_jobs in plan.items():
+            for job in planned_jobs:
+                planned[job["id"]] = assignee
+    else:
+        for job in unassigned:
+            planned[job["id"]] = next(cyc)
+
+    by_id = {job["id"]: job for job in unassigned}
+    for job_id, assignee in planned.items():
+        bulk.patch(job_id, {"assignee": id_cache[assignee]}, label=f"→ '{assignee}'")
+
+    summary = bulk.run()
+    for r in summary["results"]:
+        if r["status"] in ("ok", "already"):
+            assignee = planned[r["job_id"]]
             assigned_count[assignee] += 1
-            print(f"✅ Job {job['id']} → '{assignee}' (누적 {assigned_count[assignee]})")
-        except requests.HTTPError as e:
-            print(f"⚠️ 할당 실패 (job {job['id']} → {assignee}): {e.response.status_code} - {e.response.text}")
+            if load is not None:
+                load[assignee] = load.get(assignee, 0) + job_frames(by_id[r["job_id"]])
 
     return assigned_count
 
@@ -393,16 +408,25 @@ def log_assignment(task_name, task_id, assignee_name, num_jobs, project_name, or
 
 # ====== YOLO / COCO 생성 ======
 def run_yolo_on_image(model, img_path, image_id, annotation_id_start):
+    """img_path: 이미지 경로 또는 ZIP 배치에서 읽은 (파일명, 바이트)"""
     start = time.time()
-    img = Image.open(img_path)
+    if isinstance(img_path, tuple):
+        file_name, data = img_path
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        source = img
+    else:
+        file_name = img_path.name
+        img = Image.open(img_path)
+        source = img_path
     width, height = img.size
     image_entry = {
         "id": image_id,
-        "file_name": img_path.name,
+        "file_name": file_name,
         "width": width,
         "height": height
     }
-    results = model(img_path)
+    results = model(source)
     annotations = []
     aid = annotation_id_start
     for r in results:
@@ -424,7 +448,7 @@ def run_yolo_on_image(model, img_path, image_id, annotation_id_start):
             })
             aid += 1
     elapsed = time.time() - start
-    print(f"🕒 {img_path.name} 추론 소요시간: {elapsed:.2f}초 (person {len(annotations)}개 감지)")
+    print(f"🕒 {file_name} 추론 소요시간: {elapsed:.2f}초 (person {len(annotations)}개 감지)")
     return image_entry, annotations, aid
 
 def run_yolo_and_create_json_parallel(images, output_json_path, model0, model1):
@@ -457,16 +481,24 @@ def compress_and_upload_all(
     batch_size=100,
     org_slug="",
     exclude_users: Optional[Set[str]] = None,
+    upload_as_zip: bool = True,
+    task_profile: Optional[dict] = None,
+    balance: str = "jobs",
+    dedup_hamming: int = -1,
 ):
     """
     [기능 요약]
       - 이미지 폴더 트리 순회
       - (bboxes / keypoints 폴더가 있는 폴더는 스킵)
-      - 배치 단위로 ZIP 생성 + YOLO(person) 감지 → COCO JSON 생성
-      - CVAT Task 생성 → ZIP 업로드 → (프레임 인덱싱 대기) → COCO 1.0 어노테이션 업로드
+      - dedup_hamming >= 0 이면 폴더(영상)별 근접 중복 프레임 제외 (dHash, 파일은 삭제하지 않음)
+      - 배치 단위로 YOLO(person) 감지 → COCO JSON 생성
+      - 낱장 이미지가 없고 *.zip 만 있는 폴더(추출기 FRAME_ZIP_BATCH 모드)는 ZIP 하나를 배치 하나로 그대로 업로드
+        · ZIP 은 원본 그대로 올리므로 dedup_hamming 은 적용되지 않음 (경고 출력)
+      - CVAT Task 생성 → 이미지 스트리밍 업로드(임시 ZIP 없음) → (프레임 인덱싱 대기) → COCO 1.0 어노테이션 업로드
+        · 인덱싱 대기는 폴러 스레드가 맡아, 대기 중에도 다음 배치의 감지/업로드를 계속 진행
       - 업로드 직후 서버 메타 리프레시/조회
       - 🔹 memberships에서 role='worker' 전체를 불러와 (제외 목록 제거 후) **라운드로빈 by job** 분배
-      - 모든 단계 성공 시, 생성한 .json / .zip 파일 삭제
+      - 모든 단계 성공 시, 생성한 .json 파일 삭제
     """
     exclude_users = exclude_users or set()
 
@@ -490,96 +522,141 @@ def compress_and_upload_all(
     print(f"✅ GPU 사용 확인: {torch.cuda.get_device_name(0)}, {torch.cuda.get_device_name(1)}")
     print(f"👷 최종 대상(워커 & 제외반영): {eligible_assignees}")
 
-    # --- 상위 image_root_dir 이하 모든 하위 폴더 순회 ---
-    for group_dir in image_root_dir.rglob("*"):
-        if not group_dir.is_dir():
-            continue
-
-        # 안전장치: 라벨 산출물 폴더 스킵
-        if any((group_dir / skip_name).exists() for skip_name in ["bboxes", "keypoints"]):
-            print(f"⏩ 스킵: {group_dir} (하위에 bboxes 또는 keypoints 폴더 존재)")
-            continue
-
-        # 이미지 파일만 수집
-        image_files = sorted([
-            f for f in group_dir.glob("*")
-            if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp"]
-        ])
-        if not image_files:
-            continue
-
-        # 배치 나누기
-        num_batches = ceil(len(image_files) / batch_size)
-
-        for i in range(num_batches):
-            batch_files = image_files[i * batch_size : (i + 1) * batch_size]
+    # --balance frames: omission CSV 기반 작업자 처리 속도 + 실행 중 누적 프레임으로 배분
+    throughput = load_throughput(usernames=eligible_assignees) if balance == "frames" else None
+    assignee_load: Dict[str, float] = {}
 
-            zip_filename = f"{group_dir.name}_{i+1:02d}.zip"
-            json_filename = f"{group_dir.name}_{i+1:02d}.json"
-            zip_path = group_dir / zip_filename
-            json_path = group_dir / json_filename
+    def finalize_batch(task_name, task_id, json_path, ready):
+        # 4) 프레임 인덱싱 결과 확인
+        if not ready:
+            print(f"[CVAT] Task {task_name} 초기화 실패(프레임 인덱싱 미완료)")
+            return
 
-            # 1) YOLO 감지 + COCO JSON 생성
-            run_yolo_and_create_json_parallel(batch_files, json_path, model0, model1)
+        # 5) COCO 1.0 어노 업로드
+        ok = upload_annotations(task_id, json_path, headers, org_slug)
+        if not ok:
+            print(f"[CVAT] Task {task_name} 어노 업로드 실패")
+            return
 
-            # 2) ZIP 압축
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for img_path in batch_files:
-                    zipf.write(img_path, arcname=img_path.name)
-            print(f"[Batch] {zip_filename} created with {len(batch_files)} images")
+        # 6) 서버 메타 리프레시/조회
+        refresh_and_check_counts(task_id, headers, org_slug)
+        print(f"[CVAT] Task {task_name} 등록 및 어노테이션 완료")
 
-            # 3) Task 생성 + ZIP 업로드
-            task_name = zip_path.stem
-            try:
-                task_id = create_task_with_zip(task_name, project_id, zip_path, headers, org_slug=org_slug)
-            except Exception as e:
-                print(f"❌ Task 생성/ZIP 업로드 실패: {task_name} | 에러: {e}")
-                continue
-
-            # 4) 프레임 인덱싱 대기
-            if not wait_until_task_ready(task_id, headers, org_slug):
-                print(f"[CVAT] Task {task_name} 초기화 실패(프레임 인덱싱 미완료)")
+        # 7) 🔹 작업자 라운드로빈 by job 분배 (모든 워커에게 균등 분배)
+        try:
+            jobs = get_jobs(task_id, headers, org_slug)
+            counts = assign_jobs_round_robin(
+                jobs=jobs,
+                headers=headers,
+                assignees=eligible_assignees,
+                org_slug=org_slug,
+                balance=balance,
+                throughput=throughput,
+                load=assignee_load,
+            )
+            # 사용자별 배분 결과를 로그에 기록 (여러 줄)
+            for name, c in counts.items():
+                if c > 0:
+                    log_assignment(
+                        task_name, task_id, name, c,
+                        project_name, organization
+                    )
+        except Exception as e:
+            print(f"⚠️ 작업자 분배(라운드로빈) 중 오류 발생: {e}")
+
+        # 8) 산출물(.json) 삭제
+        try:
+            if json_path.exists():
+                os.remove(json_path)
+                print(f"🗑️ Deleted JSON: {json_path}")
+        except Exception as e:
+            print(f"⚠️ 파일 삭제 중 오류 발생: {e}")
+
+    pending = []
+    dedup_stats = []
+    with TaskReadinessPoller(CVAT_URL, headers, org_slug) as poller:
+        # --- 상위 image_root_dir 이하 모든 하위 폴더 순회 ---
+        for group_dir in image_root_dir.rglob("*"):
+            if not group_dir.is_dir():
                 continue
 
-            # 5) COCO 1.0 어노 업로드
-            ok = upload_annotations(task_id, json_path, headers, org_slug)
-            if not ok:
-                print(f"[CVAT] Task {task_name} 어노 업로드 실패")
+            # 안전장치: 라벨 산출물 폴더 스킵
+            if any((group_dir / skip_name).exists() for skip_name in ["bboxes", "keypoints"]):
+                print(f"⏩ 스킵: {group_dir} (하위에 bboxes 또는 keypoints 폴더 존재)")
                 continue
 
-            # 6) 서버 메타 리프레시/조회
-            refresh_and_check_counts(task_id, headers, org_slug)
-            print(f"[CVAT] Task {task_name} 등록 및 어노테이션 완료")
-
-            # 7) 🔹 작업자 라운드로빈 by job 분배 (모든 워커에게 균등 분배)
-            try:
-                jobs = get_jobs(task_id, headers, org_slug)
-                counts = assign_jobs_round_robin(
-                    jobs=jobs,
-                    headers=headers,
-                    assignees=eligible_assignees,
-                    org_slug=org_slug,
-                )
-                # 사용자별 배분 결과를 로그에 기록 (여러 줄)
-                for name, c in counts.items():
-                    if c > 0:
-                        log_assignment(
-                            task_name, task_id, name, c,
-                            project_name, organization
+            # 이미지 파일만 수집
+            image_files = sorted([
+                f for f in group_dir.glob("*")
+                if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp", ".webp"]
+            ])
+            if not image_files:
+                # 추출기가 STORED ZIP 배치로 바로 저장한 폴더 → ZIP 을 풀어 쓰지 않고 그대로 Task 로
+                zip_paths = sorted(group_dir.glob("*.zip"))
+                if zip_paths and dedup_hamming >= 0:
+                    # ZIP 은 원본 그대로 업로드하므로 프레임을 뺄 수 없음
+                    print(f"⚠️ --dedup_hamming 미적용: {group_dir} (ZIP 배치 폴더, 중복 제외 없이 업로드)")
+                for zip_path in zip_paths:
+                    task_name = zip_path.stem
+                    json_path = group_dir / f"{task_name}.json"
+                    zip_images = read_zip_images(zip_path)
+                    if not zip_images:
+                        continue
+                    run_yolo_and_create_json_parallel(zip_images, json_path, model0, model1)
+                    try:
+                        task_id, rq_id = create_task_with_zip(
+                            task_name, project_id, zip_path, headers, org_slug=org_slug, profile=task_profile,
                         )
-            except Exception as e:
-                print(f"⚠️ 작업자 분배(라운드로빈) 중 오류 발생: {e}")
+                    except Exception as e:
+                        print(f"❌ Task 생성/ZIP 업로드 실패: {task_name} | 에러: {e}")
+                        continue
+                    future = poller.submit(task_id, rq_id=rq_id, upload_bytes=zip_path.stat().st_size)
+                    pending.append((task_name, task_id, json_path, future))
+                    pending = poller.finalize_ready(pending, finalize_batch)
+                continue
 
-            # 8) 산출물(.json / .zip) 삭제
-            try:
-                if json_path.exists():
-                    os.remove(json_path)
-                    print(f"🗑️ Deleted JSON: {json_path}")
-                if zip_path.exists():
-                    os.remove(zip_path)
-                    print(f"🗑️ Deleted ZIP: {zip_path}")
-            except Exception as e:
-                print(f"⚠️ 파일 삭제 중 오류 발생: {e}")
+            # 근접 중복 프레임 제외 → 추론/업로드/어노테이션 물량 감소
+            if dedup_hamming >= 0:
+                total = len(image_files)
+                image_files, dups = split_distinct(image_files, threshold=dedup_hamming)
+                dedup_stats.append({"dir": str(group_dir), "total": total, "kept": len(image_files),
+                                    "duplicates": len(dups), "dup_ratio": round(len(dups) / total, 4)})
+                print(f"🧹 {group_dir.name}: {total} → {len(image_files)}장 (중복 {len(dups)} 제외)")
+
+            # 배치 나누기
+            num_batches = ceil(len(image_files) / batch_size)
+
+            for i in range(num_batches):
+                batch_files = image_files[i * batch_size : (i + 1) * batch_size]
+
+                task_name = f"{group_dir.name}_{i+1:02d}"
+                json_path = group_dir / f"{task_name}.json"
+
+                # 1) YOLO 감지 + COCO JSON 생성
+                run_yolo_and_create_json_parallel(batch_files, json_path, model0, model1)
+
+                # 2~3) Task 생성 + 이미지 업로드 (STORED ZIP 을 요청 본문에서 즉석 생성, 디스크에 ZIP 미작성)
+                try:
+                    task_id, rq_id = create_task_with_images(
+                        task_name, project_id, batch_files, headers,
+                        org_slug=org_slug, as_zip=upload_as_zip, profile=task_profile,
+                    )
+                except Exception as e:
+                    print(f"❌ Task 생성/이미지 업로드 실패: {task_name} | 에러: {e}")
+                    continue
+
+                # 4) 프레임 인덱싱 대기는 폴러에 등록만 하고 다음 배치로 진행
+                upload_bytes = sum(f.stat().st_size for f in batch_files)
+                future = poller.submit(task_id, rq_id=rq_id, upload_bytes=upload_bytes)
+                pending.append((task_name, task_id, json_path, future))
+                pending = poller.finalize_ready(pending, finalize_batch)
+
+        # 남은 배치는 준비 완료 순서와 무관하게 등록 순서대로 마무리
+        poller.finalize_ready(pending, finalize_batch, wait=True)
+
+    if dedup_stats:
+        print("====== 근접 중복 제외 결과 ======")
+        print_dedup_summary(dedup_stats)
 
 # ====== Entry Point ======
 if __name__ == "__main__":
@@ -590,6 +667,14 @@ if __name__ == "__main__":
     parser.add_argument("--labels", type=str, nargs="+", required=True)
     # --assignees 제거!
     parser.add_argument("--exclude_users", type=str, nargs="*", default=[], help="할당에서 제외할 username 목록")
+    parser.add_argument("--upload_mode", choices=["zip", "files"], default="zip",
+                        help="zip: STORED ZIP 스트림 1개로 전송 / files: 이미지별 client_files[i] 로 전송")
+    parser.add_argument("--task_profile", choices=sorted(TASK_PROFILES), default=None,
+                        help="Task 생성 프로파일 (미지정 시 json/task_profiles.json 의 프로젝트 매핑)")
+    parser.add_argument("--balance", choices=["jobs", "frames"], default="jobs",
+                        help="jobs: Job 단위 라운드로빈 / frames: 프레임 수 × 작업자 처리 속도 기준 배분")
+    parser.add_argument("--dedup_hamming", type=int, default=-1,
+                        help="0 이상이면 폴더별 근접 중복 프레임 제외 후 업로드 (dHash Hamming 거리 임계값, 예: 5)")
     args = parser.parse_args()
     
     ORGANIZATION = args.org_name
@@ -608,11 +693,18 @@ if __name__ == "__main__":
     # 프로젝트 생성(중복 라벨 방지)
     project_id = create_project(args.project_name, labels=args.labels, headers=headers, org_slug=org_slug)
 
+    task_profile = get_task_profile(args.project_name, args.task_profile, default_quality=100)
+    print(f"⚙️ Task 생성 프로파일: {task_profile['name']}")
+
     # 본 처리
     exclude_set = set(args.exclude_users or [])
     compress_and_upload_all(
         image_dir, project_id, headers,
         project_name=args.project_name,
         organization=ORGANIZATION, batch_size=100, org_slug=org_slug,
-        exclude_users=exclude_set
+        exclude_users=exclude_set,
+        upload_as_zip=(args.upload_mode == "zip"),
+        balance=args.balance,
+        task_profile=task_profile,
+        dedup_hamming=args.dedup_hamming,
     )
@@ -5,7 +5,6 @@ from pathlib import Path
 import csv
 from datetime import datetime
 import argparse
-import time
 import json
 from typing import List, Dict
 from dotenv import load_dotenv
@@ -13,6 +12,11 @@ from bs4 import BeautifulSoup
 import html
 import re
 
+from cvat_upload import upload_task_data
+from task_profiles import TASK_PROFILES, get_task_profile, task_create_payload, task_data_fields
+from task_waiter import TaskReadinessPoller, extract_rq_id
+from cvat_users import get_user_directory
+from cvat_bulk import BulkJobExecutor
 
 
 # ===========================
@@ -229,43 +233,27 @@ def get_existing_task_names(project_id: int, headers: dict) -> set:
         page += 1
     return names
 
-def create_task_with_zip(name: str, project_id: int, zip_path: str, headers: dict) -> int:
+def create_task_with_zip(name: str, project_id: int, zip_path: str, headers: dict, profile: dict = None) -> tuple:
+    profile = profile or get_task_profile(profile_name="precompressed", default_quality=70)
     task_data = {
         "name": name,
         "project_id": project_id,
         "use_default_project_settings": True,
-        "image_quality": 70,
-        "segment_size": 100
+        **task_create_payload(profile),
     }
     res = requests.post(f"{CVAT_URL}/api/tasks", headers=headers, json=task_data)
     res.raise_for_status()
     task_id = res.json()["id"]
 
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
-
-    with open(zip_path, "rb") as f:
-        files = {"client_files[0]": (os.path.basename(zip_path), f, "application/zip")}
-        data = {
-            "image_quality": 70,
-            "use_zip_chunks": "false",
-            "use_cache": "false",
-            "sorting_method": "lexicographical",
-            "upload_format": "zip",
-        }
-        res = requests.post(f"{CVAT_URL}/api/tasks/{task_id}/data", headers=upload_headers, files=files, data=data)
-        res.raise_for_status()
-    return task_id
-
-def wait_until_task_ready(task_id: int, headers: dict, timeout: int = 60) -> bool:
-    start = time.time()
-    while time.time() - start < timeout:
-        res = requests.get(f"{CVAT_URL}/api/tasks/{task_id}", headers=headers)
-        res.raise_for_status()
-        if res.json().get("size", 0) > 0:
-            return True
-        time.sleep(1)
-    return False
+    data = {
+        **task_data_fields(profile),
+        "sorting_method": "lexicographical",
+        "upload_format": "zip",
+    }
+    # ZIP 파일을 메모리에 올리지 않고 그대로 스트리밍 업로드
+    res = upload_task_data(f"{CVAT_URL}/api/tasks/{task_id}/data", headers, data, zip_path=zip_path)
+    res.raise_for_status()
+    return task_id, extract_rq_id(res)
 
 def get_jobs(task_id: int, headers: dict) -> list:
     res = requests.get(f"{CVAT_URL}/api/jobs?task_id={task_id}", headers=headers)
@@ -273,27 +261,25 @@ def get_jobs(task_id: int, headers: dict) -> list:
     return res.json()["results"]
 
 def get_user_id(username: str, headers: dict) -> int | None:
-    res = requests.get(f"{CVAT_URL}/api/users", headers=headers, params={"search": username})
-    res.raise_for_status()
-    for u in res.json()["results"]:
-        if u["username"] == username:
-            return u["id"]
-    return None
+    return get_user_directory(CVAT_URL, headers).get_id(username)
 
 def assign_jobs_to_one_user(jobs: list, headers: dict, assignee_name: str) -> None:
     uid = get_user_id(assignee_name, headers)
     if not uid:
         print(f"❌ 사용자 '{assignee_name}'를 찾을 수 없습니다.")
         return
+    bulk = BulkJobExecutor(CVAT_URL, headers)
     for job in jobs:
         if not job.get("assignee"):
-            requests.patch(f"{CVAT_URL}/api/jobs/{job['id']}", headers=headers, json={"assignee": uid}).raise_for_status()
+            bulk.patch(job["id"], {"assignee": uid}, label=f"→ {assignee_name}")
+    bulk.run()
 
 def review_jobs(jobs: list, headers: dict) -> None:
-    for job in jobs:
-        ann = requests.get(f"{CVAT_URL}/api/jobs/{job['id']}/annotations", headers=headers).json()
-        if ann.get("shapes"):
-            requests.patch(f"{CVAT_URL}/api/jobs/{job['id']}", headers=headers, json={"stage": "validation", "state": "completed"}).raise_for_status()
+    bulk = BulkJobExecutor(CVAT_URL, headers)
+    for job_id, ann in bulk.fetch([job["id"] for job in jobs], suffix="/annotations").items():
+        if ann and ann.get("shapes"):
+            bulk.patch(job_id, {"stage": "validation", "state": "completed"}, label="→ validation/completed")
+    bulk.run()
 
 def log_assignment(task_name: str, task_id: int, assignee: str, num_jobs: int) -> None:
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -415,6 +401,8 @@ if __name__ == "__main__":
     parser.add_argument("--labels", required=True)
     parser.add_argument("--json_path", required=True)
     parser.add_argument("--print_escaped", action="store_true", help="CVAT textarea용 HTML 이스케이프 JSON 출력")
+    parser.add_argument("--task_profile", choices=sorted(TASK_PROFILES), default=None,
+                        help="Task 생성 프로파일 (미지정 시 json/task_profiles.json 의 프로젝트 매핑)")
 
     args = parser.parse_args()
     label_names = [name.strip() for name in args.labels.split(",")]
@@ -459,22 +447,13 @@ if __name__ == "__main__":
 
         # 7. 태스크 생성 및 할당
         print("📌 태스크 생성 및 작업 할당 시작...")
-        for idx, z in enumerate(sorted(Path(args.zip_dir).rglob("*.zip"))):
-            task_name = f"{z.stem}_keypoint"
-            if task_name in existing:
-                print(f"스킵: {task_name} 이미 존재")
-                continue
-
-            print(f"▶ 태스크 생성 중: {task_name}")
-            try:
-                task_id = create_task_with_zip(task_name, project_id, str(z), headers)
-            except Exception as e:
-                print(f"❌ 태스크 생성 실패: {task_name}, 오류: {e}")
-                continue
-
-            if not wait_until_task_ready(task_id, headers):
+        task_profile = get_task_profile(args.project_name, args.task_profile, default_quality=70)
+        print(f"📌 Task 생성 프로파일: {task_profile['name']}")
+
+        def finalize_task(idx, task_name, task_id, ready):
+            if not ready:
                 print(f"❌ {task_name} 준비 실패")
-                continue
+                return
 
             jobs = get_jobs(task_id, headers)
             if args.assignees:
@@ -485,6 +464,29 @@ if __name__ == "__main__":
             else:
                 print(f"📌 작업자 없음: {task_name}은 미할당 상태")
 
+        # 준비 대기는 폴러가 맡고, 그동안 다음 ZIP 업로드 진행
+        pending = []
+        with TaskReadinessPoller(CVAT_URL, headers) as poller:
+            for idx, z in enumerate(sorted(Path(args.zip_dir).rglob("*.zip"))):
+                task_name = f"{z.stem}_keypoint"
+                if task_name in existing:
+                    print(f"스킵: {task_name} 이미 존재")
+                    continue
+
+                print(f"▶ 태스크 생성 중: {task_name}")
+                try:
+                    task_id, rq_id = create_task_with_zip(task_name, project_id, str(z), headers, profile=task_profile)
+                except Exception as e:
+                    print(f"❌ 태스크 생성 실패: {task_name}, 오류: {e}")
+                    continue
+
+                future = poller.submit(task_id, rq_id=rq_id, upload_bytes=z.stat().st_size)
+                pending.append((idx, task_name, task_id, future))
+
+                pending = poller.finalize_ready(pending, finalize_task)
+
+            poller.finalize_ready(pending, finalize_task, wait=True)
+
         print("모든 작업 완료.")
     except Exception as e:
         print(f"❌ 전체 실행 중 예외 발생: {e}")
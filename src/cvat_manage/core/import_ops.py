@@ -8,6 +8,12 @@ import csv
 from datetime import datetime
 from dotenv import load_dotenv
 
+from cvat_upload import upload_task_data
+from task_profiles import TASK_PROFILES, get_task_profile, task_create_payload, task_data_fields
+from task_waiter import TaskReadinessPoller, extract_rq_id
+from cvat_users import get_user_directory
+from cvat_bulk import BulkJobExecutor
+
 # Load .env
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -63,50 +69,29 @@ def create_project(name, labels, headers):
     res.raise_for_status()
     return res.json()["id"]
 
-def create_task_with_zip(name, project_id, zip_path, headers):
+def create_task_with_zip(name, project_id, zip_path, headers, profile=None):
+    profile = profile or get_task_profile(profile_name="precompressed", default_quality=70)
     task_data = {
         "name": name,
         "project_id": project_id,
-        "image_quality": 70,
-        "segment_size": 100
+        **task_create_payload(profile),
     }
     res = requests.post(f"{CVAT_URL}/api/tasks", headers=headers, json=task_data)
     res.raise_for_status()
     task_id = res.json()["id"]
 
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
-
-    with open(zip_path, "rb") as zip_file:
-        files = {
-            "client_files[0]": (os.path.basename(zip_path), zip_file, "application/zip")
-        }
-        data = {
-            "image_quality": 70,
-            "use_zip_chunks": "false",
-            "use_cache": "false",
-            "sorting_method": "lexicographical",
-            "upload_format": "zip"
-        }
-        upload_url = f"{CVAT_URL}/api/tasks/{task_id}/data"
-        res = requests.post(upload_url, headers=upload_headers, files=files, data=data)
-        res.raise_for_status()
-
-    return task_id
-
-def wait_until_task_ready(task_id, headers, timeout=60):
-    print(f"⏳ 태스크 데이터 로딩 대기 중...")
-    start = time.time()
-    while time.time() - start < timeout:
-        res = requests.get(f"{CVAT_URL}/api/tasks/{task_id}", headers=headers)
-        res.raise_for_status()
-        task = res.json()
-        if task["size"] > 0:
-            print(f"✅ 태스크 데이터 준비 완료 (총 이미지 수: {task['size']})")
-            return True
-        time.sleep(2)
-    print("❌ 태스크 데이터 로딩 시간 초과")
-    return False
+    # ZIP 파일을 메모리에 올리지 않고 그대로 스트리밍 업로드
+    data = {
+        **task_data_fields(profile),
+        "sorting_method": "lexicographical",
+        "upload_format": "zip"
+    }
+    upload_url = f"{CVAT_URL}/api/tasks/{task_id}/data"
+    res = upload_task_data(upload_url, headers, data, zip_path=zip_path)
+    res.raise_for_status()
+
+    # rq_id 로 서버 측 데이터 처리 진행 상황 추적
+    return task_id, extract_rq_id(res)
 
 def get_jobs(task_id, headers):
     res = requests.get(f"{CVAT_URL}/api/jobs?task_id={task_id}", headers=headers)
@@ -114,13 +99,8 @@ def get_jobs(task_id, headers):
     return res.json()["results"]
 
 def get_user_id(username, headers):
-    res = requests.get(f"{CVAT_URL}/api/users", headers=headers, params={"search": username})
-    res.raise_for_status()
-    users = res.json()["results"]
-    for user in users:
-        if user["username"] == username:
-            return user["id"]
-    return None
+    # 조직별 사용자 디렉터리(실행당 1회 조회 + 디스크 캐시)에서 조회
+    return get_user_directory(CVAT_URL, headers).get_id(username)
 
 def assign_jobs_to_one_user(jobs, headers, assignee_name):
     user_id = get_user_id(assignee_name, headers)
@@ -130,36 +110,24 @@ def assign_jobs_to_one_user(jobs, headers, assignee_name):
 
     print(f"👥 이 태스크의 모든 Job을 '{assignee_name}'에게 할당합니다")
 
+    bulk = BulkJobExecutor(CVAT_URL, headers)
     for job in jobs:
         job_id = job["id"]
         current_assignee = job.get("assignee")
         if current_assignee:
             print(f"👤 Job {job_id}은 이미 '{current_assignee['username']}'에게 할당되어 있습니다. 건너뜁니다.")
             continue
-
-        data = {"assignee": user_id}
-        try:
-            res = requests.patch(f"{CVAT_URL}/api/jobs/{job_id}", headers=headers, json=data)
-            res.raise_for_status()
-            print(f"✅ Job {job_id} → '{assignee_name}'에게 할당 완료")
-        except requests.HTTPError as e:
-            print(f"⚠️ Job {job_id} → '{assignee_name}' 할당 실패: {e.response.status_code} - {e.response.text}")
+        bulk.patch(job_id, {"assignee": user_id}, label=f"→ '{assignee_name}'에게 할당 완료")
+    bulk.run()
 
 def review_jobs(jobs, headers):
-    for job in jobs:
-        job_id = job["id"]
-        ann_url = f"{CVAT_URL}/api/jobs/{job_id}/annotations"
-        res = requests.get(ann_url, headers=headers)
-        res.raise_for_status()
-        ann = res.json()
-        if len(ann.get("shapes", [])) > 0:
-            patch_data = {
-                "stage": "validation",
-                "state": "completed"
-            }
-            res = requests.patch(f"{CVAT_URL}/api/jobs/{job_id}", headers=headers, json=patch_data)
-            res.raise_for_status()
-            print(f"🔍 Job {job_id} → 검수 완료 전환")
+    # 어노테이션 조회와 상태 전환 모두 병렬 처리
+    bulk = BulkJobExecutor(CVAT_URL, headers)
+    annotations = bulk.fetch([job["id"] for job in jobs], suffix="/annotations")
+    for job_id, ann in annotations.items():
+        if ann and len(ann.get("shapes", [])) > 0:
+            bulk.patch(job_id, {"stage": "validation", "state": "completed"}, label="→ 검수 완료 전환")
+    bulk.run()
 
 def get_user_display_name(username):
     return os.getenv(f"USERMAP_{username}", username)
@@ -184,6 +152,8 @@ if __name__ == "__main__":
     parser.add_argument("--assignees", type=str, nargs="+", required=True)
     parser.add_argument("--project_name", type=str, required=True)
     parser.add_argument("--labels", type=str, nargs="+", required=True)
+    parser.add_argument("--task_profile", choices=sorted(TASK_PROFILES), default=None,
+                        help="Task 생성 프로파일 (미지정 시 json/task_profiles.json 의 프로젝트 매핑)")
     args = parser.parse_args()
 
     org_id, org_slug = get_or_create_organization(args.org_name)
@@ -193,23 +163,19 @@ if __name__ == "__main__":
     project_id = create_project(args.project_name, labels=args.labels, headers=headers)
     print(f"📁 프로젝트 생성: {project_id}")
 
+    task_profile = get_task_profile(args.project_name, args.task_profile, default_quality=70)
+    print(f"⚙️ Task 생성 프로파일: {task_profile['name']}")
+
 
     zip_files = sorted(Path(args.zip_dir).rglob("*.zip"))
     assignees = args.assignees
     num_users = len(assignees)
 
-    for i, zip_file in enumerate(zip_files):
-        task_name = zip_file.stem
-        print(f"\n🆕 처리 중: {task_name} ({zip_file.name})")
+    def finalize_task(i, task_name, task_id, ready):
+        if not ready:
+            print(f"🚫 [{task_name}] 어노테이션을 실행하지 않습니다.")
+            return
 
-        task_id = create_task_with_zip(task_name, project_id, str(zip_file), headers=headers)
-        print(f"🗂️ 태스크 생성 및 ZIP 업로드 완료: {task_id}")
-
-        if not wait_until_task_ready(task_id, headers=headers):
-            print("🚫 어노테이션을 실행하지 않습니다.")
-            continue
-
-        time.sleep(2)
         jobs = get_jobs(task_id, headers=headers)
 
         # ⬇️ 태스크 단위로 사용자 한 명 할당
@@ -221,3 +187,21 @@ if __name__ == "__main__":
 
         time.sleep(2)
         review_jobs(jobs, headers=headers)
+
+    # 업로드는 순서대로 진행하고, 준비 대기는 폴러에 맡겨 다음 업로드와 겹치게 처리
+    pending = []
+    with TaskReadinessPoller(CVAT_URL, headers) as poller:
+        for i, zip_file in enumerate(zip_files):
+            task_name = zip_file.stem
+            print(f"\n🆕 처리 중: {task_name} ({zip_file.name})")
+
+            task_id, rq_id = create_task_with_zip(task_name, project_id, str(zip_file), headers=headers, profile=task_profile)
+            print(f"🗂️ 태스크 생성 및 ZIP 업로드 완료: {task_id}")
+
+            future = poller.submit(task_id, rq_id=rq_id, upload_bytes=zip_file.stat().st_size)
+            pending.append((i, task_name, task_id, future))
+
+            # 이미 준비된 태스크부터 후처리
+            pending = poller.finalize_ready(pending, finalize_task)
+
+        poller.finalize_ready(pending, finalize_task, wait=True)
@@ -0,0 +1,110 @@
+"""
+CVAT Task 생성 프로파일
+
+- precompressed : 기존 동작. 생성 시점에 모든 chunk 를 미리 압축 (use_cache=false, use_zip_chunks=false)
+                  → 업로드 후 준비 대기(task_waiter)가 오래 걸림
+- lazy          : chunk 를 요청 시점에 생성·캐시 (use_cache=true), 원본 이미지는 zip chunk 로 제공
+                  → Task 생성은 거의 즉시 끝나고, 첫 프레임 로딩 때 chunk 생성 비용이 발생
+- lazy_large    : lazy + segment_size 300 (Job 수 감소, Job 당 프레임 증가)
+
+프로젝트별 선택
+    json/task_profiles.json (또는 .env TASK_PROFILE_MAP 경로)
+    {
+      "default": "precompressed",
+      "projects": {"labeling_*": "lazy", "keypoint_demo": "lazy_large"}
+    }
+    - 프로젝트 이름은 fnmatch 패턴으로 매칭 (먼저 일치한 항목 사용)
+    - .env TASK_PROFILE 이 있으면 default 를 덮어씀, CLI --task_profile 이 최우선
+"""
+
+import json
+import os
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Dict, Optional
+
+TASK_PROFILES: Dict[str, Dict[str, object]] = {
+    "precompressed": {
+        "use_cache": False,
+        "use_zip_chunks": False,
+        "image_quality": None,   # None → 각 importer 의 기존 품질값 사용
+        "segment_size": 100,
+        "chunk_size": None,      # None → 서버 기본값
+    },
+    "lazy": {
+        "use_cache": True,
+        "use_zip_chunks": True,
+        "image_quality": 70,
+        "segment_size": 100,
+        "chunk_size": 36,
+    },
+    "lazy_large": {
+        "use_cache": True,
+        "use_zip_chunks": True,
+        "image_quality": 70,
+        "segment_size": 300,
+        "chunk_size": 36,
+    },
+}
+
+DEFAULT_PROFILE = "precompressed"
+DEFAULT_PROFILE_MAP = Path(__file__).resolve().parents[3] / "json" / "task_profiles.json"
+
+
+def load_profile_map(path: Optional[str] = None) -> dict:
+    """프로젝트 → 프로파일 매핑 JSON 로드 (없으면 빈 매핑)"""
+    map_path = Path(path or os.getenv("TASK_PROFILE_MAP") or DEFAULT_PROFILE_MAP)
+    if not map_path.exists():
+        return {}
+    with open(map_path, "r", encoding="utf-8") as f:
+        return json.load(f) or {}
+
+
+def get_task_profile(
+    project_name: Optional[str] = None,
+    profile_name: Optional[str] = None,
+    default_quality: int = 70,
+    map_path: Optional[str] = None,
+) -> Dict[str, object]:
+    """
+    프로파일 결정 순서: profile_name(CLI) → 매핑 JSON 의 프로젝트 패턴 → .env TASK_PROFILE → 매핑 default → precompressed
+    반환값은 복사본이며 "name" 키와 실제 image_quality 가 채워져 있음
+    """
+    name = profile_name
+    if not name:
+        mapping = load_profile_map(map_path)
+        if project_name:
+            for pattern, prof in (mapping.get("projects") or {}).items():
+                if fnmatch(project_name, pattern):
+                    name = prof
+                    break
+        name = name or os.getenv("TASK_PROFILE") or mapping.get("default") or DEFAULT_PROFILE
+
+    if name not in TASK_PROFILES:
+        raise ValueError(f"알 수 없는 Task 프로파일: {name} (가능: {', '.join(TASK_PROFILES)})")
+
+    profile = dict(TASK_PROFILES[name])
+    profile["name"] = name
+    if profile["image_quality"] is None:
+        profile["image_quality"] = default_quality
+    return profile
+
+
+def task_create_payload(profile: Dict[str, object]) -> Dict[str, object]:
+    """POST /api/tasks 에 들어갈 프로파일 필드"""
+    return {
+        "image_quality": profile["image_quality"],
+        "segment_size": profile["segment_size"],
+    }
+
+
+def task_data_fields(profile: Dict[str, object]) -> Dict[str, object]:
+    """POST /api/tasks/{id}/data 에 들어갈 프로파일 필드"""
+    fields = {
+        "image_quality": profile["image_quality"],
+        "use_zip_chunks": "true" if profile["use_zip_chunks"] else "false",
+        "use_cache": "true" if profile["use_cache"] else "false",
+    }
+    if profile.get("chunk_size"):
+        fields["chunk_size"] = profile["chunk_size"]
+    return fields
@@ -0,0 +1,215 @@
+"""
+CVAT Task 데이터 준비(프레임 인덱싱) 대기 헬퍼
+
+- 업로드 응답의 rq_id 를 /api/requests/{rq_id} 로 추적 (finished / failed 즉시 판별)
+  · /api/requests 가 없는 구버전 서버는 자동으로 /api/tasks/{id} 의 size>0 확인으로 대체
+- 지수 백오프 + jitter 로 폴링 간격 조절 (작은 업로드는 빨리, 큰 업로드는 드물게)
+- 타임아웃은 업로드 크기에 비례 (readiness_timeout)
+- TaskReadinessPoller: 폴러 스레드 1개로 여러 Task 의 대기를 동시에 처리 (Future 반환)
+  · finalize_ready: 준비가 끝난 Task 만 후처리, 한 Task 의 오류는 로그만 남기고 나머지 계속
+
+사용 예)
+    with TaskReadinessPoller(CVAT_URL, headers, org_slug) as poller:
+        pending = []
+        for ...:
+            fut = poller.submit(task_id, rq_id=rq_id, upload_bytes=nbytes)
+            pending.append((task_name, task_id, fut))
+            pending = poller.finalize_ready(pending, finalize)   # finalize(task_name, task_id, ready)
+        poller.finalize_ready(pending, finalize, wait=True)
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import requests
+
+# 타임아웃 = 기본값 + 업로드 바이트 / 예상 처리 속도 (상한 있음)
+BASE_TIMEOUT_SEC = 60.0
+PROCESS_BYTES_PER_SEC = 5 * 1024 * 1024
+MAX_TIMEOUT_SEC = 3 * 3600.0
+
+INITIAL_DELAY_SEC = 0.5
+MAX_DELAY_SEC = 15.0
+
+
+def readiness_timeout(upload_bytes: int = 0) -> float:
+    """업로드 크기 기반 대기 한도(초)"""
+    return min(MAX_TIMEOUT_SEC, BASE_TIMEOUT_SEC + max(0, upload_bytes) / PROCESS_BYTES_PER_SEC)
+
+
+def extract_rq_id(res) -> Optional[str]:
+    """POST /api/tasks/{id}/data 응답(202)에서 rq_id 추출 (구버전은 None)"""
+    try:
+        return (res.json() or {}).get("rq_id")
+    except Exception:
+        return None
+
+
+class _PendingTask:
+    def __init__(self, task_id, rq_id, deadline):
+        self.task_id = task_id
+        self.rq_id = rq_id
+        self.deadline = deadline
+        self.delay = INITIAL_DELAY_SEC
+        self.polls = 0
+        self.future: Future = Future()
+
+
+class TaskReadinessPoller:
+    """폴러 스레드 1개가 여러 Task 의 준비 상태를 번갈아 확인"""
+
+    def __init__(self, base_url: str, headers: dict, org_slug: str = "", verbose: bool = True):
+        self.base_url = base_url.rstrip("/")
+        self.headers = headers
+        self.org_slug = org_slug
+        self.verbose = verbose
+        self._session = requests.Session()
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="cvat-task-poller", daemon=True)
+        self._thread.start()
+
+    # ---- 공개 API ----
+    def submit(self, task_id: int, rq_id: Optional[str] = None, upload_bytes: int = 0,
+               timeout: Optional[float] = None) -> Future:
+        """대기 등록. Future.result() → True(준비 완료) / False(실패·시간 초과)"""
+        limit = timeout if timeout is not None else readiness_timeout(upload_bytes)
+        item = _PendingTask(task_id, rq_id, time.monotonic() + limit)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("이미 종료된 poller 입니다.")
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), item))
+            self._cond.notify()
+        return item.future
+
+    def wait(self, task_id: int, rq_id: Optional[str] = None, upload_bytes: int = 0,
+             timeout: Optional[float] = None) -> bool:
+        return self.submit(task_id, rq_id, upload_bytes, timeout).result()
+
+    @staticmethod
+    def finalize_ready(pending: List[tuple], finalize: Callable[..., None], wait: bool = False) -> List[tuple]:
+        """
+        pending 의 각 항목은 (인자..., Future). 준비가 끝난 항목은 finalize(*인자, ready) 로 후처리하고 남은 항목 반환
+        - wait=True 면 남은 항목을 등록 순서대로 끝까지 기다려 모두 처리 (빈 리스트 반환)
+        - 상태 조회 예외(Future 에 저장됨)는 해당 Task 만 ready=False 로, finalize 예외는 로그만 남기고 다음 Task 계속
+        """
+        remaining = []
+        for item in pending:
+            *args, future = item
+            if not wait and not future.done():
+                remaining.append(item)
+                continue
+            try:
+                ready = future.result()
+            except Exception as e:
+                print(f"❌ Task 준비 상태 확인 오류 ({', '.join(map(str, args))}): {type(e).__name__}: {e}")
+                ready = False
+            try:
+                finalize(*args, ready)
+            except Exception as e:
+                print(f"❌ Task 후처리 오류 ({', '.join(map(str, args))}): {type(e).__name__}: {e}")
+        return remaining
+
+    def close(self):
+        """남은 대기가 모두 끝날 때까지 기다린 뒤 폴러 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- 내부 ----
+    def _params(self):
+        return {"org": self.org_slug} if self.org_slug else None
+
+    def _get(self, path):
+        return self._session.get(f"{self.base_url}{path}", headers=self.headers, params=self._params(), timeout=30)
+
+    def _task_size(self, task_id) -> int:
+        res = self._get(f"/api/tasks/{task_id}")
+        res.raise_for_status()
+        return int(res.json().get("size") or 0)
+
+    def _check(self, item: _PendingTask) -> Optional[bool]:
+        """True/False = 종료, None = 계속 대기"""
+        if item.rq_id:
+            res = self._get(f"/api/requests/{item.rq_id}")
+            if res.status_code in (404, 405):
+                # /api/requests 미지원 서버 → size 확인 방식으로 전환
+                item.rq_id = None
+            else:
+                res.raise_for_status()
+                info = res.json()
+                status = (info.get("status") or "").lower()
+                if status == "failed":
+                    print(f"❌ Task {item.task_id} 데이터 처리 실패: {info.get('message')}")
+                    return False
+                if status != "finished":
+                    return None
+        return True if self._task_size(item.task_id) > 0 else None
+
+    def _finish(self, item: _PendingTask, ok: bool):
+        if self.verbose:
+            mark = "✅" if ok else "❌"
+            print(f"{mark} Task {item.task_id} 준비 {'완료' if ok else '실패/시간 초과'} (폴링 {item.polls}회)")
+        item.future.set_result(ok)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                # 가장 이른 확인 시각까지 대기 (close 후에도 남은 Task 는 끝까지 처리)
+                while True:
+                    if not self._heap:
+                        if self._closed:
+                            return
+                        self._cond.wait()
+                        continue
+                    wait = self._heap[0][0] - time.monotonic()
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                _, _, item = heapq.heappop(self._heap)
+
+            item.polls += 1
+            try:
+                result = self._check(item)
+            except requests.RequestException as e:
+                print(f"⚠️ Task {item.task_id} 상태 조회 오류: {e}")
+                result = None
+            except Exception as e:
+                item.future.set_exception(e)
+                continue
+
+            if result is not None:
+                self._finish(item, result)
+                continue
+            if time.monotonic() >= item.deadline:
+                self._finish(item, False)
+                continue
+
+            # 지수 백오프 + jitter
+            item.delay = min(MAX_DELAY_SEC, item.delay * 2)
+            next_at = min(item.deadline, time.monotonic() + item.delay * random.uniform(0.5, 1.0))
+            with self._cond:
+                heapq.heappush(self._heap, (next_at, next(self._seq), item))
+
+
+def wait_for_task(base_url: str, task_id: int, headers: dict, org_slug: str = "",
+                  rq_id: Optional[str] = None, upload_bytes: int = 0,
+                  timeout: Optional[float] = None) -> bool:
+    """단일 Task 대기 (기존 wait_until_task_ready 대체용)"""
+    with TaskReadinessPoller(base_url, headers, org_slug, verbose=False) as poller:
+        return poller.wait(task_id, rq_id=rq_id, upload_bytes=upload_bytes, timeout=timeout)
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+프레임 추출 벤치마크
+
+서브커맨드
+  access : 샘플링 간격별로 프레임 접근 방식(seek / sequential / auto) 비교
+           - seek       : 매 프레임 cap.set(POS_FRAMES) 후 read (기존 방식)
+           - sequential : grab() 으로 건너뛰고 필요한 프레임만 retrieve()
+           - auto       : 간격이 GOP 이하이면 sequential, 크면 seek (video_frames.iter_frames 기본값)
+  warmup : 태스크마다 모델을 새로 로드하는 방식(per_task) vs 워커당 1회 로드(persistent) 비교
+           - per_task   : 새 spawn 프로세스에서 YOLO 로드 + 첫 배치 추론 (기존 동작의 태스크당 고정 비용)
+           - persistent : init_person_worker 로 미리 로드한 워커에서 배치 추론만
+  seconds: 단일 패스 후보 규칙(video_frames.is_second_start)이 fps 별로 초마다 정확히 1프레임을 고르는지 확인
+           (--video 를 주면 실제 영상을 grab 으로 훑어 같은 규칙으로 확인, 어긋나면 종료 코드 1)
+
+예)
+    python benchmark_extract.py access --video_dir /data/videos --every 1 5 30 150 900 --max_frames 9000
+    python benchmark_extract.py warmup --device 0 --repeats 5
+    python benchmark_extract.py seconds --fps 23.976 29.97 59.94 --seconds 600
+
+결과는 ASSIGN_LOG_DIR(기본 ./logs) 아래 CSV 로 저장됩니다.
+"""
+
+import os
+import csv
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+from multiprocessing import get_context
+
+import cv2
+from dotenv import load_dotenv
+
+from person_detect import PERSON_BATCH_SIZE, init_person_worker, load_model, warm_up
+from video_frames import DEFAULT_GOP_FRAMES, estimate_gop, is_second_start, iter_frames
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+LOG_DIR = Path(os.getenv("ASSIGN_LOG_DIR", "./logs"))
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv")
+
+
+def _list_videos(video_dir, limit):
+    videos = sorted(p for p in Path(video_dir).rglob("*") if p.suffix.lower() in VIDEO_EXTS)
+    return videos[:limit] if limit else videos
+
+
+def _write_csv(rows, prefix):
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = LOG_DIR / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"📄 결과 저장: {out_path}")
+
+
+# =============================
+# access: 프레임 접근 방식 비교
+# =============================
+def bench_access(args):
+    videos = _list_videos(args.video_dir, args.num_videos)
+    if not videos:
+        raise SystemExit(f"비디오가 없습니다: {args.video_dir}")
+
+    strategies = {
+        "seek": 0,                      # 항상 seek
+        "sequential": float("inf"),     # 항상 grab 으로 전진
+        "auto": None,                   # GOP 기준 자동
+    }
+    rows = []
+    for video in videos:
+        cap = cv2.VideoCapture(str(video))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+        span = min(total, args.max_frames) if args.max_frames else total
+        gop = estimate_gop(str(video))
+        print(f"🎬 {video.name} | {total} frames @ {fps:.2f}fps | GOP≈{gop} | 측정 구간 {span} frames")
+
+        for every in args.every:
+            indices = list(range(0, span, every))
+            for name in args.strategies:
+                threshold = strategies[name]
+                stats = {}
+                t = time.perf_counter()
+                n = sum(1 for _ in iter_frames(
+                    str(video), indices,
+                    seek_threshold=gop if threshold is None else threshold,
+                    cursor_stats=stats,
+                ))
+                elapsed = time.perf_counter() - t
+                rows.append({
+                    "video": video.name, "fps": round(fps, 2), "gop": gop, "every": every,
+                    "strategy": name, "frames": n, "sec": round(elapsed, 3),
+                    "ms_per_frame": round(elapsed * 1000 / max(1, n), 2), **stats,
+                })
+                print(f"   every={every:<5} {name:<10} {n:>6} frames  {elapsed:7.2f}s  ({rows[-1]['ms_per_frame']} ms/frame)")
+
+    _write_csv(rows, "extract_access_benchmark")
+
+
+# =============================
+# warmup: 모델 로드/워밍업 고정 비용
+# =============================
+def _cold_task(weights, device_id, batch, imgsz):
+    """새 프로세스에서 로드 + 첫 배치 (워밍업 없이 첫 추론이 곧 워밍업)"""
+    t = time.perf_counter()
+    model = load_model(weights, device_id, warmup=False)
+    t_load = time.perf_counter() - t
+    t = time.perf_counter()
+    warm_up(model, device_id, batch, imgsz)
+    return t_load, time.perf_counter() - t
+
+
+def _warm_task(weights, device_id, batch, imgsz):
+    """이미 로드된 워커에서 배치 1회"""
+    model = load_model(weights, device_id)
+    t = time.perf_counter()
+    warm_up(model, device_id, batch, imgsz)
+    return 0.0, time.perf_counter() - t
+
+
+def bench_warmup(args):
+    ctx = get_context("spawn")
+    task_args = (args.weights, args.device, args.batch, args.imgsz)
+    rows = []
+
+    def record(mode, rep, wall, load_sec, infer_sec):
+        rows.append({"mode": mode, "repeat": rep, "device": args.device, "batch": args.batch,
+                     "wall_sec": round(wall, 3), "load_sec": round(load_sec, 3), "infer_sec": round(infer_sec, 3)})
+        print(f"   {mode:<10} #{rep}  wall {wall:6.2f}s | load {load_sec:6.2f}s | infer {infer_sec:6.3f}s")
+
+    print(f"🧪 per_task: 태스크마다 새 프로세스에서 {args.weights} 로드")
+    for rep in range(args.repeats):
+        t = time.perf_counter()
+        with ctx.Pool(1) as pool:
+            load_sec, infer_sec = pool.apply(_cold_task, task_args)
+        record("per_task", rep, time.perf_counter() - t, load_sec, infer_sec)
+
+    print("🧪 persistent: init_person_worker 로 워커 시작 시 1회 로드")
+    t = time.perf_counter()
+    with ctx.Pool(1, initializer=init_person_worker, initargs=(args.weights, args.device)) as pool:
+        pool.apply(os.getpid)   # initializer 완료 대기
+        record("startup", 0, time.perf_counter() - t, 0.0, 0.0)
+        for rep in range(args.repeats):
+            t = time.perf_counter()
+            load_sec, infer_sec = pool.apply(_warm_task, task_args)
+            record("persistent", rep, time.perf_counter() - t, load_sec, infer_sec)
+
+    per_task = [r["wall_sec"] for r in rows if r["mode"] == "per_task"]
+    persistent = [r["wall_sec"] for r in rows if r["mode"] == "persistent"]
+    if per_task and persistent:
+        saved = sum(per_task) / len(per_task) - sum(persistent) / len(persistent)
+        print(f"📊 태스크당 절감: {saved:.2f}s (per_task 평균 {sum(per_task) / len(per_task):.2f}s)")
+    _write_csv(rows, "extract_warmup_benchmark")
+
+
+# =============================
+# seconds: 단일 패스 후보 프레임 (초당 1프레임) 확인
+# =============================
+def _second_counts(frame_indices, fps):
+    counts = {}
+    for idx in frame_indices:
+        if is_second_start(idx, fps):
+            sec = int(idx / fps)
+            counts[sec] = counts.get(sec, 0) + 1
+    return counts
+
+
+def check_seconds(args):
+    cases = []
+    for fps in args.fps:
+        cases.append((f"{fps}fps", fps, range(int(args.seconds * fps))))
+    for video in args.video:
+        cap = cv2.VideoCapture(str(video))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        n = 0
+        while cap.grab():
+            n += 1
+        cap.release()
+        cases.append((Path(video).name, fps, range(n)))
+
+    failed = False
+    for name, fps, indices in cases:
+        expected = int((len(indices) - 1) / fps) + 1 if len(indices) and fps > 0 else 0
+        counts = _second_counts(indices, fps)
+        bad = [s for s in range(expected) if counts.get(s, 0) != 1]
+        ok = not bad and len(counts) == expected
+        failed |= not ok
+        print(f"{'✅' if ok else '❌'} {name}: {len(indices)} frames @ {fps:.3f}fps → 후보 {sum(counts.values())} / 초 {expected}"
+              + (f" (어긋난 초 예: {bad[:5]})" if bad else ""))
+    if failed:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프레임 추출 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("access", help="샘플링 간격별 seek / sequential / auto 비교")
+    p.add_argument("--video_dir", required=True)
+    p.add_argument("--num_videos", type=int, default=0, help="측정할 비디오 수 (0=전체)")
+    p.add_argument("--every", type=int, nargs="+", default=[1, 5, 30, 150, 900], help="샘플링 간격(프레임)")
+    p.add_argument("--max_frames", type=int, default=9000, help="비디오당 측정 구간 (0=전체)")
+    p.add_argument("--strategies", nargs="+", default=["seek", "sequential", "auto"],
+                   choices=["seek", "sequential", "auto"])
+    p.set_defaults(func=bench_access)
+
+    p = sub.add_parser("warmup", help="태스크당 모델 로드 vs 워커당 1회 로드 비교")
+    p.add_argument("--weights", default=os.getenv("YOLO_WEIGHTS", "yolov8n.pt"))
+    p.add_argument("--device", type=int, default=0, help="GPU ID (-1=CPU)")
+    p.add_argument("--batch", type=int, default=PERSON_BATCH_SIZE)
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--repeats", type=int, default=5)
+    p.set_defaults(func=bench_warmup)
+
+    p = sub.add_parser("seconds", help="초당 후보 1프레임 규칙 확인 (정수가 아닌 fps 포함)")
+    p.add_argument("--fps", type=float, nargs="*", default=[23.976, 25.0, 29.97, 30.0, 59.94])
+    p.add_argument("--seconds", type=int, default=600, help="fps 별 확인할 길이(초)")
+    p.add_argument("--video", nargs="*", default=[], help="실제 영상으로도 확인")
+    p.set_defaults(func=check_seconds)
+
+    args = parser.parse_args()
+    print(f"ℹ️ 기본 GOP(ffprobe 실패 시): {DEFAULT_GOP_FRAMES}")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+사람 밀도 구간 탐색 (NumPy 누적합)
+
+- 초별 person 카운트 배열 → 누적합 한 번으로 모든 시작 초의 윈도우 합을 벡터 연산으로 계산
+- 합이 큰 순서로, 서로 겹치지 않는 윈도우를 최대 k 개 선택 (동점이면 앞 구간 우선 = 기존 prefix-sum 탐색과 동일)
+- 하루(86,400초) 길이 녹화도 수백 µs 내
+
+사용 예)
+    counts = counts_array(person_count_by_sec, base_sec, total_secs)
+    for start, total in top_windows(counts, window_len=900, k=2):
+        ...   # [start, start + 900) 초 구간, person 합 total
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+def counts_array(count_by_sec: Dict[int, int], base_sec: int, total_secs: int) -> np.ndarray:
+    """{전역 초: 카운트} → 길이 total_secs 의 로컬(base_sec 기준) 배열"""
+    counts = np.zeros(max(0, total_secs), dtype=np.int64)
+    for s, c in count_by_sec.items():
+        local = s - base_sec
+        if 0 <= local < total_secs:
+            counts[local] += c
+    return counts
+
+
+def window_sums(counts: np.ndarray, window_len: int) -> np.ndarray:
+    """시작 초 i 별 counts[i:i+window_len] 합 (길이 n - window_len + 1)"""
+    counts = np.asarray(counts, dtype=np.int64)
+    window_len = max(1, min(int(window_len), len(counts)))
+    if len(counts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    csum = np.concatenate(([0], np.cumsum(counts)))
+    return csum[window_len:] - csum[:-window_len]
+
+
+def top_windows(counts: np.ndarray, window_len: int, k: int = 1) -> List[Tuple[int, int]]:
+    """
+    서로 겹치지 않는 윈도우를 합이 큰 순서로 최대 k 개 → [(시작 초, 합), ...] (시작 초 오름차순)
+    - 첫 윈도우는 항상 반환 (모두 0 이면 시작 0), 두 번째부터는 합이 0 보다 큰 것만
+    """
+    sums = window_sums(counts, window_len)
+    if len(sums) == 0:
+        return []
+    window_len = max(1, min(int(window_len), len(counts)))
+    avail = sums.astype(np.int64, copy=True)
+    picked = []
+    for n in range(max(1, k)):
+        i = int(np.argmax(avail))      # 최댓값 중 가장 앞
+        if avail[i] < 0 or (n > 0 and avail[i] <= 0):
+            break
+        picked.append((i, int(sums[i])))
+        # i 와 겹치는 시작 초 [i - w + 1, i + w - 1] 제외
+        avail[max(0, i - window_len + 1):i + window_len] = -1
+    return sorted(picked)
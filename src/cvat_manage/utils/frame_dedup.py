@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+근접 중복 프레임 제거 (dHash + Hamming 거리, 밴드 인덱스)
+
+배경
+- 고정 카메라에서 균일 간격(UNIFORM_FRAMES_PER_SEC)으로 추출하면 거의 같은 프레임이 수천 장
+  → 오토라벨링 추론 / 업로드 / 어노테이션 물량만 늘어남
+동작
+- 프레임마다 dHash(기본 8x8 = 64bit) 계산
+- 이미 남긴 프레임 중 Hamming 거리 ≤ threshold 인 것이 있으면 중복
+- 최근접 탐색은 multi-index hashing: 해시를 (threshold + 1) 개 밴드로 나누면
+  거리 ≤ threshold 인 두 해시는 최소 한 밴드가 완전히 같음(비둘기집) → 밴드 값 사전으로 후보만 비교
+- 비교 범위는 폴더(= 영상) 단위, 파일명 순서대로 처음 나온 프레임을 남김
+
+사용 예)
+    python frame_dedup.py --root /data/processed_data --threshold 5            # 리포트만
+    python frame_dedup.py --root /data/processed_data --threshold 5 --delete   # 중복 삭제
+
+    kept, dups = split_distinct(image_paths)   # 코드에서 (파일은 건드리지 않음)
+    stats = dedup_dir(save_dir, delete=True)   # 추출 직후 폴더 정리
+
+.env
+    DEDUP_HAMMING=5       # Hamming 거리 임계값 (0 = 완전히 같은 해시만)
+    DEDUP_HASH_SIZE=8     # dHash 한 변 크기 (8 → 64bit)
+"""
+
+import os
+import argparse
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+from dotenv import load_dotenv
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+DEDUP_HAMMING = int(os.getenv("DEDUP_HAMMING", "5"))
+DEDUP_HASH_SIZE = int(os.getenv("DEDUP_HASH_SIZE", "8"))
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def dhash(image, hash_size: int = DEDUP_HASH_SIZE) -> Optional[int]:
+    """BGR 배열 또는 파일 경로 → dHash 정수 (읽기 실패 시 None)"""
+    if isinstance(image, (str, Path)):
+        # 9x8 로 줄일 것이므로 JPEG 를 1/8 크기로 디코딩 (전체 디코딩 대비 수 배 빠름)
+        image = cv2.imread(str(image), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+        if image is None:
+            return None
+    elif image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for b in bits:
+        value = (value << 1) | int(b)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class HashIndex:
+    """
+    Hamming 거리 ≤ threshold 이웃 탐색용 밴드 인덱스
+    - add(h) 로 남긴 해시를 등록, find(h) 로 임계값 이내의 등록 해시가 있는지 확인
+    """
+
+    def __init__(self, threshold: int = DEDUP_HAMMING, bits: int = DEDUP_HASH_SIZE * DEDUP_HASH_SIZE):
+        self.threshold = max(0, threshold)
+        self.bits = bits
+        n_bands = min(bits, self.threshold + 1)
+        # 비트를 n_bands 개 구간으로 (앞 구간이 1비트씩 더 길 수 있음)
+        base, extra = divmod(bits, n_bands)
+        self.bands: List[Tuple[int, int]] = []
+        shift = bits
+        for i in range(n_bands):
+            width = base + (1 if i < extra else 0)
+            shift -= width
+            self.bands.append((shift, (1 << width) - 1))
+        self.tables: List[Dict[int, List[int]]] = [{} for _ in self.bands]
+
+    def _keys(self, h: int):
+        return [(h >> shift) & mask for shift, mask in self.bands]
+
+    def find(self, h: int) -> Optional[int]:
+        """임계값 이내의 등록 해시 하나 반환 (없으면 None)"""
+        seen = set()
+        for table, key in zip(self.tables, self._keys(h)):
+            for cand in table.get(key, ()):
+                if cand in seen:
+                    continue
+                seen.add(cand)
+                if hamming(h, cand) <= self.threshold:
+                    return cand
+        return None
+
+    def add(self, h: int):
+        for table, key in zip(self.tables, self._keys(h)):
+            table.setdefault(key, []).append(h)
+
+
+def split_distinct(paths: Sequence[Path], threshold: int = DEDUP_HAMMING,
+                   hash_size: int = DEDUP_HASH_SIZE) -> Tuple[List[Path], List[Path]]:
+    """paths(순서 유지) → (남길 파일, 중복 파일). 해시 계산 실패 파일은 남김"""
+    index = HashIndex(threshold, hash_size * hash_size)
+    kept, dups = [], []
+    for p in paths:
+        h = dhash(p, hash_size)
+        if h is None:
+            kept.append(p)
+            continue
+        if index.find(h) is not None:
+            dups.append(p)
+            continue
+        index.add(h)
+        kept.append(p)
+    return kept, dups
+
+
+def list_images(folder: Path) -> List[Path]:
+    return sorted(f for f in Path(folder).iterdir() if f.is_file() and f.suffix.lower() in IMAGE_EXTS)
+
+
+def dedup_dir(folder, threshold: int = DEDUP_HAMMING, delete: bool = False,
+              hash_size: int = DEDUP_HASH_SIZE) -> dict:
+    """폴더 하나(= 영상 하나) 중복 제거. delete=False 면 리포트만"""
+    images = list_images(Path(folder))
+    kept, dups = split_distinct(images, threshold, hash_size)
+    if delete:
+        for p in dups:
+            try:
+                p.unlink()
+            except OSError as e:
+                print(f"⚠️ 삭제 실패: {p} | {e}")
+    total = len(images)
+    return {"dir": str(folder), "total": total, "kept": len(kept), "duplicates": len(dups),
+            "dup_ratio": round(len(dups) / total, 4) if total else 0.0}
+
+
+def dedup_tree(root, threshold: int = DEDUP_HAMMING, delete: bool = False,
+               hash_size: int = DEDUP_HASH_SIZE) -> List[dict]:
+    """root 이하 이미지가 있는 모든 폴더를 각각 중복 제거"""
+    root = Path(root)
+    dirs = [root] + sorted(p for p in root.rglob("*") if p.is_dir())
+    return [s for s in (dedup_dir(d, threshold, delete, hash_size) for d in dirs) if s["total"] > 0]
+
+
+def print_dedup_summary(stats: Iterable[dict]):
+    stats = list(stats)
+    total = sum(s["total"] for s in stats)
+    dups = sum(s["duplicates"] for s in stats)
+    for s in stats:
+        print(f" - {s['dir']}: {s['total']} → {s['kept']}장 (중복 {s['duplicates']}, {s['dup_ratio'] * 100:.1f}%)")
+    if total:
+        print(f"📊 전체: {total} → {total - dups}장 (중복 {dups}, {dups / total * 100:.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="근접 중복 프레임 제거 (dHash + Hamming 거리)")
+    parser.add_argument("--root", required=True, help="이미지 폴더 루트 (하위 폴더별로 각각 처리)")
+    parser.add_argument("--threshold", type=int, default=DEDUP_HAMMING, help="Hamming 거리 임계값")
+    parser.add_argument("--hash_size", type=int, default=DEDUP_HASH_SIZE)
+    parser.add_argument("--delete", action="store_true", help="중복 파일 삭제 (미지정 시 리포트만)")
+    args = parser.parse_args()
+
+    stats = dedup_tree(args.root, args.threshold, args.delete, args.hash_size)
+    print_dedup_summary(stats)
+    if not args.delete:
+        print("ℹ️ 리포트만 출력했습니다. 삭제하려면 --delete")
+
+
+if __name__ == "__main__":
+    main()
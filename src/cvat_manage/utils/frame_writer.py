@@ -0,0 +1,204 @@
+"""
+비동기 프레임 저장 (인코딩 + 파일 쓰기를 백그라운드 스레드 풀에서)
+
+배경
+- 추출 루프에서 cv2.imwrite 를 직접 호출하면 JPEG 인코딩/NAS 쓰기 동안 디코딩이 멈춤
+동작
+- submit(path, frame) 은 bounded queue 에 넣고 바로 반환, 큐가 차면 대기(back-pressure → 메모리 상한)
+- 작업 스레드가 cv2.imencode(GIL 해제) → 같은 폴더의 숨김 임시파일에 쓰고 os.replace 로 원자적 교체
+  (중간에 죽어도 반쯤 쓰인 .jpg 가 남지 않음, 임시파일은 '.' 으로 시작해 이미지 glob 에 안 잡힘)
+- 형식: jpg(기본) / webp / png, 저장 경로의 확장자는 형식에 맞게 바뀜 (submit 반환값이 실제 경로)
+- zip_batch > 0 (.env FRAME_ZIP_BATCH) 이면 낱장 대신 폴더별 STORED ZIP 배치로 저장 (frame_zip.ZipSink)
+  · 인코딩은 병렬, ZIP 추가는 submit 순서대로 직렬
+
+사용 예)
+    with FrameWriter() as writer:
+        for idx, frame in iter_frames(video_path, indices):
+            writer.submit(os.path.join(save_dir, f"{name}_{idx:06d}.jpg"), frame)
+    # with 블록을 나오면 모든 파일 저장 완료
+
+.env
+    FRAME_FORMAT=jpg             # jpg | webp | png
+    FRAME_QUALITY=95             # jpg/webp 품질 (cv2.imwrite 기본값 95)
+    FRAME_PNG_COMPRESSION=1      # png 압축 레벨 0~9
+    FRAME_WRITER_THREADS=4
+    FRAME_WRITER_QUEUE=64        # 대기 프레임 수 상한
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+import cv2
+from dotenv import load_dotenv
+
+from frame_zip import FRAME_ZIP_BATCH, ZipSink, atomic_write
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+FRAME_FORMAT = os.getenv("FRAME_FORMAT", "jpg").lower().lstrip(".")
+FRAME_QUALITY = int(os.getenv("FRAME_QUALITY", "95"))
+FRAME_PNG_COMPRESSION = int(os.getenv("FRAME_PNG_COMPRESSION", "1"))
+FRAME_WRITER_THREADS = max(1, int(os.getenv("FRAME_WRITER_THREADS", "4")))
+FRAME_WRITER_QUEUE = max(1, int(os.getenv("FRAME_WRITER_QUEUE", "64")))
+
+_EXTS = {"jpg": ".jpg", "jpeg": ".jpg", "webp": ".webp", "png": ".png"}
+_STOP = object()
+
+
+def with_format(path: str, fmt: str = FRAME_FORMAT) -> str:
+    """확장자를 형식에 맞게 교체"""
+    if fmt not in _EXTS:
+        raise ValueError(f"지원하지 않는 FRAME_FORMAT: {fmt} (jpg | webp | png)")
+    return os.path.splitext(path)[0] + _EXTS[fmt]
+
+
+def encode_frame(frame, fmt: str = FRAME_FORMAT, quality: int = FRAME_QUALITY) -> bytes:
+    ext = _EXTS.get(fmt)
+    if ext is None:
+        raise ValueError(f"지원하지 않는 FRAME_FORMAT: {fmt} (jpg | webp | png)")
+    if ext == ".jpg":
+        params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+    elif ext == ".webp":
+        params = [int(cv2.IMWRITE_WEBP_QUALITY), quality]
+    else:
+        params = [int(cv2.IMWRITE_PNG_COMPRESSION), FRAME_PNG_COMPRESSION]
+    ok, buf = cv2.imencode(ext, frame, params)
+    if not ok:
+        raise RuntimeError(f"이미지 인코딩 실패 ({fmt})")
+    return buf.tobytes()
+
+
+class FrameWriter:
+    """
+    백그라운드 인코딩/저장 풀
+    - submit(path, frame)      : 프레임을 형식(fmt)으로 인코딩해 저장, 실제 저장 경로 반환
+    - submit_bytes(path, data) : 이미 인코딩된 바이트를 그대로 저장
+    - close()                  : 남은 작업을 모두 끝내고 종료, 실패가 있으면 첫 예외를 다시 발생
+                                 (abort=True 면 작성 중이던 ZIP 배치는 완성하지 않고 버림)
+    - zip_batch > 0            : ZIP 배치 저장, 한 폴더를 여러 프로세스가 나눠 쓰면 zip_tag 로 ZIP 이름 구분
+    """
+
+    def __init__(self, workers: int = FRAME_WRITER_THREADS, queue_size: int = FRAME_WRITER_QUEUE,
+                 fmt: str = FRAME_FORMAT, quality: int = FRAME_QUALITY,
+                 zip_batch: int = FRAME_ZIP_BATCH, zip_tag: str = ""):
+        with_format("x", fmt)   # 형식 검증
+        self.fmt = fmt
+        self.quality = quality
+        self.sink = ZipSink(zip_batch, tag=zip_tag) if zip_batch > 0 else None
+        self.seq = 0            # submit 순번
+        self.next_commit = 0    # ZIP 에 다음으로 추가할 순번
+        self.pending = {}       # 인코딩이 먼저 끝난 항목 (순번 → (path, data))
+        self.sink_lock = threading.Lock()
+        self.queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self.lock = threading.Lock()
+        self.written = 0
+        self.bytes = 0
+        self.errors = []
+        self.wait_sec = 0.0     # 큐가 가득 차 submit 이 기다린 시간 (저장이 병목인지 확인용)
+        self.closed = False
+        self.threads = [
+            threading.Thread(target=self._run, name=f"frame-writer-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for t in self.threads:
+            t.start()
+
+    def _put(self, item):
+        if self.closed:
+            raise RuntimeError("이미 닫힌 FrameWriter 입니다.")
+        item = (self.seq,) + item
+        self.seq += 1
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            t = time.perf_counter()
+            self.queue.put(item)
+            self.wait_sec += time.perf_counter() - t
+
+    def submit(self, path: str, frame) -> str:
+        # frame 은 저장이 끝날 때까지 수정하지 말 것 (cap.read/retrieve 는 매번 새 배열을 반환)
+        path = with_format(path, self.fmt)
+        self._put((path, frame, None))
+        return path
+
+    def submit_bytes(self, path: str, data: bytes) -> str:
+        self._put((path, None, data))
+        return path
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                seq, path, frame, data = item
+                try:
+                    if data is None:
+                        data = encode_frame(frame, self.fmt, self.quality)
+                    if self.sink is None:
+                        atomic_write(path, data)
+                        self._count(len(data))
+                except Exception as e:
+                    data = None
+                    with self.lock:
+                        self.errors.append((path, e))
+                if self.sink is not None:
+                    self._commit(seq, path, data)
+            finally:
+                self.queue.task_done()
+
+    def _count(self, size: int):
+        with self.lock:
+            self.written += 1
+            self.bytes += size
+
+    def _commit(self, seq: int, path: str, data):
+        """인코딩이 끝난 순서와 무관하게 submit 순서대로 ZIP 에 추가 (data=None 은 실패 항목, 순번만 넘김)"""
+        with self.sink_lock:
+            self.pending[seq] = (path, data)
+            while self.next_commit in self.pending:
+                path, data = self.pending.pop(self.next_commit)
+                self.next_commit += 1
+                if data is None:
+                    continue
+                try:
+                    self.sink.write(path, data)
+                    self._count(len(data))
+                except Exception as e:
+                    with self.lock:
+                        self.errors.append((path, e))
+
+    def close(self, raise_errors: bool = True, abort: bool = False):
+        if self.closed:
+            return
+        self.closed = True
+        for _ in self.threads:
+            self.queue.put(_STOP)
+        for t in self.threads:
+            t.join()
+        if self.sink is not None:
+            try:
+                self.sink.close(abort=abort)
+            except Exception as e:
+                self.errors.append(("ZIP 마무리", e))
+        if self.errors:
+            print(f"⚠️ 프레임 저장 실패 {len(self.errors)}건 (첫 실패: {self.errors[0][0]} | {self.errors[0][1]})")
+            if raise_errors:
+                raise self.errors[0][1]
+
+    def stats(self) -> dict:
+        return {"written": self.written, "bytes": self.bytes, "errors": len(self.errors),
+                "wait_sec": round(self.wait_sec, 3)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 본문에서 예외가 난 경우 저장 실패로 덮어쓰지 않고, 덜 채운 ZIP 을 완성본처럼 남기지 않음
+        failed = exc_type is not None
+        self.close(raise_errors=not failed, abort=failed)
+        return False
@@ -0,0 +1,145 @@
+"""
+추출 프레임을 STORED ZIP 배치로 바로 저장 (낱장 JPEG 중간 파일 없음)
+
+배경
+- 추출기가 프레임을 낱장 JPEG 로 OUTPUT_ROOT 에 쓰고, compress_images / 오토라벨 업로더가
+  전부 다시 읽어 ZIP_DEFLATED 로 _NN.zip 배치를 만듦 → NAS 에 이미지 1회 쓰기 + 1회 읽기가 더 듦
+  (JPEG 는 이미 압축되어 deflate 이득도 거의 없음)
+동작
+- FrameWriter(zip_batch=N) 이면 인코딩된 프레임을 폴더별 ZIP 에 바로 추가, N 장마다 다음 ZIP 으로 넘어감
+  · 파일명: <폴더명>_01.zip, _02.zip ... (compress_images 와 동일), 한 영상을 여러 프로세스가 나눠 쓰면
+    tag 로 구분 (<폴더명>_<tag>01.zip)
+  · ZIP 은 숨김 임시파일에 쓰다가 배치가 끝나면 os.replace → '*.zip' 으로 보이는 것은 항상 완성본
+  · 항목 순서는 submit 순서 (프레임 번호 순)
+- loose=True 이면 낱장 파일도 함께 저장
+- 오토라벨 업로더(core/import_autolabeling_new.py)는 낱장 이미지가 없는 폴더의 *.zip 을 배치로 그대로 사용
+
+.env
+    FRAME_ZIP_BATCH=0       # >0 이면 ZIP 배치 저장 (ZIP 당 이미지 수, 예: 100)
+    FRAME_ZIP_LOOSE=0       # 1 이면 낱장 이미지도 함께 저장
+"""
+
+import os
+import threading
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from dotenv import load_dotenv
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+FRAME_ZIP_BATCH = int(os.getenv("FRAME_ZIP_BATCH", "0"))
+FRAME_ZIP_LOOSE = os.getenv("FRAME_ZIP_LOOSE", "0") in ("1", "true", "True")
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+def atomic_write(path: str, data: bytes):
+    """같은 폴더의 숨김 임시파일에 쓴 뒤 os.replace (frame_writer 낱장 저장과 ZipSink loose 복사가 공용)"""
+    folder, name = os.path.split(path)
+    tmp = os.path.join(folder, f".{name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def zip_batch_name(folder: str, tag: str, number: int) -> str:
+    return os.path.join(folder, f"{os.path.basename(os.path.normpath(folder))}_{tag}{number:02d}.zip")
+
+
+class ZipBatchWriter:
+    """폴더 하나의 rolling STORED ZIP (batch_size 장마다 새 ZIP)"""
+
+    def __init__(self, folder: str, batch_size: int, tag: str = ""):
+        self.folder = folder
+        self.batch_size = max(1, batch_size)
+        self.tag = tag
+        self.number = 0
+        self.count = 0          # 현재 ZIP 의 항목 수
+        self.zip = None
+        self.tmp = None
+        self.final = None
+        self.created: List[str] = []
+
+    def _open(self):
+        self.number += 1
+        self.final = zip_batch_name(self.folder, self.tag, self.number)
+        self.tmp = os.path.join(self.folder, f".{os.path.basename(self.final)}.{os.getpid()}.tmp")
+        self.zip = zipfile.ZipFile(self.tmp, "w", zipfile.ZIP_STORED)
+        self.count = 0
+
+    def _finish(self):
+        if self.zip is None:
+            return
+        self.zip.close()
+        os.replace(self.tmp, self.final)
+        self.created.append(self.final)
+        self.zip = None
+
+    def add(self, name: str, data: bytes):
+        if self.zip is None:
+            self._open()
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = zipfile.ZIP_STORED
+        self.zip.writestr(info, data)
+        self.count += 1
+        if self.count >= self.batch_size:
+            self._finish()
+
+    def close(self):
+        self._finish()
+
+    def abort(self):
+        """작성 중이던 ZIP 을 버림 (완성된 ZIP 은 유지)"""
+        if self.zip is not None:
+            self.zip.close()
+            if os.path.exists(self.tmp):
+                os.remove(self.tmp)
+            self.zip = None
+
+
+class ZipSink:
+    """
+    FrameWriter 저장 대상: write(path, data) 를 path 의 폴더별 ZIP 배치로
+    - 호출은 직렬로 (FrameWriter 가 submit 순서대로 한 번에 하나씩 호출)
+    """
+
+    def __init__(self, batch_size: int = FRAME_ZIP_BATCH, loose: bool = FRAME_ZIP_LOOSE, tag: str = ""):
+        self.batch_size = batch_size
+        self.loose = loose
+        self.tag = tag
+        self.writers: Dict[str, ZipBatchWriter] = {}
+
+    def write(self, path: str, data: bytes):
+        folder, name = os.path.split(path)
+        writer = self.writers.get(folder)
+        if writer is None:
+            writer = self.writers[folder] = ZipBatchWriter(folder, self.batch_size, self.tag)
+        writer.add(name, data)
+        if self.loose:
+            atomic_write(path, data)
+
+    def close(self, abort: bool = False):
+        for writer in self.writers.values():
+            if abort:
+                writer.abort()
+            else:
+                writer.close()
+
+    def created(self) -> List[str]:
+        return [p for w in self.writers.values() for p in w.created]
+
+
+def read_zip_images(zip_path) -> List[Tuple[str, bytes]]:
+    """ZIP 안 이미지 → [(이름, 바이트), ...] (이름 순)"""
+    with zipfile.ZipFile(zip_path) as zf:
+        names = sorted(n for n in zf.namelist()
+                       if not n.endswith("/") and os.path.splitext(n)[1].lower() in IMAGE_EXTS)
+        return [(os.path.basename(n), zf.read(n)) for n in names]
@@ -0,0 +1,109 @@
+"""
+GPU 작업 분배 (길이 기반 LPT + work stealing + 완료 이벤트 구동)
+
+배경
+- vidx % gpu_count 고정 배정 → 긴 영상이 한 GPU 에 몰리면 다른 GPU 는 일찍 놀게 됨
+- 완료 여부를 Manager 값으로 0.1초마다 폴링
+동작
+- 초기 배정: 무게(영상 길이) 큰 순서대로, (배정된 무게 / 슬롯 수)가 가장 작은 장치 큐에 넣음 (LPT)
+- 장치에 빈 슬롯이 생기면 자기 큐 앞(가장 긴 작업)부터, 비었으면 남은 무게가 가장 큰 장치의 큐에서 가져옴(steal)
+- 완료는 apply_async 콜백 → queue.Queue 로 전달, 메인 스레드는 get() 으로 대기 (폴링 없음)
+- 장치별 작업 수 / 가져온 작업 수 / busy 시간 / 가동률(busy / (경과 × 슬롯)) 집계
+
+사용 예)
+    pools = {gid: Pool(WORKERS_PER_GPU, initializer=..., initargs=(..., gid)) for gid in gpu_ids}
+    tasks = [(video_key, duration_sec, partial(build_args, video_path)), ...]   # build_args(device_id) → func 인자 튜플
+    stats = run_work_stealing(pools, WORKERS_PER_GPU, tasks, runner_top, on_done=handle_result)
+    print_device_stats(stats)
+"""
+
+import queue
+import time
+from collections import deque
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+Task = Tuple[Hashable, float, Callable[[int], tuple]]
+
+
+def plan_lpt(tasks: List[Task], devices: List[int], slots: int) -> Dict[int, deque]:
+    """무게 큰 순서대로 (배정 무게 / 슬롯)가 가장 작은 장치에 배정 → 장치별 deque (앞쪽이 긴 작업)"""
+    queues = {d: deque() for d in devices}
+    load = {d: 0.0 for d in devices}
+    for task in sorted(tasks, key=lambda t: -t[1]):
+        dev = min(devices, key=lambda d: (load[d] / max(1, slots), d))
+        queues[dev].append(task)
+        load[dev] += task[1]
+    return queues
+
+
+def run_work_stealing(pools: Dict[int, object], slots: int, tasks: List[Task], func: Callable,
+                      on_done: Optional[Callable] = None, verbose: bool = True) -> dict:
+    """
+    pools   : 장치 ID → multiprocessing Pool (장치별 모델이 initializer 로 올라가 있는 풀)
+    tasks   : (key, 무게, build_args) — build_args(device_id) 가 func 에 넘길 인자 튜플을 만듦
+    on_done : on_done(key, device_id, result, error) — 메인 스레드에서 완료 순서대로 호출
+    반환    : {"wall_sec", "devices": {dev: {"tasks", "stolen", "busy_sec", "utilization"}}}
+    """
+    devices = sorted(pools)
+    slots = max(1, slots)
+    queues = plan_lpt(tasks, devices, slots)
+    queued_load = {d: sum(t[1] for t in queues[d]) for d in devices}
+    inflight = {d: 0 for d in devices}
+    stats = {d: {"tasks": 0, "stolen": 0, "busy_sec": 0.0} for d in devices}
+    done_q: "queue.Queue" = queue.Queue()
+
+    def start(dev, src):
+        key, weight, build_args = queues[src].popleft()
+        queued_load[src] -= weight
+        if src != dev:
+            stats[dev]["stolen"] += 1
+            if verbose:
+                print(f"🔀 GPU {dev} ← GPU {src} 대기 작업 가져옴: {key}")
+        inflight[dev] += 1
+        started = time.perf_counter()
+        pools[dev].apply_async(
+            func, build_args(dev),
+            callback=lambda r, d=dev, k=key, t=started: done_q.put((d, k, t, r, None)),
+            error_callback=lambda e, d=dev, k=key, t=started: done_q.put((d, k, t, None, e)),
+        )
+
+    def dispatch():
+        # 1) 각 장치는 자기 큐부터 채움
+        for dev in devices:
+            while inflight[dev] < slots and queues[dev]:
+                start(dev, dev)
+        # 2) 빈 슬롯이 남은 장치(덜 바쁜 장치 우선)가 남은 무게가 가장 큰 장치의 큐 앞에서 가져옴
+        #    (1) 이후 큐가 남은 장치는 슬롯이 모두 찬 상태
+        while True:
+            free = [d for d in devices if inflight[d] < slots]
+            victim = max(devices, key=lambda d: (queued_load[d] if queues[d] else -1, -d))
+            if not free or not queues[victim]:
+                return
+            start(min(free, key=lambda d: (inflight[d], d)), victim)
+
+    t0 = time.perf_counter()
+    dispatch()
+    while any(inflight.values()):
+        dev, key, started, result, error = done_q.get()
+        inflight[dev] -= 1
+        stats[dev]["tasks"] += 1
+        stats[dev]["busy_sec"] += time.perf_counter() - started
+        if error is not None and verbose:
+            print(f"❌ GPU {dev} 작업 실패: {key} | {error}")
+        if on_done is not None:
+            on_done(key, dev, result, error)
+        dispatch()
+
+    wall = time.perf_counter() - t0
+    for d in devices:
+        stats[d]["utilization"] = round(stats[d]["busy_sec"] / (wall * slots), 4) if wall > 0 else 0.0
+        stats[d]["busy_sec"] = round(stats[d]["busy_sec"], 2)
+    return {"wall_sec": round(wall, 2), "devices": stats}
+
+
+def print_device_stats(stats: dict):
+    print(f"====== 장치별 가동률 (경과 {stats['wall_sec']}초) ======")
+    for dev, s in stats["devices"].items():
+        name = f"GPU {dev}" if dev >= 0 else "CPU"
+        print(f" - {name}: 작업 {s['tasks']}개 (가져옴 {s['stolen']}) | busy {s['busy_sec']}초 | "
+              f"가동률 {s['utilization'] * 100:.1f}%")
@@ -471,7 +471,7 @@
 
 #         gpu_semaphores = {gid: threading.BoundedSemaphore(WORKERS_PER_GPU) for gid in valid_gpu_ids}
 #         pool_size = max(1, gpu_count * max(1, WORKERS_PER_GPU))
-#         print(f"🚀 전역 병렬 처리 시작 — 풀 크기: {pool_size} (GPU:{valid_gpu_ids}, GPU당 워커:{WORKERS_PER_GPU})")
+#         print(f"🚀 전역 병렬 처리 시작 — 풀 크기: {pool_size} (GPU:{valid_gpu_ids}, GPU당 워커:{WORKERS_PER_GPU}, 모델 워커당 1회 로드)")
 
 #         cb_lock = threading.Lock()
 #         manager = Manager()
@@ -586,23 +586,36 @@
 import os
 import cv2
 import csv
+import importlib.util
 import time
 from pathlib import Path
 from collections import defaultdict, deque
 from datetime import datetime
-from multiprocessing import Pool, get_start_method, set_start_method, Manager
+from functools import partial
+from multiprocessing import Pool, get_start_method, set_start_method
 import threading
 
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+from density_windows import counts_array, top_windows
+from frame_dedup import dedup_dir
+from frame_writer import FRAME_FORMAT, FRAME_QUALITY, FrameWriter, encode_frame, with_format
+from frame_zip import FRAME_ZIP_BATCH, FRAME_ZIP_LOOSE
+from gpu_scheduler import print_device_stats, run_work_stealing
+from person_detect import (PERSON_BATCH_SIZE, PERSON_QUEUE_SIZE, MotionGate, background_iter, detect_persons,
+                           downscale, init_person_worker, load_model)
+from video_frames import FrameSampler, is_second_start, iter_frames, keyframe_indices, split_at_keyframes
+from video_probe import get_probe, probe_videos, seek_threshold
+
 """
-고급 스케줄러 (세마포어 기반, Manager.Value 적용)
+고급 스케줄러 (영상 길이 기반 배정 + work stealing, gpu_scheduler.py)
 ────────────────────────────────────────────────────────────────────
 요구사항 반영:
 - YOLO로 사람을 찾아, '사람이 가장 많이 탐지된 연속 15분' 구간만 골라서
   해당 구간에서 '2초당 1프레임(0.5fps)'로 이미지 추출
-- 기존 멀티-GPU 스케줄러/세마포어/로그 구조는 유지
+- 영상은 길이(긴 것부터) 기준으로 GPU 에 배정, 먼저 비는 GPU 가 다른 GPU 의 대기 영상을 가져감
+- 완료는 콜백 이벤트로 처리 (폴링 없음), 종료 시 GPU 별 가동률 출력
 
 구현 개요:
 - detect_and_extract_worker:
@@ -628,11 +641,16 @@ SUMMARY_LOG = os.path.join(ASSIGN_LOG_DIR, "frame_summary_log.csv")
 # 모드 전환
 PERSON_ONLY = os.getenv("PERSON_ONLY", "0") in ("1", "true", "True")
 UNIFORM_FRAMES_PER_SEC = float(os.getenv("UNIFORM_FRAMES_PER_SEC", "3"))
+# 균일간격 모드: 추출 직후 영상 폴더별 근접 중복 프레임 삭제 (frame_dedup, 임계값 DEDUP_HAMMING)
+FRAME_DEDUP = os.getenv("FRAME_DEDUP", "0") in ("1", "true", "True")
+# 균일간격 모드: 이 길이(초)보다 긴 영상은 키프레임 정렬 구간으로 나눠 병렬 추출 (0 = 분할 안 함)
+UNIFORM_SEGMENT_SEC = float(os.getenv("UNIFORM_SEGMENT_SEC", "600"))
 
 # 사람 감지(세그먼트/병렬) 설정
 PERSON_SEGMENTS = int(os.getenv("PERSON_SEGMENTS", "4"))             # [주석처리 대상과 연관] 비디오를 N등분
 WORKERS_PER_GPU = int(os.getenv("WORKERS_PER_GPU", str(PERSON_SEGMENTS)))  # GPU당 동시 프로세스 수 (기본값: 세그먼트 수)
 PERSON_SAMPLING_RATE = int(os.getenv("PERSON_SAMPLING_RATE", "5"))    # 1차 패스: n프레임마다 탐지
+PERSON_SAMPLING_SEC = float(os.getenv("PERSON_SAMPLING_SEC", "0"))   # >0 이면 n초마다 탐지 (타임스탬프 기준, 가변 fps 대응)
 YOLO_WEIGHTS = os.getenv("YOLO_WEIGHTS", "yolov8n.pt")
 PERSON_CONF = float(os.getenv("PERSON_CONF", "0.25"))
 
@@ -646,16 +664,26 @@ EXCLUDED_CATEGORIES = set(
 
 # [신규] 15분 타겟 구간(초)
 TARGET_WINDOW_SEC = int(os.getenv("TARGET_WINDOW_SEC", str(15 * 60)))
+# 영상당 추출할 구간 수 (서로 겹치지 않는 상위 N개 구간, 1 이면 기존과 동일)
+TARGET_WINDOW_COUNT = max(1, int(os.getenv("TARGET_WINDOW_COUNT", "1")))
 # [고정] 2초당 1프레임 저장
 EXTRACT_EVERY_SEC = 2.0
 
+# 단일 패스: 1차 패스 중 후보 프레임(1초 간격)을 JPEG 로 보관하다가 최적 구간만 저장 (2차 디코딩 없음)
+PERSON_SINGLE_PASS = os.getenv("PERSON_SINGLE_PASS", "1") in ("1", "true", "True")
+SINGLE_PASS_MAX_MB = int(os.getenv("SINGLE_PASS_MAX_MB", "1024"))     # 초과 시 해당 영상은 2-pass 로 전환
+SINGLE_PASS_MAX_SIDE = int(os.getenv("SINGLE_PASS_MAX_SIDE", "0"))    # >0 이면 보관 프레임 긴 변 축소
+SINGLE_PASS_JPEG_QUALITY = int(os.getenv("SINGLE_PASS_JPEG_QUALITY", str(FRAME_QUALITY)))  # 보관 형식은 FRAME_FORMAT
+
 # =============================
 # YOLO / torch 임포트 (사람 감지 모드에서 사용)
+# ultralytics 는 설치 여부만 확인, 실제 로드는 워커의 person_detect.load_model
 # =============================
 _YOLO_AVAILABLE = True
 try:
     import torch
-    from ultralytics import YOLO
+    if importlib.util.find_spec("ultralytics") is None:
+        raise ModuleNotFoundError("No module named 'ultralytics'")
 except Exception as e:
     _YOLO_AVAILABLE = False
     _YOLO_IMPORT_ERROR = e
@@ -675,33 +703,54 @@ def get_frames_to_extract(duration_sec, fps, frames_per_sec=3):
     return num_frames, interval
 
 
-def extract_frames_uniform(video_path, save_dir, num_frames, interval_frames):
-    cap = cv2.VideoCapture(video_path)
-    total_video_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+def uniform_frame_indices(video_path, num_frames, interval_frames):
+    """균일간격 추출 대상 프레임 번호 (추출할 것이 없으면 빈 리스트)"""
+    total_video_frames = get_probe(video_path)["frames"]
 
     if num_frames == 0 or total_video_frames < interval_frames:
         print(f"⚠️ {os.path.basename(video_path)}: 추출 프레임 없음/간격 과대. 스킵")
-        cap.release()
-        return 0
+        return []
+    return [i * interval_frames for i in range(num_frames) if i * interval_frames < total_video_frames]
 
+
+def extract_uniform_segment(video_path, save_dir, indices, interval_frames, zip_tag=""):
+    """
+    indices(정렬) 프레임 저장. 파일명은 프레임 번호로 정해지므로 세그먼트를 어떤 순서로 처리해도 결과 동일
+    ZIP 배치 모드(FRAME_ZIP_BATCH)에서 한 영상을 여러 구간으로 나눴으면 zip_tag 로 구간별 ZIP 이름 구분
+    """
     base_name = os.path.splitext(os.path.basename(video_path))[0]
     os.makedirs(save_dir, exist_ok=True)
 
+    # 프레임마다 seek 하지 않고, 간격에 따라 grab 전진 / 키프레임 seek 자동 선택
+    # 인코딩/저장은 백그라운드 writer 가 처리 → 디코딩과 겹침
     count = 0
-    for i in range(num_frames):
-        frame_idx = i * interval_frames
-        if frame_idx >= total_video_frames:
-            break
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if ret:
+    with FrameWriter(zip_tag=zip_tag) as writer:
+        for frame_idx, frame in iter_frames(video_path, indices, seek_threshold=seek_threshold(get_probe(video_path))):
+            i = frame_idx // interval_frames
             save_path = os.path.join(save_dir, f"{base_name}_frame{i:06d}.jpg")
-            cv2.imwrite(save_path, frame)
+            writer.submit(save_path, frame)
             count += 1
-    cap.release()
     return count
 
 
+def uniform_segment_task(task):
+    """Pool 용 Top-level 러너 (spawn 에서 pickle 가능해야 하므로 모듈 최상위에 둠)"""
+    video_key, video_path, save_dir, indices, interval_frames, zip_tag = task
+    return video_key, save_dir, extract_uniform_segment(video_path, save_dir, indices, interval_frames, zip_tag)
+
+
+def plan_uniform_segments(video_path, indices, fps, segment_sec=None):
+    """
+    긴 영상을 약 UNIFORM_SEGMENT_SEC 길이의 키프레임 정렬 구간으로 분할 (ffprobe 실패 시 격자 분할)
+    짧은 영상은 한 구간
+    """
+    segment_sec = UNIFORM_SEGMENT_SEC if segment_sec is None else segment_sec
+    segment_frames = int(segment_sec * fps) if fps > 0 else 0
+    if not indices or segment_frames <= 0 or indices[-1] - indices[0] < segment_frames:
+        return [indices] if indices else []
+    return split_at_keyframes(indices, segment_frames, keyframe_indices(video_path, fps))
+
+
 def is_processed(log_file, root_category, sub_category, video_file):
     if not os.path.exists(log_file):
         return False
@@ -729,6 +778,66 @@ def mark_as_processed(log_file, root_category, sub_category, video_file):
         })
 
 
+# =============================
+# 단일 패스용: 최대 합 구간 + 후보 프레임 롤링 보관
+# =============================
+class RollingWindowSelector:
+    """
+    초 단위 person 카운트를 순서대로 받아 window_len 초 구간 합의 최댓값을 추적하고,
+    현재 구간의 후보 프레임(JPEG bytes)을 deque 로 유지 → 최고 구간이 갱신될 때 참조만 복사
+    - 메모리: 현재 구간 + 최고 구간 (bytes 는 공유되므로 최대 약 2 × 구간 크기)
+    - max_bytes 초과 시 overflow=True (호출 측에서 2-pass 로 전환)
+    """
+
+    def __init__(self, window_len: int, max_bytes: int):
+        self.window_len = max(1, window_len)
+        self.max_bytes = max_bytes
+        self.counts = deque()
+        self.frames = deque()        # (local_sec, frame_idx, jpeg_bytes)
+        self.cur_sum = 0
+        self.cur_bytes = 0
+        self.best_sum = -1
+        self.best_start = 0
+        self.best_frames = []
+        self.best_bytes = 0
+        self.overflow = False
+
+    def add_frame(self, local_sec: int, frame_idx: int, jpeg: bytes):
+        self.frames.append((local_sec, frame_idx, jpeg))
+        self.cur_bytes += len(jpeg)
+        if self.cur_bytes + self.best_bytes > self.max_bytes:
+            self.overflow = True
+
+    def close_second(self, local_sec: int, count: int):
+        """local_sec 초의 카운트 확정 (0 부터 순서대로 호출)"""
+        self.counts.append(count)
+        self.cur_sum += count
+        if len(self.counts) > self.window_len:
+            self.cur_sum -= self.counts.popleft()
+        start = local_sec - self.window_len + 1
+        while self.frames and self.frames[0][0] < start:
+            self.cur_bytes -= len(self.frames.popleft()[2])
+        # 같은 합이면 앞 구간 유지 (기존 prefix-sum 탐색과 동일한 선택)
+        if len(self.counts) == self.window_len and self.cur_sum > self.best_sum:
+            self.best_sum = self.cur_sum
+            self.best_start = start
+            self.best_frames = list(self.frames)
+            self.best_bytes = self.cur_bytes
+
+
+def _encode_candidate(frame) -> bytes:
+    if SINGLE_PASS_MAX_SIDE > 0:
+        h, w = frame.shape[:2]
+        scale = SINGLE_PASS_MAX_SIDE / max(h, w)
+        if scale < 1.0:
+            frame = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+    # 최종 저장 형식(FRAME_FORMAT)으로 바로 인코딩 → 저장 시 재인코딩 없음
+    try:
+        return encode_frame(frame, FRAME_FORMAT, SINGLE_PASS_JPEG_QUALITY)
+    except RuntimeError:
+        return b""
+
+
 # =============================
 # [핵심] 사람 감지용 워커 (업데이트 버전)
 # =============================
@@ -738,7 +847,10 @@ def detect_and_extract_worker(args):
     동작:
       1) [start_idx, end_idx) 범위를 1차 패스로 훑으며 PERSON 존재 여부를 '초 단위' 카운트에 누적
       2) 해당 범위 내에서 '연속 15분(900초)' 윈도우 중 합계가 최대인 구간 찾기
+         (TARGET_WINDOW_COUNT > 1 이면 서로 겹치지 않는 상위 N개 구간)
       3) 그 구간에서만 2초당 1프레임으로 이미지 저장
+      * PERSON_SINGLE_PASS=1 (기본): 1차 패스 중 1초 간격 후보 프레임을 JPEG 로 롤링 보관하고
+        최적 구간이 정해지면 보관본을 그대로 저장 → 영상 재디코딩 없음 (메모리 초과 시 2차 패스로 대체)
     반환: (saved_count, save_dir)
     """
     start_idx, end_idx, device_id, video_path, fps, sampling_rate, output_root, category = args
@@ -756,13 +868,14 @@ def detect_and_extract_worker(args):
         if use_cuda:
             torch.cuda.set_device(device_id)
 
-    # 모델 로드 (각 프로세스 별 1회)
-    yolo = YOLO(YOLO_WEIGHTS)
+    # 모델: 프로세스당 GPU 별 1회 로드 (Pool initializer 에서 미리 로드 + 워밍업, 이후 태스크는 재사용)
+    yolo = load_model(YOLO_WEIGHTS, device_id)
 
-    # 비디오 준비
+    # 비디오 준비 (메타데이터는 프로브 캐시)
+    probe = get_probe(video_path)
     cap = cv2.VideoCapture(video_path)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 0.0
+    total_frames = probe["frames"]
+    fps = fps or probe["fps"]
 
     # 출력 폴더
     video_filename = os.path.splitext(os.path.basename(video_path))[0]
@@ -781,81 +894,142 @@ def detect_and_extract_worker(args):
     # ---------------------------
     person_count_by_sec = defaultdict(int)
 
-    # 1차 패스 진행 바
-    with tqdm(total=(end_idx - start_idx), desc=f"[PASS1] {video_filename} [{start_idx}-{end_idx}) GPU:{device_id}") as pbar:
+    total_secs = int((end_idx - start_idx) / fps) + 1
+    window_len = min(TARGET_WINDOW_SEC, total_secs)  # 영상이 15분보다 짧으면 영상 길이로
+    base_sec = int(start_idx / fps)
+    # 단일 패스 보관은 최적 1구간 기준 → 여러 구간을 뽑을 때는 2차 패스 사용
+    use_single = PERSON_SINGLE_PASS and TARGET_WINDOW_COUNT == 1
+    selector = RollingWindowSelector(window_len, SINGLE_PASS_MAX_MB * 1024 * 1024) if use_single else None
+    next_open_sec = 0   # 아직 확정되지 않은 가장 이른 로컬 초
+
+    # 샘플 대상이 아닌 프레임은 grab() 만 (디코딩만, BGR 변환/복사 없음)
+    sampler = FrameSampler(sampling_rate, PERSON_SAMPLING_SEC, fps)
+    keep_candidates = threading.Event()
+    if selector is not None:
+        keep_candidates.set()
+    # 움직임 없는 샘플은 탐지 생략 → 직전 탐지 결과 재사용
+    motion = MotionGate()
+    last_has_person = False
+
+    def produce(put):
+        """
+        디코딩 스레드: (frame_idx, 추론용 프레임 | None, 후보 JPEG | None, 샘플 여부) 를 순서대로 큐에 넣음
+        (샘플이지만 추론용 프레임이 None 이면 움직임 없음 → 직전 결과 재사용)
+        """
         frame_idx = start_idx
         cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
-
         while frame_idx < end_idx:
-            ret, frame = cap.read()
-            if not ret:
+            if not cap.grab():
                 break
+            sampled = sampler.hit(cap, frame_idx)
+            # 단일 패스: 매 초 첫 프레임을 후보로 보관 (정수가 아닌 fps 도 초마다 1프레임)
+            candidate = keep_candidates.is_set() and is_second_start(frame_idx, fps)
+            if sampled or candidate:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                detect = sampled and motion.needs_detection(frame)
+                if not put((frame_idx,
+                            downscale(frame) if detect else None,
+                            _encode_candidate(frame) if candidate else None,
+                            sampled)):
+                    return
+            frame_idx += 1
 
-            # 샘플링 스킵 (속도)
-            if sampling_rate > 1 and (frame_idx % sampling_rate != 0):
-                frame_idx += 1
-                pbar.update(1)
-                continue
+    pending = []   # 배치 추론 전까지 순서대로 보관 (카운트가 확정된 뒤에 초를 닫아야 하므로)
 
-            # YOLO 추론
-            results = yolo(frame, verbose=False, conf=PERSON_CONF)[0]
-            has_person = False
-            if results.boxes is not None and len(results.boxes.cls) > 0:
-                for cls_idx in results.boxes.cls.tolist():
-                    name = results.names.get(int(cls_idx), "")
-                    if name == "person":
-                        has_person = True
-                        break
+    def flush():
+        """배치 1회 추론 → 초별 카운트 반영 → 보관 중인 후보를 순서대로 selector 에 반영"""
+        nonlocal selector, next_open_sec, last_has_person
+        flags = iter(detect_persons(yolo, [det for _, det, _, _ in pending if det is not None],
+                                     PERSON_CONF, device_id))
+        for fidx, det, _, sampled in pending:
+            if not sampled:
+                continue
+            if det is not None:
+                last_has_person = next(flags)
+            if last_has_person:
+                person_count_by_sec[int(fidx / fps)] += 1
+
+        # 단일 패스: 지난 초 확정 + 후보 보관 (여기까지의 샘플은 모두 추론이 끝난 상태)
+        for fidx, _, jpeg, _ in pending:
+            if selector is None or jpeg is None:
+                continue
+            local_sec = int(fidx / fps) - base_sec
+            while next_open_sec < local_sec:
+                selector.close_second(next_open_sec, person_count_by_sec.get(next_open_sec + base_sec, 0))
+                next_open_sec += 1
+            selector.add_frame(local_sec, fidx, jpeg)
+            if selector.overflow:
+                print(f"⚠️ {video_filename}: 후보 프레임이 {SINGLE_PASS_MAX_MB}MB 초과 → 2차 패스로 전환")
+                selector = None
+                keep_candidates.clear()
+        pending.clear()
+
+    # 1차 패스 진행 바 (디코딩 스레드 ↔ 배치 추론이 bounded queue 로 겹쳐 진행)
+    with tqdm(total=(end_idx - start_idx), desc=f"[PASS1] {video_filename} [{start_idx}-{end_idx}) GPU:{device_id}") as pbar:
+        done_idx = start_idx
+        batch_n = 0
+        for item in background_iter(produce):
+            pending.append(item)
+            pbar.update(item[0] + 1 - done_idx)
+            done_idx = item[0] + 1
+            if item[1] is not None:
+                batch_n += 1
+            if batch_n >= PERSON_BATCH_SIZE or len(pending) >= PERSON_QUEUE_SIZE:
+                flush()
+                batch_n = 0
+        flush()
+
+    st, ms = sampler.stats(), motion.stats()
+    print(f"[PASS1] {video_filename}: 샘플 {st['sampled']}프레임 (YOLO {ms['detected']} / 움직임 없음 재사용 "
+          f"{ms['motion_skipped']}, 생략률 {ms['skip_rate'] * 100:.1f}%) / grab 만 {st['skipped']}프레임")
 
-            if has_person:
-                sec = int(frame_idx / fps)
-                person_count_by_sec[sec] += 1
+    # ---------------------------
+    # 1-1) 단일 패스: 보관해 둔 최적 구간 후보 프레임을 바로 저장하고 종료
+    # ---------------------------
+    if selector is not None:
+        while next_open_sec < total_secs:
+            selector.close_second(next_open_sec, person_count_by_sec.get(next_open_sec + base_sec, 0))
+            next_open_sec += 1
+        cap.release()
 
-            frame_idx += 1
-            pbar.update(1)
+        every = max(1, int(round(EXTRACT_EVERY_SEC)))
+        best_end_frame = int(min(end_idx, (base_sec + selector.best_start + window_len) * fps))
+        saved = 0
+        with FrameWriter() as writer:
+            for local_sec, fidx, jpeg in selector.best_frames:
+                if (local_sec - selector.best_start) % every or fidx >= best_end_frame or not jpeg:
+                    continue
+                writer.submit_bytes(with_format(os.path.join(save_dir, f"{video_filename}_{fidx:06d}.jpg")), jpeg)
+                saved += 1
+        print(f"[SINGLE] {video_filename}: 최적 구간 {base_sec + selector.best_start}s~ "
+              f"(person {max(0, selector.best_sum)}) → {saved}장 저장")
+        return saved, save_dir
 
     # ---------------------------
-    # 2) 최적 15분(900초) 연속 구간 계산 (슬라이딩 윈도우)
+    # 2) 최적 15분(900초) 연속 구간 계산 (NumPy 누적합, 겹치지 않는 상위 TARGET_WINDOW_COUNT 개)
     # ---------------------------
-    total_secs = int((end_idx - start_idx) / fps) + 1
     if total_secs <= 0:
         cap.release()
         return 0, save_dir
 
-    window_len = min(TARGET_WINDOW_SEC, total_secs)  # 영상이 15분보다 짧으면 영상 길이로
-    # 초별 카운트를 배열로 변환 (start_sec=0 기준)
-    sec_counts = [0] * total_secs
-    for s, c in person_count_by_sec.items():
-        local_s = s - int(start_idx / fps)
-        if 0 <= local_s < total_secs:
-            sec_counts[local_s] += c
-
-    # 슬라이딩 윈도우로 최대 합 찾기 (prefix sum)
-    prefix = [0]
-    for v in sec_counts:
-        prefix.append(prefix[-1] + v)
-
-    best_sum = -1
-    best_start_sec_local = 0
-    for i in range(0, total_secs - window_len + 1):
-        j = i + window_len
-        ssum = prefix[j] - prefix[i]
-        if ssum > best_sum:
-            best_sum = ssum
-            best_start_sec_local = i
-
-    # 로컬 구간(시작초) → 실제 프레임 인덱스
-    best_start_sec_global = int(start_idx / fps) + best_start_sec_local
-    best_end_sec_global = best_start_sec_global + window_len
-
-    # 프레임 범위 (닫힌-열린)
-    best_start_frame = int(best_start_sec_global * fps)
-    best_end_frame = int(min(end_idx, best_end_sec_global * fps))
-
-    # 예외: 1차 패스에서 단 한 번도 사람이 안 잡힌 경우 → 규칙 그대로 15분 구간 사용
-    if best_sum <= 0:
-        best_start_frame = start_idx
-        best_end_frame = min(end_idx, start_idx + int(window_len * fps))
+    sec_counts = counts_array(person_count_by_sec, base_sec, total_secs)
+    windows = top_windows(sec_counts, window_len, TARGET_WINDOW_COUNT)
+
+    # 로컬 구간(시작초) → 실제 프레임 범위 (닫힌-열린)
+    ranges = []
+    for start_sec_local, ssum in windows:
+        best_start_frame = int((base_sec + start_sec_local) * fps)
+        best_end_frame = int(min(end_idx, (base_sec + start_sec_local + window_len) * fps))
+        # 예외: 1차 패스에서 단 한 번도 사람이 안 잡힌 경우 → 규칙 그대로 15분 구간 사용
+        if ssum <= 0:
+            best_start_frame = start_idx
+            best_end_frame = min(end_idx, start_idx + int(window_len * fps))
+        ranges.append((best_start_frame, best_end_frame))
+    if len(ranges) > 1:
+        print(f"[WINDOWS] {video_filename}: " + ", ".join(
+            f"{base_sec + s}s~(person {c})" for s, c in windows))
 
     # ---------------------------
     # 3) 2차 패스: 해당 구간에서만 2초당 1프레임 저장
@@ -863,23 +1037,22 @@ def detect_and_extract_worker(args):
     interval_frames = max(1, int(round(fps * EXTRACT_EVERY_SEC)))
     saved = 0
 
-    # 2차 패스 진행 바
-    with tqdm(total=max(0, best_end_frame - best_start_frame),
-              desc=f"[PASS2] {video_filename} [{best_start_frame}-{best_end_frame}) GPU:{device_id}") as pbar:
-
-        for fidx in range(best_start_frame, best_end_frame, interval_frames):
-            cap.set(cv2.CAP_PROP_POS_FRAMES, fidx)
-            ret, frame = cap.read()
-            if not ret:
-                break
+    with FrameWriter() as writer:
+        for best_start_frame, best_end_frame in ranges:
+            # 2차 패스 진행 바
+            with tqdm(total=max(0, best_end_frame - best_start_frame),
+                      desc=f"[PASS2] {video_filename} [{best_start_frame}-{best_end_frame}) GPU:{device_id}") as pbar:
 
-            out_name = f"{video_filename}_{fidx:06d}.jpg"
-            out_path = os.path.join(save_dir, out_name)
-            cv2.imwrite(out_path, frame)
-            saved += 1
+                # 구간 시작에서 한 번만 seek, 이후는 간격에 따라 grab 전진 / seek 자동 선택
+                for fidx, frame in iter_frames(video_path, range(best_start_frame, best_end_frame, interval_frames),
+                                               seek_threshold=seek_threshold(probe)):
+                    out_name = f"{video_filename}_{fidx:06d}.jpg"
+                    out_path = os.path.join(save_dir, out_name)
+                    writer.submit(out_path, frame)
+                    saved += 1
 
-            # 진행바는 실제 읽은 프레임 수 기준으로 대략 업데이트
-            pbar.update(interval_frames)
+                    # 진행바는 실제 읽은 프레임 수 기준으로 대략 업데이트
+                    pbar.update(interval_frames)
 
     cap.release()
     return saved, save_dir
@@ -893,6 +1066,21 @@ def runner_top(task_args, video_key, gpu_id):
     return (video_key, gpu_id, int(saved))
 
 
+def build_person_task(video_path, total_frames, fps, sub_category, video_key, gpu_id):
+    """실행할 GPU 가 정해질 때(배정 또는 steal) runner_top 인자 생성"""
+    task_args = (
+        0,                              # start_idx (영상 처음)
+        total_frames,                   # end_idx   (영상 끝)
+        gpu_id,                         # device_id
+        video_path,                     # video_path
+        fps,                            # fps
+        max(1, PERSON_SAMPLING_RATE),   # sampling_rate
+        OUTPUT_ROOT,                    # output_root
+        sub_category                    # category(=폴더명)
+    )
+    return (task_args, video_key, gpu_id)
+
+
 # =============================
 # GPU 유틸: GPU 리스트 파싱
 # =============================
@@ -993,6 +1181,9 @@ if __name__ == "__main__":
     category_frame_counter = defaultdict(int)
     total_extracted_frames = 0
 
+    # 영상 메타데이터 (캐시에 없는 것만 병렬 프로브) → 이후 스케줄링은 디코딩 없이 진행
+    probes = probe_videos([video_path for _, _, video_path in all_video_entries])
+
     # =====================
     # 사람 감지 + 고급 스케줄러
     # =====================
@@ -1013,89 +1204,59 @@ if __name__ == "__main__":
 
         print(f"🟢 사용 GPU: {valid_gpu_ids} | GPU당 동시 처리 제한: {WORKERS_PER_GPU}")
 
-        # 1) 비디오 라운드로빈 배정 + (세그먼트 대신) '단일 태스크' 생성
-        per_gpu_queues = {gid: deque() for gid in valid_gpu_ids}
-        expected_segments = {}
-        done_segments = defaultdict(int)
+        # 1) 영상별 '단일 태스크' 생성 (GPU 는 스케줄러가 길이 기준으로 배정)
+        person_tasks = []           # (video_key, 영상 길이(초), build_args)
         saved_frames_per_video = defaultdict(int)
 
-        for vidx, (sub_category, video_file, video_path) in enumerate(all_video_entries):
+        for sub_category, video_file, video_path in all_video_entries:
             if is_processed(PROCESSED_LOG, root_category, sub_category, video_file):
                 print(f"✅ 이미 처리됨: {video_file}")
                 continue
 
-            assigned_gpu = valid_gpu_ids[vidx % gpu_count]
-
-            # [변경] 세그먼트 문구 제거 + 전역 15분 1구간 처리 안내
-            print(f"🎬 준비: {video_file} → GPU {assigned_gpu} (전역 15분 1구간 추출)")
-
             # 전체 영상 길이/ fps 조회 후 '한 건'의 태스크만 생성
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            cap.release()
+            fps = probes[video_path]["fps"]
+            total_frames = probes[video_path]["frames"]
 
             if total_frames <= 0:
                 print(f"⚠️ {video_file}: 유효한 프레임이 없어 스킵")
                 continue
 
-            task_args = (
-                0,                              # start_idx (영상 처음)
-                total_frames,                   # end_idx   (영상 끝)
-                assigned_gpu,                   # device_id
-                video_path,                     # video_path
-                fps,                            # fps
-                max(1, PERSON_SAMPLING_RATE),   # sampling_rate
-                OUTPUT_ROOT,                    # output_root
-                sub_category                    # category(=폴더명)
-            )
+            duration_sec = total_frames / fps if fps > 0 else float(total_frames)
+            print(f"🎬 준비: {video_file} (길이 {duration_sec:.0f}s, 전역 15분 1구간 추출)")
 
             video_key = (sub_category, video_file)
-            expected_segments[video_key] = 1  # [변경] 항상 1개로 고정
-            per_gpu_queues[assigned_gpu].append((task_args, video_key, assigned_gpu))
+            person_tasks.append((video_key, duration_sec,
+                                 partial(build_person_task, video_path, total_frames, fps, sub_category, video_key)))
 
-        total_tasks = sum(len(q) for q in per_gpu_queues.values())
-        if total_tasks == 0:
+        if not person_tasks:
             print("처리할 태스크가 없습니다.")
             raise SystemExit(0)
 
-        gpu_semaphores = {gid: threading.BoundedSemaphore(WORKERS_PER_GPU) for gid in valid_gpu_ids}
-        pool_size = max(1, gpu_count * max(1, WORKERS_PER_GPU))
-        print(f"🚀 전역 병렬 처리 시작 — 풀 크기: {pool_size} (GPU:{valid_gpu_ids}, GPU당 워커:{WORKERS_PER_GPU})")
-
-        cb_lock = threading.Lock()
-        manager = Manager()
-        remaining = manager.Value('i', total_tasks)
-
-        def _on_done(result):
-            vkey, gid, saved = result
-            with cb_lock:
-                done_segments[vkey] += 1
-                saved_frames_per_video[vkey] += int(saved)
-                remaining.value -= 1
-
-                gpu_semaphores[gid].release()
+        print(f"🚀 전역 병렬 처리 시작 — 영상 {len(person_tasks)}개 (GPU:{valid_gpu_ids}, GPU당 워커:{WORKERS_PER_GPU}, "
+              f"모델 워커당 1회 로드, 긴 영상 우선 + 유휴 GPU 작업 가져오기)")
 
-                if done_segments[vkey] == expected_segments[vkey]:
-                    sub_category, video_file = vkey
-                    mark_as_processed(PROCESSED_LOG, root_category, sub_category, video_file)
-                    print(f"✅ 완료: {video_file} | 저장 프레임: {saved_frames_per_video[vkey]}")
-
-                _schedule_more()
-
-        def _schedule_more():
-            for gid in list(per_gpu_queues.keys()):
-                while per_gpu_queues[gid] and gpu_semaphores[gid].acquire(blocking=False):
-                    task_args, vkey, g = per_gpu_queues[gid].popleft()
-                    pool.apply_async(runner_top, args=(task_args, vkey, g), callback=_on_done)
-
-        with Pool(processes=pool_size) as pool:
-            _schedule_more()
-            while True:
-                with cb_lock:
-                    if remaining.value <= 0:
-                        break
-                time.sleep(0.1)
+        def _on_done(vkey, gid, result, error):
+            if error is not None:
+                return      # 처리 로그에 남기지 않음 → 다음 실행에서 재시도
+            _, _, saved = result
+            saved_frames_per_video[vkey] += int(saved)
+            sub_category, video_file = vkey
+            mark_as_processed(PROCESSED_LOG, root_category, sub_category, video_file)
+            print(f"✅ 완료: {video_file} (GPU {gid}) | 저장 프레임: {saved_frames_per_video[vkey]}")
+
+        # GPU 별 풀: 워커 프로세스가 시작될 때 해당 GPU 에 모델을 1회 로드/워밍업하고 태스크 간 재사용
+        pools = {
+            gid: Pool(processes=max(1, WORKERS_PER_GPU), initializer=init_person_worker,
+                      initargs=(YOLO_WEIGHTS, gid))
+            for gid in valid_gpu_ids
+        }
+        try:
+            device_stats = run_work_stealing(pools, WORKERS_PER_GPU, person_tasks, runner_top, on_done=_on_done)
+        finally:
+            for gpu_pool in pools.values():
+                gpu_pool.terminate()
+                gpu_pool.join()
+        print_device_stats(device_stats)
 
         for (sub_category, video_file), saved_cnt in saved_frames_per_video.items():
             category_frame_counter[sub_category] += saved_cnt
@@ -1103,46 +1264,66 @@ if __name__ == "__main__":
 
     else:
         # 기존 균일간격 모드 유지
-        def _probe(video_path):
-            cap = cv2.VideoCapture(video_path)
-            fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            duration_sec = int(total_frames / fps) if fps > 0 else 0
-            cap.release()
-            return duration_sec, fps
-
-        video_tasks = []
-        save_info = []
+        segment_tasks = []          # (구간 길이(프레임), task)
+        expected_segments = {}      # video_key → 구간 수
 
         for (sub_category, video_file, video_path) in all_video_entries:
             if is_processed(PROCESSED_LOG, root_category, sub_category, video_file):
                 print(f"✅ 이미 처리됨: {video_file}")
                 continue
 
-            duration_sec, fps = _probe(video_path)
+            fps = probes[video_path]["fps"]
+            duration_sec = int(probes[video_path]["duration"])
             num_frames_to_extract, interval_frames = get_frames_to_extract(duration_sec, fps, frames_per_sec=UNIFORM_FRAMES_PER_SEC)
 
             if num_frames_to_extract > 0:
-                print(f"📹 {video_file} (길이: {duration_sec}s, FPS: {fps:.2f}) → 추출 {num_frames_to_extract}장 (간격 {interval_frames}프레임)")
                 video_name = os.path.splitext(video_file)[0]
                 save_dir = os.path.join(OUTPUT_ROOT, sub_category, video_name)
-                video_tasks.append((video_path, save_dir, num_frames_to_extract, interval_frames))
-                save_info.append((sub_category, video_file))
+                video_key = (sub_category, video_file)
+                segments = plan_uniform_segments(
+                    video_path, uniform_frame_indices(video_path, num_frames_to_extract, interval_frames), fps)
+                print(f"📹 {video_file} (길이: {duration_sec}s, FPS: {fps:.2f}) → 추출 {num_frames_to_extract}장 "
+                      f"(간격 {interval_frames}프레임, {len(segments)}구간)")
+                expected_segments[video_key] = len(segments)
+                for k, seg in enumerate(segments, 1):
+                    zip_tag = f"{k:02d}_" if len(segments) > 1 else ""
+                    segment_tasks.append((seg[-1] - seg[0] + 1,
+                                          (video_key, video_path, save_dir, seg, interval_frames, zip_tag)))
             else:
                 print(f"⚠️ {video_file}: 추출 프레임 없음. 스킵")
 
-        print(f"총 처리할 영상 수: {len(video_tasks)}")
+        # 긴 구간부터 → 마지막에 긴 작업 하나만 남아 코어가 노는 시간 최소화
+        segment_tasks.sort(key=lambda t: -t[0])
+        print(f"총 처리할 영상 수: {len(expected_segments)} (구간 {len(segment_tasks)}개)")
 
-        def process_video_task(task):
-            video_path, save_dir, num_frames, interval_frames = task
-            return save_dir, extract_frames_uniform(video_path, save_dir, num_frames, interval_frames)
+        done_segments = defaultdict(int)
+        frames_per_video = defaultdict(int)
+        dedup_jobs = {}
+        # 중복 제거는 낱장 이미지 대상 → ZIP 배치만 저장하는 경우 생략
+        run_dedup = FRAME_DEDUP and (FRAME_ZIP_BATCH <= 0 or FRAME_ZIP_LOOSE)
+        if FRAME_DEDUP and not run_dedup:
+            print("⚠️ FRAME_ZIP_BATCH 모드(낱장 미저장)에서는 FRAME_DEDUP 을 적용하지 않습니다. (FRAME_ZIP_LOOSE=1 필요)")
 
         num_workers = max(1, os.cpu_count() or 4)
         with Pool(processes=num_workers) as pool:
-            results = pool.map(process_video_task, video_tasks)
-
-        for idx, (save_dir, frame_count) in enumerate(results):
-            sub_category, video_file = save_info[idx]
+            for video_key, save_dir, count in pool.imap_unordered(
+                    uniform_segment_task, [t for _, t in segment_tasks], chunksize=1):
+                done_segments[video_key] += 1
+                frames_per_video[video_key] += count
+                # 영상의 모든 구간이 끝나면 (선택) 중복 제거를 같은 풀에 넘김
+                if (done_segments[video_key] == expected_segments[video_key]
+                        and run_dedup and frames_per_video[video_key] > 0):
+                    dedup_jobs[video_key] = pool.apply_async(dedup_dir, (save_dir,), {"delete": True})
+
+            for video_key, job in dedup_jobs.items():
+                stats = job.get()
+                print(f"🧹 {os.path.basename(stats['dir'])}: {stats['total']} → {stats['kept']}장 "
+                      f"(중복 {stats['dup_ratio'] * 100:.1f}% 삭제)")
+                frames_per_video[video_key] = stats["kept"]
+
+        for video_key in expected_segments:
+            sub_category, video_file = video_key
+            frame_count = frames_per_video[video_key]
             if frame_count > 0:
                 category_frame_counter[sub_category] += frame_count
                 total_extracted_frames += frame_count
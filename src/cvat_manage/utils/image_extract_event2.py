@@ -1,9 +1,10 @@
 import os
-import cv2
 import csv
 import json
 import psutil
 import time
+from bisect import bisect_left
+from math import ceil
 from pathlib import Path
 from multiprocessing import Pool
 from tqdm import tqdm
@@ -11,6 +12,11 @@ from dotenv import load_dotenv
 from collections import defaultdict
 from datetime import datetime
 
+from frame_writer import FrameWriter
+from frame_zip import IMAGE_EXTS
+from video_frames import iter_frames, keyframe_indices, split_at_keyframes
+from video_probe import get_probe, probe_videos, seek_threshold
+
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
@@ -24,13 +30,13 @@ def get_event_time(json_path):
     return [(clip['category'], clip['timestamp']) for clip in data.get('clips', {}).values()]
 
 def get_video_info(video_path):
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
+    # 메타데이터는 프로브 캐시 (시작 시 probe_videos 로 병렬 프로브, 재실행 시 파일이 그대로면 재사용)
+    info = get_probe(video_path)
+    if info["frames"] <= 0 and info["fps"] <= 0:
         raise ValueError(f"비디오를 열 수 없습니다: {video_path}")
-    
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    cap.release()
+
+    fps = info["fps"]
+    total_frames = info["frames"]
 
     if fps <= 0 or total_frames <= 0:
         raise ValueError(f"FPS 또는 총 프레임 수가 유효하지 않습니다: {video_path} (fps={fps}, frames={total_frames})")
@@ -54,56 +60,63 @@ def get_event_frame_indices(video_path, event_interval_sec=0.5):
     return sorted(f for f in frames if f < total_frames)
 
 
-def chunk_indices(total_frames, num_chunks):
-    chunk_size = total_frames // num_chunks
-    return [(i * chunk_size, (i + 1) * chunk_size) if i < num_chunks - 1 else (i * chunk_size, total_frames)
-            for i in range(num_chunks) ]
+def get_event_ranges(video_path, total_frames):
+    """클립 JSON 의 이벤트 구간 합집합 → 겹치거나 맞닿은 구간을 합친 [(start, end), ...] (end 미포함, 시작 순)"""
+    json_path = os.path.splitext(video_path)[0] + ".json"
+    spans = sorted((max(0, s), min(e, total_frames)) for _, (s, e) in get_event_time(json_path))
+    merged = []
+    for start, end in spans:
+        if start >= end:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def plan_event_tasks(video_path, target_indices, ranges, num_workers, fps):
+    """
+    이벤트 구간별 대상 프레임 묶음 → 워커 작업 목록 (구간 길이가 긴 것부터)
+    - 구간 하나가 (전체 구간 길이 / 워커 수) 보다 길면 키프레임 경계에서 나눔 → 큰 이벤트 하나가 한 워커에 몰리지 않음
+    - 작업마다 첫 대상 프레임으로 한 번 seek 후 구간 안에서만 grab 전진
+    """
+    total_len = sum(end - start for start, end in ranges)
+    split_len = max(1, ceil(total_len / max(1, num_workers)))
+    keyframes = None
+    tasks = []
+    for start, end in ranges:
+        lo, hi = bisect_left(target_indices, start), bisect_left(target_indices, end)
+        indices = target_indices[lo:hi]
+        if not indices:
+            continue
+        if end - start > split_len:
+            if keyframes is None:
+                keyframes = keyframe_indices(video_path, fps)
+            tasks.extend(split_at_keyframes(indices, split_len, keyframes))
+        else:
+            tasks.append(indices)
+    tasks.sort(key=lambda idx: -(idx[-1] - idx[0] + 1))
+    return tasks
 
-def extract_frames_worker(args):
-    start_idx, end_idx, video_path, target_indices, output_root, category = args
 
-    cap = cv2.VideoCapture(video_path)
+def extract_event_range(args):
+    """이벤트 구간 하나의 대상 프레임 저장 (Pool 용) → 저장 수"""
+    video_path, indices, output_root, category = args
+
     video_filename = os.path.splitext(os.path.basename(video_path))[0]
     save_dir = os.path.join(output_root, category, video_filename)
     os.makedirs(save_dir, exist_ok=True)
 
-    worker_targets = sorted([idx for idx in target_indices if start_idx <= idx < end_idx])
-    target_cursor = 0
-    frame_idx = start_idx
-    cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
-
-    # 성능 측정 시작
-    psutil.cpu_percent(interval=None)
-    start_time = time.time()
-
-    with tqdm(total=len(worker_targets),desc=f"{video_filename} [{start_idx}-{end_idx}]", position=0, leave=True) as pbar:
-        while frame_idx < end_idx and target_cursor < len(worker_targets):
-            if frame_idx != worker_targets[target_cursor]:
-                cap.read()
-                frame_idx += 1
-                continue
-
-            ret, frame = cap.read()
-            if not ret:
-                break
-
+    # 인코딩/저장은 백그라운드 writer 가 처리 → 디코딩이 저장을 기다리지 않음
+    # 이벤트 구간마다 작업이 나뉘어 ZIP 배치가 잘게 쪼개지므로 낱장 저장 고정 (zip_batch=0)
+    count = 0
+    with FrameWriter(zip_batch=0) as writer:
+        for frame_idx, frame in iter_frames(video_path, indices, seek_threshold=seek_threshold(get_probe(video_path))):
             out_name = f"{video_filename}_{frame_idx:06d}.jpg"
-            out_path = os.path.join(save_dir, out_name)
-            cv2.imwrite(out_path, frame)
-
-            frame_idx += 1
-            target_cursor += 1
-
-            #실시간 CPU 표시
-            cpu_now = psutil.cpu_percent(interval=None)
-            pbar.set_postfix(cpu=f"{cpu_now:.1f}%")
-            pbar.update(1)
-    
-    cap.release()
-
-    elapsed = time.time() - start_time
-    avg_fps = len(worker_targets) / elapsed if elapsed > 0 else 0
-    print(f"[{video_filename}] 평균 FPS: {avg_fps:.2f}, 작업 시간: {elapsed:.1f}초")
+            writer.submit(os.path.join(save_dir, out_name), frame)
+            count += 1
+    return count
 
 def is_processed(log_file, root_category, sub_category, video_file):
     if not os.path.exists(log_file):
@@ -156,6 +169,16 @@ if __name__ == "__main__":
     category_frame_counter = defaultdict(int)
     total_extracted_frames = 0
 
+    # 풀은 한 번만 만들어 영상 간 재사용
+    pool = Pool(processes=num_workers)
+
+    # 영상 메타데이터 미리 병렬 프로브 (캐시에 없는 것만)
+    probe_videos([
+        os.path.join(input_root, c, f)
+        for c in os.listdir(input_root) if c not in excluded_categories and os.path.isdir(os.path.join(input_root, c))
+        for f in os.listdir(os.path.join(input_root, c)) if f.lower().endswith((".mp4", ".avi", ".mov"))
+    ])
+
     for category in os.listdir(input_root):
         category_path = os.path.join(input_root, category)
         if not os.path.isdir(category_path):
@@ -185,26 +208,36 @@ if __name__ == "__main__":
                 print(f"{video_file}: 추출할 이벤트 프레임이 없습니다.")
                 continue
 
-            print(f"{video_file}: 총 {len(target_frame_indices)}개 이벤트 프레임 추출 예정")
-
-            total_frames = get_video_info(video_path)[1]
-            chunk_ranges = chunk_indices(total_frames, num_workers)
-            args_list = [
-                (start, end, video_path, target_frame_indices, output_root, sub_category)
-                for (start, end) in chunk_ranges
-            ]
-
-            with Pool(processes=num_workers) as pool:
-                pool.map(extract_frames_worker, args_list)
+            fps, total_frames = get_video_info(video_path)
+            event_ranges = get_event_ranges(video_path, total_frames)
+            tasks = plan_event_tasks(video_path, target_frame_indices, event_ranges, num_workers, fps)
+            covered = sum(end - start for start, end in event_ranges)
+            print(f"{video_file}: 총 {len(target_frame_indices)}개 이벤트 프레임 추출 예정 "
+                  f"(이벤트 구간 {len(event_ranges)}개, 디코딩 범위 {covered}/{total_frames}프레임, 작업 {len(tasks)}개)")
+
+            # 성능 측정 시작
+            psutil.cpu_percent(interval=None)
+            start_time = time.time()
+            saved = 0
+            with tqdm(total=len(target_frame_indices), desc=video_file) as pbar:
+                for count in pool.imap_unordered(
+                        extract_event_range, [(video_path, idx, output_root, sub_category) for idx in tasks], chunksize=1):
+                    saved += count
+                    pbar.set_postfix(cpu=f"{psutil.cpu_percent(interval=None):.1f}%")
+                    pbar.update(count)
+            elapsed = time.time() - start_time
+            print(f"[{video_file}] 평균 FPS: {saved / elapsed if elapsed > 0 else 0:.2f}, 작업 시간: {elapsed:.1f}초")
 
             saved_dir = os.path.join(output_root, sub_category, os.path.splitext(video_file)[0])
             if os.path.exists(saved_dir):
-                image_count = len([f for f in os.listdir(saved_dir) if f.endswith(".jpg")])
+                image_count = len([f for f in os.listdir(saved_dir) if f.lower().endswith(IMAGE_EXTS)])
                 category_frame_counter[sub_category] += image_count
                 total_extracted_frames += image_count
 
             mark_as_processed(log_file, root_category, sub_category, video_file)
-    
+    pool.close()
+    pool.join()
+
     print("모든 이벤트 프레임 추출 완료")
 
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
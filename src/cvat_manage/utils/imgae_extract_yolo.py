@@ -6,13 +6,23 @@ import zipfile
 from pathlib import Path
 from math import ceil
 from multiprocessing import Pool
-from ultralytics import YOLO
 from tqdm import tqdm
 from dotenv import load_dotenv
 
+from person_detect import (PERSON_BATCH_SIZE, MotionGate, background_iter, detect_persons, downscale,
+                           init_person_worker, load_model)
+from frame_writer import FrameWriter
+from frame_zip import FRAME_ZIP_BATCH, IMAGE_EXTS
+from video_frames import FrameSampler
+from video_probe import probe_videos
+
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+# >0 이면 프레임 간격 대신 n초마다 탐지 (타임스탬프 기준, 가변 fps 대응)
+PERSON_SAMPLING_SEC = float(os.getenv("PERSON_SAMPLING_SEC", "0"))
+YOLO_WEIGHTS = os.getenv("YOLO_WEIGHTS", "yolov8n.pt")
+
 def chunk_indices(total_frames, num_chunks):
     chunk_size = total_frames // num_chunks
     return [(i * chunk_size, (i + 1) * chunk_size) if i < num_chunks - 1 else (i * chunk_size, total_frames)
@@ -22,7 +32,8 @@ def detect_and_extract_worker(args):
     start_idx, end_idx, device_id, video_path, fps, sampling_rate, output_root, category = args
 
     torch.cuda.set_device(device_id)
-    yolo = YOLO("yolov8n.pt")
+    # GPU 별 풀의 initializer 가 이미 로드한 모델을 그대로 사용 (이후 청크/영상도 재사용)
+    yolo = load_model(YOLO_WEIGHTS, device_id)
     cap = cv2.VideoCapture(video_path)
     cap.set(cv2.CAP_PROP_POS_FRAMES, start_idx)
 
@@ -30,30 +41,56 @@ def detect_and_extract_worker(args):
     save_dir = os.path.join(output_root, category, video_filename)
     os.makedirs(save_dir, exist_ok=True)
 
-    frame_idx = start_idx
-    with tqdm(total=end_idx - start_idx, desc=f"{video_filename} GPU:{device_id}") as pbar:
+    # 샘플 대상이 아닌 프레임은 grab() 만 하고 샘플 프레임만 retrieve()
+    sampler = FrameSampler(sampling_rate, PERSON_SAMPLING_SEC, fps)
+    # 움직임 없는 샘플은 탐지 생략 → 직전 탐지 결과 재사용
+    motion = MotionGate()
+    last_has_person = [False]
+
+    def produce(put):
+        frame_idx = start_idx
         while frame_idx < end_idx:
-            ret, frame = cap.read()
-            if not ret:
+            if not cap.grab():
                 break
-            
-            if frame_idx % sampling_rate != 0:
-                frame_idx += 1
-                pbar.update(1)
-                continue
-
-            results = yolo(frame, verbose=False)[0]
-            has_person = any(results.names[int(cls)] == "person" for cls in results.boxes.cls)
+            if sampler.hit(cap, frame_idx):
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                # 저장용 원본 + 추론용 축소본 (PERSON_INFER_MAX_SIDE), 움직임 없으면 None
+                det = downscale(frame) if motion.needs_detection(frame) else None
+                if not put((frame_idx, frame, det)):
+                    return
+            frame_idx += 1
 
-            if has_person:
-                out_name = f"{video_filename}_{frame_idx}.jpg"
+    def flush(batch):
+        flags = iter(detect_persons(yolo, [b[2] for b in batch if b[2] is not None], device_id=device_id))
+        for idx, frame, det in batch:
+            if det is not None:
+                last_has_person[0] = next(flags)
+            if last_has_person[0]:
+                out_name = f"{video_filename}_{idx}.jpg"
                 out_path = os.path.join(save_dir, out_name)
-                cv2.imwrite(out_path, frame)
-
-            frame_idx += 1
-            pbar.update(1)
+                writer.submit(out_path, frame)
+        batch.clear()
+
+    # 디코딩 스레드 ↔ 배치 추론이 bounded queue 로 겹쳐 진행
+    batch = []
+    done_idx = start_idx
+    # ZIP 배치 모드(FRAME_ZIP_BATCH)면 한 영상을 GPU 별 청크로 나눠 쓰므로 청크별 ZIP 이름 구분
+    with FrameWriter(zip_tag=f"{device_id:02d}_") as writer, \
+            tqdm(total=end_idx - start_idx, desc=f"{video_filename} GPU:{device_id}") as pbar:
+        for item in background_iter(produce):
+            batch.append(item)
+            pbar.update(item[0] + 1 - done_idx)
+            done_idx = item[0] + 1
+            if len(batch) >= PERSON_BATCH_SIZE:
+                flush(batch)
+        flush(batch)
     
     cap.release()
+    ms = motion.stats()
+    print(f"{video_filename} GPU:{device_id}: YOLO {ms['detected']} / 움직임 없음 재사용 {ms['motion_skipped']} "
+          f"(생략률 {ms['skip_rate'] * 100:.1f}%)")
 
 def compress_images(output_root, batch_size=100):
     for category in os.listdir(output_root):
@@ -68,7 +105,8 @@ def compress_images(output_root, batch_size=100):
             if not os.path.isdir(folder_path):
                 continue
 
-            image_files = sorted([f for f in os.listdir(folder_path) if f.lower().endswith(".jpg")])
+            # FRAME_FORMAT(jpg/webp/png) 과 관계없이 저장된 프레임 모두
+            image_files = sorted([f for f in os.listdir(folder_path) if f.lower().endswith(IMAGE_EXTS)])
             total_images = len(image_files)
 
             if total_images == 0:
@@ -121,6 +159,19 @@ if __name__ == "__main__":
     excluded_raw = os.getenv("EXCLUDED_CATEGORIES","")
     excluded_categories = set(x.strip() for x in excluded_raw.split(",") if x.strip())
     
+    # 영상 메타데이터 미리 병렬 프로브 (캐시에 없는 것만)
+    probes = probe_videos([
+        os.path.join(input_root, c, f)
+        for c in os.listdir(input_root) if c not in excluded_categories and os.path.isdir(os.path.join(input_root, c))
+        for f in os.listdir(os.path.join(input_root, c)) if f.lower().endswith((".mp4", ".avi", ".mov"))
+    ])
+
+    # GPU 별 풀: 워커가 시작될 때 해당 GPU 에만 모델을 1회 로드/워밍업하고 영상 간 재사용
+    # (공용 풀이면 아무 워커나 아무 device_id 를 받아 프로세스마다 모든 GPU 에 모델/CUDA 컨텍스트가 생김)
+    pools = {
+        gid: Pool(processes=1, initializer=init_person_worker, initargs=(YOLO_WEIGHTS, gid))
+        for gid in range(num_gpus)
+    }
     for category in os.listdir(input_root):
         if category in excluded_categories:
             print(f"❌ 제외된 폴더: {category}")
@@ -139,10 +190,8 @@ if __name__ == "__main__":
                 print(f"{video_file} 이미 처리됨, 스킵합니다.")
                 continue
 
-            cap = cv2.VideoCapture(video_path)
-            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            cap.release()
+            total_frames = probes[video_path]["frames"]
+            fps = probes[video_path]["fps"]
 
             sampling_rate = int(fps * seconds_interval)
 
@@ -152,11 +201,18 @@ if __name__ == "__main__":
                 for device_id, (start, end) in enumerate(chunk_ranges)
             ]
 
-            with Pool(processes=num_gpus) as pool:
-                pool.map(detect_and_extract_worker, args_list)
+            # 청크 i → GPU i 의 풀, 하나라도 실패하면 예외 (처리 로그에 남기지 않음)
+            results = [pools[args[2]].apply_async(detect_and_extract_worker, (args,)) for args in args_list]
+            for r in results:
+                r.get()
 
             mark_as_processed(log_file, video_file)
+    for gpu_pool in pools.values():
+        gpu_pool.close()
+        gpu_pool.join()
 
     print(f"✅ 사람 감지된 프레임을 {seconds_interval}초마다 저장 완료")
 
-    compress_images(output_root, batch_size=100)
+    # ZIP 배치 모드면 추출하면서 이미 ZIP 으로 저장됨 (낱장 재읽기/재압축 불필요)
+    if FRAME_ZIP_BATCH <= 0:
+        compress_images(output_root, batch_size=100)
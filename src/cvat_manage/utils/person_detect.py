@@ -0,0 +1,222 @@
+"""
+사람 감지 공통 (배치 추론 + 디코딩/추론 겹치기)
+
+배경
+- 1차 패스가 yolo(frame) 를 프레임 1장씩 호출 → GPU 가 배치를 못 받고, 디코딩과 추론이 번갈아 대기
+동작
+- background_iter(produce): 디코딩(grab/retrieve/resize)을 별도 스레드에서 실행하고 bounded queue 로 넘김
+  (cv2 디코딩은 GIL 을 놓으므로 메인 스레드의 추론과 실제로 겹침, 큐가 차면 디코딩이 기다림)
+- detect_persons(model, frames): 모은 프레임을 한 번의 forward 로 추론해 프레임별 person 여부 반환
+- downscale(): 디코딩 스레드에서 모델 입력 크기(긴 변)로 미리 축소 → 큐 메모리/전처리 비용 감소
+- MotionGate: 축소 그레이 프레임을 직전 '탐지한' 프레임과 비교해 움직임이 없으면 탐지를 생략하고 직전 결과 재사용
+  (정지된 CCTV 구간에서 GPU 추론을 건너뜀, 디코딩 스레드에서 실행)
+- load_model(): 프로세스당 (가중치, GPU) 별로 1회만 로드 + 워밍업 후 재사용
+  Pool(initializer=init_person_worker, initargs=(weights, device_id)) 로 워커 시작 시 미리 로드
+
+.env
+    PERSON_BATCH_SIZE=16        # 한 번에 추론할 프레임 수
+    PERSON_QUEUE_SIZE=64        # 디코딩 → 추론 큐 크기 (프레임)
+    PERSON_INFER_MAX_SIDE=0     # >0 이면 추론용 프레임 긴 변을 이 크기로 축소 (예: 640, YOLO 기본 입력)
+    MOTION_PREFILTER=1          # 0 이면 모든 샘플 프레임 탐지
+    MOTION_SIZE=160             # 비교용 그레이 프레임 가로 크기
+    MOTION_PIXEL_DIFF=25        # 이 값 이상 밝기 차이가 나는 픽셀을 '변화'로 간주
+    MOTION_MIN_RATIO=0.002      # 변화 픽셀 비율이 이 값 미만이면 움직임 없음
+    MOTION_MAX_SKIP=30          # 연속 생략 상한 (넘으면 강제로 1회 탐지)
+
+워밍업 벤치마크: python benchmark_extract.py warmup --device 0
+"""
+
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from dotenv import load_dotenv
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+PERSON_BATCH_SIZE = max(1, int(os.getenv("PERSON_BATCH_SIZE", "16")))
+PERSON_QUEUE_SIZE = max(1, int(os.getenv("PERSON_QUEUE_SIZE", "64")))
+PERSON_INFER_MAX_SIDE = int(os.getenv("PERSON_INFER_MAX_SIDE", "0"))
+
+MOTION_PREFILTER = os.getenv("MOTION_PREFILTER", "1") in ("1", "true", "True")
+MOTION_SIZE = max(16, int(os.getenv("MOTION_SIZE", "160")))
+MOTION_PIXEL_DIFF = int(os.getenv("MOTION_PIXEL_DIFF", "25"))
+MOTION_MIN_RATIO = float(os.getenv("MOTION_MIN_RATIO", "0.002"))
+MOTION_MAX_SKIP = int(os.getenv("MOTION_MAX_SKIP", "30"))
+
+_END = object()
+
+# 프로세스 내 모델 캐시: (weights, device_id) → YOLO
+_MODELS: Dict[Tuple[str, Optional[int]], object] = {}
+
+
+def _device_kwargs(device_id: Optional[int]) -> dict:
+    """
+    ultralytics device 인자 (음수 → cpu, None → ultralytics 기본값)
+    torch.cuda.set_device() 만으로는 ultralytics 가 cuda:0 을 고르므로 GPU 를 명시
+    """
+    if device_id is None:
+        return {}
+    if device_id >= 0 and _cuda_available():
+        return {"device": f"cuda:{device_id}"}
+    return {"device": "cpu"}
+
+
+def _cuda_available() -> bool:
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+
+def warm_up(model, device_id: Optional[int] = None, batch: int = PERSON_BATCH_SIZE, imgsz: int = 0):
+    """빈 프레임 배치로 1회 추론 → CUDA 컨텍스트/커널/predictor 초기화를 첫 영상 전에 끝냄"""
+    side = imgsz or PERSON_INFER_MAX_SIDE or 640
+    dummy = np.zeros((side, side, 3), dtype=np.uint8)
+    model([dummy] * max(1, batch), verbose=False, **_device_kwargs(device_id))
+
+
+def load_model(weights: str, device_id: Optional[int] = None, warmup: bool = True):
+    """(weights, device_id) 별로 프로세스당 1회만 로드 (이후 호출은 캐시 반환)"""
+    key = (weights, device_id)
+    model = _MODELS.get(key)
+    if model is None:
+        if device_id is not None and device_id >= 0 and _cuda_available():
+            import torch
+            torch.cuda.set_device(device_id)
+        from ultralytics import YOLO
+        model = YOLO(weights)
+        if warmup:
+            warm_up(model, device_id)
+        _MODELS[key] = model
+    return model
+
+
+def init_person_worker(weights: str, device_id: Optional[int] = None):
+    """Pool initializer: 워커 프로세스 시작 시 모델 로드 + 워밍업"""
+    load_model(weights, device_id)
+
+
+def downscale(frame, max_side: int = PERSON_INFER_MAX_SIDE):
+    """긴 변이 max_side 보다 크면 비율 유지 축소 (max_side <= 0 이면 그대로)"""
+    if max_side <= 0:
+        return frame
+    h, w = frame.shape[:2]
+    scale = max_side / max(h, w)
+    if scale >= 1.0:
+        return frame
+    return cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+class MotionGate:
+    """
+    샘플 프레임마다 needs_detection(frame) 호출 → False 면 탐지 생략(직전 탐지 결과 재사용)
+    - 기준 프레임은 마지막으로 '탐지한' 프레임 → 느린 변화도 누적되어 결국 탐지됨
+    - enabled=False 이면 항상 True (통계만 집계)
+    """
+
+    def __init__(self, enabled: bool = MOTION_PREFILTER, size: int = MOTION_SIZE,
+                 pixel_diff: int = MOTION_PIXEL_DIFF, min_ratio: float = MOTION_MIN_RATIO,
+                 max_skip: int = MOTION_MAX_SKIP):
+        self.enabled = enabled
+        self.size = size
+        self.pixel_diff = pixel_diff
+        self.min_ratio = min_ratio
+        self.max_skip = max_skip
+        self.ref = None
+        self.run = 0
+        self.detected = 0
+        self.skipped = 0
+
+    def _small_gray(self, frame):
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (self.size, max(1, int(h * self.size / w))), interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+    def needs_detection(self, frame) -> bool:
+        if not self.enabled:
+            self.detected += 1
+            return True
+        gray = self._small_gray(frame)
+        if self.ref is not None and self.ref.shape == gray.shape and (self.max_skip <= 0 or self.run < self.max_skip):
+            changed = np.count_nonzero(cv2.absdiff(gray, self.ref) >= self.pixel_diff)
+            if changed < self.min_ratio * gray.size:
+                self.run += 1
+                self.skipped += 1
+                return False
+        self.ref = gray
+        self.run = 0
+        self.detected += 1
+        return True
+
+    def stats(self) -> dict:
+        total = self.detected + self.skipped
+        return {"detected": self.detected, "motion_skipped": self.skipped,
+                "skip_rate": round(self.skipped / total, 4) if total else 0.0}
+
+
+def result_has_person(result) -> bool:
+    boxes = result.boxes
+    if boxes is None or len(boxes.cls) == 0:
+        return False
+    return any(result.names.get(int(c), "") == "person" for c in boxes.cls.tolist())
+
+
+def detect_persons(model, frames: List, conf: Optional[float] = None,
+                   device_id: Optional[int] = None) -> List[bool]:
+    """frames 를 한 번의 forward 로 추론 → 프레임별 person 포함 여부"""
+    if not frames:
+        return []
+    kwargs = {"verbose": False, **_device_kwargs(device_id)}
+    if conf is not None:
+        kwargs["conf"] = conf
+    return [result_has_person(r) for r in model(frames, **kwargs)]
+
+
+def background_iter(produce: Callable[[Callable[[object], bool]], None],
+                    maxsize: int = PERSON_QUEUE_SIZE) -> Iterator:
+    """
+    produce(put) 를 별도 스레드에서 실행하고 put 된 항목을 순서대로 반환
+    - put(item) 이 False 를 반환하면 소비 측이 중단된 것이므로 produce 는 바로 return 해야 함
+    - produce 에서 난 예외는 소비 측에서 다시 발생
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+    errors = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            produce(put)
+        except BaseException as e:  # 소비 스레드에서 다시 발생
+            errors.append(e)
+        finally:
+            put(_END)
+
+    t = threading.Thread(target=run, name="frame-decoder", daemon=True)
+    t.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _END:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        stop.set()
+        t.join()
@@ -10,6 +10,7 @@ CVAT 프로젝트 내 '이미 할당된 Job'을 새 작업자 집합으로 균
   * --use_all_users  : 조직의 모든 유저를 재배분 대상으로 자동 사용
   * --dry_run        : 계획만 출력 (PATCH 미수행)
   * --snapshot_only  : 현 분배 스냅샷만 출력
+  * --balance        : jobs(기본, Job 수 균등) | frames(프레임 수 × 작업자 처리 속도 균형, core/assignment_planner.py)
 - 분배 로직:
   * 모든 유저가 최소 1개씩 갖도록 강제 분배
     - 잡 수 m >= 유저 수 k → 각 1개 선지급 후 나머지는 라운드로빈
@@ -17,6 +18,7 @@ CVAT 프로젝트 내 '이미 할당된 Job'을 새 작업자 집합으로 균
 """
 
 import os
+import sys
 import argparse
 from pathlib import Path
 from collections import Counter, defaultdict
@@ -38,6 +40,13 @@ ORGANIZATIONS = [org.strip() for org in os.getenv("ORGANIZATIONS", "").split(","
 if not CVAT_URL or not TOKEN:
     raise RuntimeError("CVAT_URL_2 / TOKEN_2 환경변수(.env) 설정을 확인하세요.")
 
+# core/ 공용 모듈 (사용자 디렉터리 캐시 등)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "core"))
+from cvat_users import get_user_directory  # noqa: E402
+from cvat_bulk import BulkJobExecutor  # noqa: E402
+from assignment_planner import load_throughput, plan_assignment, print_plan_summary  # noqa: E402
+from cvat_jobs import iter_project_jobs  # noqa: E402
+
 # =========================
 # 1) 공통 유틸
 # =========================
@@ -161,13 +170,8 @@ def get_all_users(headers, org_slug: str, page_size: int = 100):
     return fetch_all_list_api(base_url, headers, params)
 
 def map_usernames_to_ids(usernames, headers, org_slug: str):
-    """새 작업자 username → user_id 매핑 (없으면 에러)"""
-    all_users = get_all_users(headers, org_slug)
-    id_map = {}
-    for u in all_users:
-        un = u.get("username")
-        if un in usernames:
-            id_map[un] = u.get("id")
+    """새 작업자 username → user_id 매핑 (없으면 에러, 조직 사용자 디렉터리 캐시 사용)"""
+    id_map = {un: uid for un, uid in get_user_directory(CVAT_URL, headers, org_slug).ids_for(usernames).items() if uid}
     missing = [u for u in usernames if u not in id_map]
     if missing:
         raise ValueError(f"다음 username을 CVAT에서 찾지 못했습니다: {missing}")
@@ -178,19 +182,16 @@ def map_usernames_to_ids(usernames, headers, org_slug: str):
 # =========================
 def print_project_assignment_snapshot(project_id: int, headers, org_slug: str):
     """현재 '이미 할당된 Job' 현황 요약 (사용자별 개수 및 예시 ID)"""
-    tasks = get_tasks_by_project(project_id, headers, org_slug)
     user_counts = Counter()
     user_jobs = defaultdict(list)
     total_assigned = 0
 
-    for t in tasks:
-        jobs = get_jobs(t["id"], headers, org_slug)
-        for j in jobs:
-            if j.get("assignee"):
-                uname = j["assignee"]["username"]
-                user_counts[uname] += 1
-                user_jobs[uname].append(j["id"])
-                total_assigned += 1
+    # 프로젝트 전체 Job 을 /api/jobs 서버 필터(할당된 Job 만)로 한 번에 조회
+    for j in iter_project_jobs(CVAT_URL, headers, project_id, org_slug, has_assignee=True):
+        uname = j["assignee"]["username"]
+        user_counts[uname] += 1
+        user_jobs[uname].append(j["id"])
+        total_assigned += 1
 
     print(f"📊 프로젝트 {project_id} - 이미 할당된 Job 수: {total_assigned}")
     for uname, cnt in user_counts.most_common():
@@ -206,27 +207,21 @@ def redistribute_assigned_jobs_in_project(
     dry_run: bool = True,
     sort_key="id",
     unassign_first: bool = False,
+    balance: str = "jobs",
 ):
     """
-    1) 프로젝트 내 모든 Task의 Job 조회
+    1) 프로젝트 Job 조회 (/api/jobs 서버 측 필터, Task 별 조회 없음)
     2) 대상: 이미 할당 + stage=annotation + state=new
     3) (옵션) 기존 할당 해제 → '모든 유저 최소 1개' 보장 분배
     """
     if not new_assignees:
         raise ValueError("new_assignees가 비었습니다. 최소 1명의 username을 지정하세요.")
 
-    # (A) 대상 잡 수집
-    tasks = get_tasks_by_project(project_id, headers, org_slug)
-    assigned_jobs = []
-    for t in tasks:
-        jobs = get_jobs(t["id"], headers, org_slug)
-        for j in jobs:
-            if (
-                j.get("assignee")
-                and j.get("stage") == "annotation"
-                and j.get("state") == "new"
-            ):
-                assigned_jobs.append(j)
+    # (A) 대상 잡 수집 (필터는 서버에서 적용)
+    assigned_jobs = list(iter_project_jobs(
+        CVAT_URL, headers, project_id, org_slug,
+        stage="annotation", state="new", has_assignee=True,
+    ))
 
     if not assigned_jobs:
         print("ℹ️ 조건(stage=annotation, state=new)을 만족하는 '이미 할당된 Job'을 찾지 못했습니다.")
@@ -239,18 +234,10 @@ def redistribute_assigned_jobs_in_project(
             preview_ids = ", ".join(str(j["id"]) for j in assigned_jobs[:20])
             print(f"🧪 Dry-run: 아래 Job들의 assignee를 해제할 예정 (총 {len(assigned_jobs)}개) 예시: {preview_ids}{' ...' if len(assigned_jobs)>20 else ''}")
         else:
+            bulk = BulkJobExecutor(CVAT_URL, headers, org_slug)
             for j in assigned_jobs:
-                job_id = j["id"]
-                try:
-                    res = requests.patch(
-                        f"{CVAT_URL}/api/jobs/{job_id}?org={org_slug}",
-                        headers=headers,
-                        json={"assignee": None},  # ← unassign
-                    )
-                    res.raise_for_status()
-                    print(f"🔁 Job {job_id}: assignee 해제 완료")
-                except requests.HTTPError as e:
-                    print(f"⚠️ Job {job_id} assignee 해제 실패: {e.response.status_code} - {e.response.text}")
+                bulk.patch(j["id"], {"assignee": None}, label="assignee 해제 완료")  # ← unassign
+            bulk.run()
 
     # (B) 정렬 → 최소 1개 강제 분배 + 라운드로빈
     assigned_jobs.sort(key=lambda x: x.get(sort_key, 0))
@@ -267,7 +254,12 @@ def redistribute_assigned_jobs_in_project(
         print("ℹ️ 분배할 Job이 없습니다. (필터 조건에 부합하는 '이미 할당된 Job' 0개)")
         return
 
-    if m >= k:
+    if balance == "frames":
+        # 프레임 수 / 처리 속도 기준 LPT + 로컬 탐색 (최소 1개 보장 정책 유지)
+        throughput = load_throughput(usernames=new_assignees)
+        buckets = plan_assignment(assigned_jobs, new_assignees, throughput=throughput, min_one_each=True)
+        print_plan_summary(buckets, throughput)
+    elif m >= k:
         # 1) 모든 유저에게 1개씩 먼저 배분 (보장 분배)
         for i, uname in enumerate(new_assignees):
             buckets[uname].append(assigned_jobs[i])
@@ -296,21 +288,13 @@ def redistribute_assigned_jobs_in_project(
         print("🧪 Dry-run 모드: 실제 해제/재할당 PATCH는 수행하지 않았습니다.")
         return
 
-    # (E) 실제 재할당 PATCH
+    # (E) 실제 재할당 PATCH (동시 실행 + 속도 제한 + 재시도, .env BULK_* 참고)
+    bulk = BulkJobExecutor(CVAT_URL, headers, org_slug)
     for uname in new_assignees:
         uid = user_id_map[uname]
         for job in buckets[uname]:
-            job_id = job["id"]
-            try:
-                res = requests.patch(
-                    f"{CVAT_URL}/api/jobs/{job_id}?org={org_slug}",
-                    headers=headers,
-                    json={"assignee": uid},
-                )
-                res.raise_for_status()
-                print(f"✅ Job {job_id}: → {uname} (재할당 완료)")
-            except requests.HTTPError as e:
-                print(f"⚠️ Job {job_id} 재할당 실패: {e.response.status_code} - {e.response.text}")
+            bulk.patch(job["id"], {"assignee": uid}, label=f"→ {uname} (재할당 완료)")
+    bulk.run()
 
 # =========================
 # 4) CLI
@@ -333,6 +317,8 @@ def main():
     parser.add_argument("--unassign_first", action="store_true", help="재할당 전에 기존 assignee를 해제")
     parser.add_argument("--dry_run", action="store_true", help="시뮬레이션만 수행 (기본 권장)")
     parser.add_argument("--snapshot_only", action="store_true", help="현재 분배 스냅샷만 출력하고 종료")
+    parser.add_argument("--balance", choices=["jobs", "frames"], default="jobs",
+                        help="jobs: Job 수 균등 / frames: 프레임 수 × 작업자 처리 속도(omission CSV) 기준 균형")
     args = parser.parse_args()
 
     # 조직 유효성(.env) 간단 체크 (있으면)
@@ -380,6 +366,7 @@ def main():
         dry_run=args.dry_run,
         sort_key="id",                # 재현 가능한 분배를 위해 Job ID 기준 정렬
         unassign_first=args.unassign_first,  # 기존 할당 해제 여부
+        balance=args.balance,
     )
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import os
 import sys
-import time
 import requests
 from pathlib import Path
 from dotenv import load_dotenv
@@ -10,6 +9,11 @@ from typing import Dict, Iterable, List, Optional
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+# core/ 공용 모듈 (Job 일괄 PATCH 실행기)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "core"))
+from cvat_bulk import BulkJobExecutor  # noqa: E402
+from cvat_jobs import iter_project_jobs  # noqa: E402
+
 CVAT_URL = os.getenv("CVAT_URL_2")
 TOKEN = os.getenv("TOKEN_2")
 ORG_SLUG = ""
@@ -42,12 +46,6 @@ def get_json(url: str, params: Optional[Dict]=None) -> Dict:
         raise RuntimeError(f"GET {url} failed: {r.status_code} {r.text}")
     return r.json()
 
-def patch_json(url: str, payload:Dict) -> Dict:
-    r = requests.patch(url, headers=headers(), json=payload, timeout=30)
-    if not r.ok:
-        raise RuntimeError(f"PATCH {url} failed: {r.status_code} {r.text}")
-    return r.json()
-
 def get_project_id(base_url: str, project_name: str) -> int:
     url = f"{base_url.rstrip('/')}/api/projects"
     page = 1
@@ -64,34 +62,8 @@ def get_project_id(base_url: str, project_name: str) -> int:
 def iter_jobs_in_project(
     base_url: str, project_id: int, stage: Optional[str]=None, state: Optional[str]=None
 ) -> Iterable[Dict]:
-    url = f"{base_url.rstrip('/')}/api/jobs"
-    page = 1
-    while True:
-        params = {"page": page, "page_size": 100, "project_id": project_id}
-        if stage: params["stage"] = stage
-        if state: params["state"] = state
-
-        data = get_json(url, params=params)
-        for job in data.get("results", []):
-            if job.get("project_id") != project_id:
-                continue
-            if stage and job.get("stage") != stage:
-                continue
-            if state and job.get("state") != state:  # <- 버그 수정 (state 비교)
-                continue
-            yield job
-
-        if not data.get("next"):
-            break
-        page += 1
-
-def patch_job_state(base_url: str, job_id: int, new_stage: str, new_state: str) -> Dict:
-    url = f"{base_url.rstrip('/')}/api/jobs/{job_id}"
-    payload = {"stage": new_stage, "state": new_state}
-    if DRY_RUN:
-        print(f"[DRY_RUN] PATCH {url} payload={payload}")
-        return {}
-    return patch_json(url, payload)
+    # project_id / stage / state 필터는 서버에서 적용 (큰 페이지, 스트리밍)
+    yield from iter_project_jobs(base_url, headers(), project_id, stage=stage, state=state)
 
 def main():
     print(f"Target: org='{ORG_SLUG}', project='{PROJECT_NAME}', filter=({FILTER_STAGE=}, {FILTER_STATE=}) -> ({NEW_STAGE=}, {NEW_STATE=})")
@@ -104,21 +76,19 @@ def main():
         return
     
     print(f"총 대상 잡 수: {len(targets)}")
-    changed = 0
+    # 고정 sleep 대신 BulkJobExecutor 의 동시 실행 수 / 초당 요청 수 제한 사용 (.env BULK_*)
+    bulk = BulkJobExecutor(CVAT_URL, headers(), dry_run=DRY_RUN)
     for job in targets:
-        jid = job["id"]
-        print(f"- Job #{jid}: stage={job['stage']} state={job['state']} -> stage={NEW_STAGE}, state={NEW_STATE}")
-        try:
-            patch_job_state(CVAT_URL, jid, NEW_STAGE, NEW_STATE)
-            changed += 1
-            time.sleep(0.1)
-        except Exception as e:
-            print(f"  ! 업데이트 실패 (job {jid}): {e}")
+        bulk.patch(
+            job["id"], {"stage": NEW_STAGE, "state": NEW_STATE},
+            label=f"stage={job['stage']} state={job['state']} -> stage={NEW_STAGE}, state={NEW_STATE}",
+        )
+    summary = bulk.run()
 
     if DRY_RUN:
-        print(f"[DRY-RUN] 실제 변경 없음. 변경 예정 건수: {changed}/{len(targets)}")
+        print(f"[DRY-RUN] 실제 변경 없음. 변경 예정 건수: {summary['dry_run']}/{len(targets)}")
     else:
-        print(f"완료: 변경된 잡 수 {changed}/{len(targets)}")
+        print(f"완료: 변경된 잡 수 {summary['ok'] + summary['already']}/{len(targets)}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -9,24 +9,37 @@
 - 신규 폴더가 속한 organized_videos/<category> 를 입력 기준으로 처리
 - 결과는 같은 상위 레벨의 processed_data/<category> 아래에 생성 (없으면 생성)
 - 감지 대상: dataset/{projects,public} 하위 전체
+- 실행할 때마다 스캔하는 cron 방식 (디렉터리 mtime 으로 바뀐 곳만 listdir, dir_snapshot.py), 상시 감시는 dir_watcher.py (inotify + 주기 재확인)
+- 신규 카테고리는 작업 큐(work_queue.py, SQLite)에 등록 → 추출/자동 라벨링 단계별로 실행, 실패는 다음 실행에서 재시도
+  (현황: python trigger/work_queue.py)
 """
 
 import os
-import csv
+import threading
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from typing import List, Set, Tuple, Optional
+from typing import List, Tuple, Optional
+
+from dir_snapshot import is_empty, load_tree, save_tree, scan_tree
+from work_queue import StageWorkers, WorkQueue
 
 # ========= 기본 설정 =========
 BASE_DIR = Path("dataset")
 TARGET_FOLDERS = ["projects", "public"]
-SNAPSHOT_CSV = Path("dir_snapshot.csv")
+SNAPSHOT_JSON = Path("dir_snapshot.json")    # 디렉터리 트리 + mtime (증분 스캔)
+SNAPSHOT_CSV = Path("dir_snapshot.csv")      # 이전 형식, JSON 이 없을 때 1회 변환용
 IGNORE_HIDDEN = True
 
 VIDEO_EXTS = (".mp4", ".avi", ".mov")
 IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
+# ======== 작업 큐 ========
+WORK_QUEUE_DB = Path("work_queue.db")
+STAGE_CONCURRENCY = {"extract": 1, "autolabel": 1}   # 단계별 동시 실행 수 (추출과 업로드는 서로 겹쳐 진행)
+MAX_ATTEMPTS = 3                                    # 단계별 최대 시도 횟수 (초과 시 failed)
+RETRY_BASE_SEC = 300                                # 재시도 대기: 300초, 600초, ...
+
 # ======== 스크립트 경로 (환경에 맞게 필요 시 조정) ========
 IMAGE_EXTRACT_2_PY = Path("trigger/image_extract_2.py")
 IMPORT_AUTOLABELING_2_PY = Path("trigger/import_autolabeling_2.py")
@@ -40,34 +53,17 @@ REQUIRE_AUTOLABEL_ENV = ["ORGANIZATIONS", "PROJECT_NAME", "LABELS", "ASSIGNEES"]
 def is_hidden(path: Path) -> bool:
     return path.name.startswith(".")
 
-def scan_all_dirs() -> List[str]:
-    """projects/public 하위의 모든 디렉터리 절대경로 수집 (top 자체 제외)"""
-    collected: List[str] = []
-    for top in TARGET_FOLDERS:
-        top_path = BASE_DIR / top
-        if not top_path.exists():
-            continue
-        for root, dirnames, _ in os.walk(top_path):
-            root_path = Path(root)
-            for d in dirnames:
-                dpath = (root_path / d).resolve()
-                if IGNORE_HIDDEN and (is_hidden(dpath) or any(p.startswith(".") for p in dpath.parts)):
-                    continue
-                collected.append(str(dpath))
-    return collected
-
-def load_snapshot(csv_path: Path) -> Set[str]:
-    if not csv_path.exists():
-        return set()
-    with csv_path.open("r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        return {row[0] for row in reader if row}
-
-def save_snapshot(csv_path: Path, dirs: List[str]) -> None:
-    with csv_path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        for d in sorted(dirs):
-            writer.writerow([d])
+def scan_new_dirs() -> Tuple[dict, List[str], bool]:
+    """
+    projects/public 하위 증분 스캔 (dir_snapshot.py)
+    반환: (새 스냅샷, 신규 디렉터리 절대경로 목록(top 자체 제외), 기준 스냅샷 존재 여부)
+    - 저장은 호출 측에서 save_tree(SNAPSHOT_JSON, snapshot)
+    """
+    tops = [BASE_DIR / top for top in TARGET_FOLDERS]
+    before = load_tree(SNAPSHOT_JSON, legacy_csv=SNAPSHOT_CSV, tops=tops)
+    snapshot, added, stats = scan_tree(tops, before, ignore_hidden=IGNORE_HIDDEN)
+    print(f"[SCAN] 디렉터리 {stats['dirs']}개 확인 (listdir {stats['listed']}개) | {stats['sec']:.2f}초")
+    return snapshot, sorted(added), not is_empty(before)
 
 def folder_has_videos(folder: Path) -> bool:
     """폴더(재귀) 내 영상 존재 여부"""
@@ -183,31 +179,48 @@ def run_import_autolabeling(image_dir: Path, target_category: str) -> None:
         "--org_name", org_name,
         "--image_dir", str(image_dir),
         "--project_name", project_name,
-        "--labels", labels,
+        "--labels", *labels,
         "--assignees", *assignees,
     ]
     print(f"[STEP2] import_autolabeling_2.py 실행")
     print(f"        org={org_name} | project={project_name} | image_dir={image_dir}")
     subprocess.run(cmd, check=True)
 
+
+def stage_extract(target: str) -> None:
+    """작업 큐 extract 단계: organized_videos/<category> 프레임 추출"""
+    run_image_extract_for_category(Path(target))
+
+
+def stage_autolabel(target: str) -> None:
+    """작업 큐 autolabel 단계: processed_data/<category> 자동 라벨링(업로드)"""
+    category_dir = Path(target).resolve()
+    image_dir = category_dir.parent.parent / "processed_data" / category_dir.name
+    run_import_autolabeling(image_dir, category_dir.name)
+
+
+STAGE_HANDLERS = {"extract": stage_extract, "autolabel": stage_autolabel}
+
+
+def open_work_queue() -> WorkQueue:
+    return WorkQueue(WORK_QUEUE_DB, list(STAGE_HANDLERS), MAX_ATTEMPTS, RETRY_BASE_SEC)
+
 # ------------------ 메인 ------------------
 
-def main() -> None:
-    # 1) 스냅샷 비교
-    before = load_snapshot(SNAPSHOT_CSV)
-    now_list = scan_all_dirs()
-    now = set(now_list)
-    added = sorted(now - before)
+def enqueue_new_dirs(queue: WorkQueue) -> None:
+    """신규 폴더 감지 → 카테고리를 작업 큐에 등록 → 스냅샷 저장 (처리는 큐에서)"""
+    # 1) 스냅샷 비교 (mtime 이 바뀐 디렉터리만 listdir)
+    snapshot, added, had_snapshot = scan_new_dirs()
 
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    if not before:
+    if not had_snapshot:
         print(f"[{ts}] 최초 실행: 기준 스냅샷을 생성했습니다. 다음 실행부터 신규 폴더를 보고/처리합니다.")
-        save_snapshot(SNAPSHOT_CSV, now_list)
+        save_tree(SNAPSHOT_JSON, snapshot)
         return
 
     if not added:
         print(f"[{ts}] 새로 생성된 폴더가 없습니다.")
-        save_snapshot(SNAPSHOT_CSV, now_list)
+        save_tree(SNAPSHOT_JSON, snapshot)
         return
 
     print(f"[{ts}] 신규 폴더 {len(added)}개 발견:")
@@ -225,7 +238,7 @@ def main() -> None:
 
     if not trigger_dirs:
         print("[INFO] 트리거 가능한(동영상 포함) 신규 폴더가 없습니다.")
-        save_snapshot(SNAPSHOT_CSV, now_list)
+        save_tree(SNAPSHOT_JSON, snapshot)
         return
 
     # 3) organized_videos/<category> 단위로 중복 제거
@@ -237,23 +250,34 @@ def main() -> None:
             continue
         processed_keys.add((str(org_videos_dir.resolve()), d.name))
 
-    # 4) 각 카테고리에 대해: 프레임 추출 → 자동 라벨링
+    # 4) 작업 큐 등록 (커밋된 뒤에 스냅샷 갱신 → 처리 실패/중단돼도 큐에 남아 재시도)
     for org_videos_path, category in sorted(processed_keys):
-        try:
-            # STEP 1: 프레임 추출
-            processed_base, image_dir, target_category = run_image_extract_for_category(
-                Path(org_videos_path) / category
-            )
-            # STEP 2: 자동 라벨링(업로드)
-            run_import_autolabeling(image_dir, target_category)
-        except subprocess.CalledProcessError as e:
-            print(f"[ERROR] 파이프라인 실패: organized_videos={org_videos_path}, category={category} | {e}")
-        except Exception as e:
-            print(f"[ERROR] 파이프라인 예외: organized_videos={org_videos_path}, category={category} | {e}")
+        target = str(Path(org_videos_path) / category)
+        if queue.enqueue(target):
+            print(f"  📥 작업 등록: {target}")
+        else:
+            print(f"  ⤷ (이미 대기 중) {target}")
 
     # 5) 스냅샷 갱신
-    save_snapshot(SNAPSHOT_CSV, now_list)
-    print("[DONE] 신규 폴더 처리 및 스냅샷 갱신 완료.")
+    save_tree(SNAPSHOT_JSON, snapshot)
+
+
+def main() -> None:
+    queue = open_work_queue()
+    enqueue_new_dirs(queue)
+
+    # 이번에 등록한 작업 + 재시도 시각이 된 이전 실패 작업을 처리하고 종료
+    stop = threading.Event()
+    workers = StageWorkers(queue, STAGE_HANDLERS, STAGE_CONCURRENCY)
+    workers.start(stop, drain=True)
+    try:
+        workers.join()
+    except KeyboardInterrupt:
+        stop.set()
+        workers.join()
+    summary = " | ".join(f"{stage} " + ", ".join(f"{k}={v}" for k, v in sorted(states.items()))
+                         for stage, states in queue.counts().items())
+    print(f"[DONE] 작업 큐 현황: {summary or '(없음)'}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+디렉터리 스냅샷 (트리 + 디렉터리 mtime, 증분 스캔)
+
+배경
+- scan_all_dirs 가 매번 모든 디렉터리를 os.walk(listdir) + resolve 하고, save_snapshot 이 CSV 전체를 다시 씀
+동작
+- 스냅샷 = {"version", "tops": {top 절대경로: node}}, node = {"m": mtime_ns, "c": {하위 디렉터리명: node}}
+- 디렉터리 mtime 은 바로 아래 항목이 추가/삭제/이름변경될 때만 바뀜
+  → mtime 이 그대로인 디렉터리는 listdir 없이 저장된 하위 목록을 재사용, 하위 디렉터리는 stat 만 하고 내려감
+  → mtime 이 바뀐 디렉터리만 listdir (scandir d_type 사용, 파일 stat 없음)
+  (더 깊은 곳의 변화는 상위 mtime 에 드러나지 않으므로 하위 stat 은 생략할 수 없음 → 변경 없는 스캔 = 디렉터리당 stat 1회)
+- 스캔 시작 RACY_SEC 초 이내에 바뀐 mtime 은 저장하지 않음(0) → 다음 스캔에서 다시 listdir
+  (mtime 해상도가 낮은 NAS 에서 같은 시각 안의 추가 변경 누락 방지)
+- 저장은 임시파일 → os.replace (중간에 죽어도 이전 스냅샷 유지)
+- JSON 스냅샷이 없고 기존 dir_snapshot.csv 만 있으면 CSV 목록으로 트리를 만들어(mtime 미확인) 이어서 사용
+  → 첫 스캔에서 한 번 전체 listdir 후 CSV 이후 추가된 디렉터리만 신규로 보고
+
+사용 예)
+    snapshot = load_tree(Path("dir_snapshot.json"), legacy_csv=Path("dir_snapshot.csv"))
+    snapshot, added, stats = scan_tree([Path("dataset/projects")], snapshot)
+    save_tree(Path("dir_snapshot.json"), snapshot)
+"""
+
+import os
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+_VERSION = 1
+RACY_SEC = 2.0
+
+
+def _empty() -> dict:
+    return {"version": _VERSION, "tops": {}}
+
+
+def is_empty(snapshot: dict) -> bool:
+    return not snapshot.get("tops")
+
+
+def _from_paths(paths, tops: Sequence[Path]) -> dict:
+    """경로 목록(기존 CSV) → mtime 미확인(m=0) 트리"""
+    snapshot = _empty()
+    top_abs = [str(Path(t).resolve()) for t in tops]
+    for top in top_abs:
+        snapshot["tops"][top] = {"m": 0, "c": {}}
+    for p in paths:
+        for top in top_abs:
+            if not p.startswith(top + os.sep):
+                continue
+            node = snapshot["tops"][top]
+            for name in Path(p[len(top) + 1:]).parts:
+                node = node["c"].setdefault(name, {"m": 0, "c": {}})
+            break
+    return snapshot
+
+
+def load_tree(path: Path, legacy_csv: Optional[Path] = None, tops: Sequence[Path] = ()) -> dict:
+    """JSON 스냅샷 로드. 없으면 legacy_csv(경로 목록)에서 변환, 둘 다 없으면 빈 스냅샷"""
+    if path.exists():
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == _VERSION:
+                return data
+        except (OSError, ValueError) as e:
+            print(f"[WARN] 스냅샷을 읽지 못해 새로 만듭니다: {path} | {e}")
+    if legacy_csv is not None and legacy_csv.exists():
+        with legacy_csv.open("r", encoding="utf-8") as f:
+            paths = [row[0] for row in csv.reader(f) if row]
+        print(f"[INFO] 기존 CSV 스냅샷({legacy_csv}, {len(paths)}개)을 트리 스냅샷으로 변환합니다.")
+        return _from_paths(paths, tops)
+    return _empty()
+
+
+def save_tree(path: Path, snapshot: dict) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _scan(path: str, old: Optional[dict], added: List[str], stats: Dict[str, int],
+          racy_ns: int, ignore_hidden: bool) -> Optional[dict]:
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:         # 스캔 중 삭제됨
+        return None
+    stats["dirs"] += 1
+    if old is not None and old.get("m") == mtime:
+        names = list(old["c"])
+    else:
+        stats["listed"] += 1
+        try:
+            with os.scandir(path) as it:
+                names = [e.name for e in it
+                         if e.is_dir(follow_symlinks=False) and not (ignore_hidden and e.name.startswith("."))]
+        except OSError:
+            names = []
+    children = {}
+    for name in names:
+        child_old = old["c"].get(name) if old is not None else None
+        child_path = os.path.join(path, name)
+        node = _scan(child_path, child_old, added, stats, racy_ns, ignore_hidden)
+        if node is None:
+            continue
+        if child_old is None:
+            added.append(child_path)
+        children[name] = node
+    return {"m": mtime if mtime < racy_ns else 0, "c": children}
+
+
+def scan_tree(tops: Sequence[Path], snapshot: dict, ignore_hidden: bool = True) -> Tuple[dict, List[str], Dict[str, float]]:
+    """
+    tops 이하 증분 스캔 → (새 스냅샷, 신규 디렉터리 절대경로 목록(top 자체 제외), 통계)
+    통계: dirs(확인한 디렉터리 수), listed(listdir 한 수), sec
+    """
+    t0 = time.perf_counter()
+    racy_ns = time.time_ns() - int(RACY_SEC * 1e9)
+    stats = {"dirs": 0, "listed": 0}
+    added: List[str] = []
+    new = _empty()
+    for top in tops:
+        top_abs = str(Path(top).resolve())
+        if not os.path.isdir(top_abs):
+            continue
+        old = snapshot.get("tops", {}).get(top_abs)
+        node = _scan(top_abs, old, added, stats, racy_ns, ignore_hidden)
+        if node is not None:
+            new["tops"][top_abs] = node
+    stats["sec"] = round(time.perf_counter() - t0, 3)
+    return new, added, stats
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+신규 폴더 감시 데몬 (inotify + 주기적 재확인 스캔)
+
+배경
+- detect_new_dirs_trigger.py 는 실행할 때마다 dataset/{projects,public} 전체를 os.walk 하고
+  스냅샷 CSV 와 비교한 뒤 folder_has_videos / has_any_images 로 다시 재귀 탐색 → 감지가 cron 주기만큼 늦고 매번 전체 탐색
+동작
+- inotify(inotify_simple, 순수 파이썬 바인딩)로 감시 트리의 디렉터리마다 watch 등록 (시작 시 1회만 전체 탐색)
+  · 새 디렉터리 생성/이동 → 그 하위만 watch 추가 + 이미 들어온 영상 확인
+  · 영상 파일 생성/쓰기/이동 이벤트 → 해당 organized_videos/<category> 를 '대기'로 표시
+- 디바운스: 카테고리에 debounce 초 동안 변화가 없으면(복사 완료) 파이프라인 작업으로 넘김
+  (inotify 없이 동작할 때는 카테고리 영상 목록의 크기/mtime 이 debounce 간격으로 두 번 같으면 완료로 판단)
+- 재확인 스캔: reconcile 초마다(및 시작 시) 기존 스냅샷 비교를 실행 → 데몬이 꺼져 있던 동안의 변경,
+  inotify 큐 넘침(Q_OVERFLOW), watch 한도 초과로 놓친 변경을 보완
+- 준비된 카테고리는 작업 큐(work_queue.py)에 등록 → 추출/자동 라벨링 단계 스레드가 처리 (실패는 재시도)
+  같은 카테고리는 대기열에 한 번만, 처리 중에 새 영상이 들어오면 끝난 뒤 다시 처리
+  (image_extract_2.py 는 처리 로그로 이미 처리한 영상을 건너뜀)
+
+사용 예)  (utils/ 에서 실행, detect_new_dirs_trigger.py 와 같은 상대 경로 기준)
+    python trigger/dir_watcher.py
+    python trigger/dir_watcher.py --debounce 60 --reconcile 900
+    python trigger/dir_watcher.py --extract_workers 2 --autolabel_workers 1
+
+inotify 사용: pip install inotify_simple (리눅스 전용, 없으면 --reconcile 주기 스캔만으로 동작)
+watch 한도: /proc/sys/fs/inotify/max_user_watches (감시 디렉터리 수보다 커야 함)
+"""
+
+import os
+import signal
+import argparse
+import threading
+import time
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from detect_new_dirs_trigger import (
+    BASE_DIR, SNAPSHOT_JSON, IGNORE_HIDDEN, STAGE_CONCURRENCY, STAGE_HANDLERS, TARGET_FOLDERS, VIDEO_EXTS,
+    find_ancestor_with_name, folder_has_videos, open_work_queue, scan_new_dirs,
+)
+from dir_snapshot import save_tree
+from work_queue import StageWorkers
+
+try:
+    from inotify_simple import INotify, flags
+except ImportError:  # 미설치 / 리눅스 외 → 주기 스캔만
+    INotify = None
+    flags = None
+
+CategoryKey = Tuple[str, str]   # (organized_videos 경로, 카테고리명)
+
+
+def log(msg: str) -> None:
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+
+def category_key(path: Path) -> Optional[CategoryKey]:
+    """경로 → 그 경로가 속한 organized_videos/<category> (organized_videos 밖이거나 그 자체면 None)"""
+    org = find_ancestor_with_name(path, "organized_videos")
+    if org is None:
+        return None
+    rel = Path(path).resolve().relative_to(org)
+    if not rel.parts:
+        return None
+    return str(org), rel.parts[0]
+
+
+def video_signature(category_dir: Path) -> Tuple[int, int, float]:
+    """카테고리 영상 (개수, 총 크기, 최신 mtime) — inotify 없이 복사 완료 판단용"""
+    count, size, mtime = 0, 0, 0.0
+    for root, _, files in os.walk(category_dir):
+        for name in files:
+            if name.lower().endswith(VIDEO_EXTS):
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                count += 1
+                size += st.st_size
+                mtime = max(mtime, st.st_mtime)
+    return count, size, mtime
+
+
+class DirWatcher:
+    """
+    - run(stop) : stop(Event) 이 설정될 때까지 감시
+    - on_ready(key) : 복사가 끝난(디바운스 통과) 카테고리마다 호출
+    """
+
+    def __init__(self, on_ready, debounce_sec: float = 30.0, reconcile_sec: float = 600.0, use_inotify: bool = True):
+        self.on_ready = on_ready
+        self.debounce_sec = debounce_sec
+        self.reconcile_sec = reconcile_sec
+        self.pending: Dict[CategoryKey, float] = {}          # 카테고리 → 마지막 변화 시각
+        self.signatures: Dict[CategoryKey, tuple] = {}       # inotify 없이 동작할 때 직전 영상 목록 요약
+        self.inotify = INotify() if (use_inotify and INotify is not None) else None
+        self.watch_paths: Dict[int, Path] = {}
+        self.watched: Set[str] = set()                        # watch 를 건 디렉터리 (재확인 스캔에서 중복 등록 방지)
+        if self.inotify is not None:
+            self.dir_mask = flags.CREATE | flags.MOVED_TO | flags.MODIFY | flags.CLOSE_WRITE | flags.DELETE_SELF
+
+    # ---------- inotify ----------
+    def _add_watch(self, path: Path) -> None:
+        try:
+            wd = self.inotify.add_watch(str(path), self.dir_mask)
+        except OSError as e:    # ENOSPC: max_user_watches 초과 → 재확인 스캔으로 보완
+            log(f"[WARN] watch 추가 실패: {path} | {e}")
+            return
+        self.watch_paths[wd] = path
+        self.watched.add(str(path))
+
+    def _watch_tree(self, top: Path, touch: bool) -> None:
+        """top 하위만 탐색하며 watch 등록. touch=True 면 이미 들어와 있는 영상의 카테고리를 대기로 표시"""
+        for root, dirnames, files in os.walk(top):
+            if IGNORE_HIDDEN:
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            self._add_watch(Path(root))
+            if touch and any(f.lower().endswith(VIDEO_EXTS) for f in files):
+                self._touch(Path(root))
+
+    def _read_events(self, timeout_sec: float) -> None:
+        for ev in self.inotify.read(timeout=int(timeout_sec * 1000), read_delay=100):
+            if ev.mask & flags.Q_OVERFLOW:
+                log("[WARN] inotify 이벤트 큐 넘침 → 재확인 스캔")
+                self.reconcile()
+                continue
+            if ev.mask & flags.IGNORED:     # 디렉터리 삭제 등으로 watch 해제
+                gone = self.watch_paths.pop(ev.wd, None)
+                if gone is not None:
+                    self.watched.discard(str(gone))
+                continue
+            base = self.watch_paths.get(ev.wd)
+            if base is None or not ev.name or (IGNORE_HIDDEN and ev.name.startswith(".")):
+                continue
+            path = base / ev.name
+            if ev.mask & flags.ISDIR:
+                if ev.mask & (flags.CREATE | flags.MOVED_TO):
+                    # 새 폴더(또는 통째로 옮겨진 트리) → 그 하위만 탐색
+                    self._watch_tree(path, touch=True)
+            elif ev.name.lower().endswith(VIDEO_EXTS):
+                self._touch(path)
+
+    # ---------- 공통 ----------
+    def _touch(self, path: Path) -> None:
+        key = category_key(path)
+        if key is None:
+            return
+        if key not in self.pending:
+            log(f"👀 변화 감지: {key[0]}/{key[1]}")
+        self.pending[key] = time.time()
+
+    def reconcile(self) -> None:
+        """스냅샷 비교로 놓친 신규 폴더 보완 (detect_new_dirs_trigger 와 같은 스냅샷 파일 공유, 증분 스캔)"""
+        snapshot, added, had_snapshot = scan_new_dirs()
+        save_tree(SNAPSHOT_JSON, snapshot)
+        if not had_snapshot:
+            log("최초 실행: 기준 스냅샷을 생성했습니다.")
+            return
+        for d in added:
+            if d in self.watched:       # inotify 로 이미 감지·등록한 폴더
+                continue
+            dpath = Path(d)
+            if self.inotify is not None:
+                self._watch_tree(dpath, touch=False)
+            if folder_has_videos(dpath):
+                self._touch(dpath)
+
+    def _flush_ready(self) -> None:
+        now = time.time()
+        for key, last in list(self.pending.items()):
+            if now - last < self.debounce_sec:
+                continue
+            if self.inotify is None:
+                # 이벤트가 없으므로 영상 목록이 debounce 간격 동안 그대로인지 직접 확인
+                sig = video_signature(Path(key[0]) / key[1])
+                if self.signatures.get(key) != sig:
+                    self.signatures[key] = sig
+                    self.pending[key] = now
+                    continue
+                self.signatures.pop(key, None)
+            del self.pending[key]
+            self.on_ready(key)
+
+    def run(self, stop: threading.Event) -> None:
+        if self.inotify is not None:
+            for top in TARGET_FOLDERS:
+                top_path = (BASE_DIR / top).resolve()     # 스냅샷 경로와 같은 절대경로 기준
+                if top_path.exists():
+                    self._watch_tree(top_path, touch=False)
+            log(f"inotify 감시 시작: 디렉터리 {len(self.watch_paths)}개")
+        else:
+            log(f"inotify 미사용 (inotify_simple 미설치 또는 --no_inotify): {self.reconcile_sec:.0f}초 주기 스캔만 사용")
+        self.reconcile()
+        next_reconcile = time.time() + self.reconcile_sec
+        tick = max(0.5, min(5.0, self.debounce_sec / 4))
+
+        while not stop.is_set():
+            if self.inotify is not None:
+                self._read_events(tick)
+            else:
+                stop.wait(tick)
+            if time.time() >= next_reconcile:
+                self.reconcile()
+                next_reconcile = time.time() + self.reconcile_sec
+            self._flush_ready()
+
+
+def _raise_interrupt(*_) -> None:
+    raise KeyboardInterrupt
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="신규 폴더 감시 데몬 (inotify + 주기 재확인 스캔)")
+    parser.add_argument("--debounce", type=float, default=30.0, help="마지막 변화 후 이 시간(초) 동안 조용하면 복사 완료로 판단")
+    parser.add_argument("--reconcile", type=float, default=600.0, help="전체 재확인 스캔 주기(초)")
+    parser.add_argument("--no_inotify", action="store_true", help="inotify 를 쓰지 않고 주기 스캔만 사용")
+    parser.add_argument("--extract_workers", type=int, default=STAGE_CONCURRENCY["extract"], help="동시 프레임 추출 수")
+    parser.add_argument("--autolabel_workers", type=int, default=STAGE_CONCURRENCY["autolabel"], help="동시 자동 라벨링 수")
+    args = parser.parse_args()
+
+    stop = threading.Event()
+    # 핸들러에서 stop.set() 을 부르면 메인 스레드가 stop.wait() 중일 때 교착 → KeyboardInterrupt 로 같은 종료 경로 사용
+    signal.signal(signal.SIGTERM, _raise_interrupt)
+
+    queue = open_work_queue()
+
+    def submit(key: CategoryKey) -> None:
+        target = str(Path(key[0]) / key[1])
+        if queue.enqueue(target):
+            log(f"📥 작업 등록: {target}")
+
+    workers = StageWorkers(queue, STAGE_HANDLERS,
+                           {"extract": args.extract_workers, "autolabel": args.autolabel_workers})
+    workers.start(stop)
+    watcher = DirWatcher(submit, args.debounce, args.reconcile, use_inotify=not args.no_inotify)
+    try:
+        watcher.run(stop)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        log("종료 중: 진행 중인 작업이 끝나길 기다립니다.")
+        stop.set()
+        workers.join()
+
+
+if __name__ == "__main__":
+    main()
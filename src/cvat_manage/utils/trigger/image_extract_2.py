@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import os
-import cv2
+import sys
 import csv
 import argparse
 import time
@@ -11,38 +11,43 @@ from multiprocessing import Pool
 from collections import defaultdict
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from frame_dedup import dedup_dir  # noqa: E402
+from frame_writer import FrameWriter  # noqa: E402
+from video_frames import iter_frames  # noqa: E402
+from video_probe import probe_video, probe_videos, seek_threshold  # noqa: E402
+
 VIDEO_EXTS = (".mp4", ".avi", ".mov")
 IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
-def extract_frames(video_path, save_dir, num_frames=30):
-    """영상에서 일정 수의 프레임을 균등 간격으로 추출"""
-    cap = cv2.VideoCapture(str(video_path))
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+def extract_frames(video_path, save_dir, num_frames=30, probe=None):
+    """영상에서 일정 수의 프레임을 균등 간격으로 추출 (probe: video_probe 메타데이터, 없으면 즉석 프로브)"""
+    probe = probe or probe_video(str(video_path))
+    total_frames = probe["frames"]
 
     if total_frames <= 0:
         print(f"⚠️ {video_path.name}: 프레임 수를 읽지 못했습니다. 스킵")
-        cap.release()
         return 0
 
     if total_frames < num_frames:
         print(f"⚠️ {video_path.name}: 프레임 부족 ({total_frames}개), 스킵")
-        cap.release()
         return 0
 
     interval = max(1, total_frames // num_frames)
     base_name = video_path.stem
     save_dir.mkdir(parents=True, exist_ok=True)
 
+    # 간격이 GOP 보다 작으면 grab 으로 전진, 크면 seek (video_frames.iter_frames)
+    # 인코딩/저장은 백그라운드 writer 가 처리 (frame_writer.FrameWriter)
+    # 트리거는 .env 불사용 → 공용 모듈이 읽는 FRAME_FORMAT / FRAME_QUALITY / FRAME_ZIP_BATCH 대신
+    # jpg, 품질 95, 낱장 저장 고정 (이후 autolabel/업로드 단계가 폴더의 낱장 이미지를 읽음)
     count = 0
-    for i in range(num_frames):
-        frame_idx = i * interval
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = cap.read()
-        if ret:
-            save_path = save_dir / f"{base_name}_frame{i:02d}.jpg"
-            cv2.imwrite(str(save_path), frame)
+    with FrameWriter(fmt="jpg", quality=95, zip_batch=0) as writer:
+        for frame_idx, frame in iter_frames(str(video_path), [i * interval for i in range(num_frames)],
+                                            seek_threshold=seek_threshold(probe)):
+            save_path = save_dir / f"{base_name}_frame{frame_idx // interval:02d}.jpg"
+            writer.submit(str(save_path), frame)
             count += 1
-    cap.release()
     return count
 
 def is_processed(log_file, root_category, sub_category, video_file):
@@ -85,9 +90,14 @@ def recommend_num_workers(reserve_cores=2):
     return max(1, recommended)
 
 def process_video_task(task):
-    """Pool용 단일 작업"""
-    video_path, save_dir, num_frames = task
-    return save_dir, extract_frames(video_path, save_dir, num_frames)
+    """Pool용 단일 작업 (dedup_hamming >= 0 이면 추출 직후 근접 중복 프레임 삭제)"""
+    video_path, save_dir, num_frames, dedup_hamming, probe = task
+    count = extract_frames(video_path, save_dir, num_frames, probe)
+    if dedup_hamming >= 0 and count > 0:
+        stats = dedup_dir(save_dir, threshold=dedup_hamming, delete=True)
+        print(f"🧹 {save_dir.name}: {stats['total']} → {stats['kept']}장 (중복 {stats['dup_ratio'] * 100:.1f}% 삭제)")
+        count = stats["kept"]
+    return save_dir, count
 
 def main():
     parser = argparse.ArgumentParser(description="프레임 추출기 (.env 불사용, CLI 인자 기반)")
@@ -96,6 +106,8 @@ def main():
     parser.add_argument("--assign_log_dir", default=None, help="로그 디렉터리 (기본: output_root/_logs/extract)")
     parser.add_argument("--excluded_categories", default="", help="쉼표구분 제외 카테고리")
     parser.add_argument("--num_frames", type=int, default=30, help="동영상당 추출 프레임 수")
+    parser.add_argument("--dedup_hamming", type=int, default=-1,
+                        help="0 이상이면 영상별 근접 중복 프레임 삭제 (dHash Hamming 거리 임계값, 예: 5)")
     args = parser.parse_args()
 
     input_root = Path(args.input_root).resolve()
@@ -150,12 +162,16 @@ def main():
             video_name = Path(video_file).stem
             save_dir = output_root / category / video_name
 
-            video_tasks.append((video_path, save_dir, args.num_frames))
+            video_tasks.append((video_path, save_dir, args.num_frames, args.dedup_hamming))
             save_info.append((category, video_file))
 
     print(f"총 처리할 영상 수: {len(video_tasks)}")
 
     if video_tasks:
+        # 영상 메타데이터 (로그 디렉터리의 프로브 캐시, 캐시에 없는 것만 병렬 프로브)
+        probes = probe_videos([str(t[0]) for t in video_tasks], cache_path=str(assign_log_dir / "video_probe_cache.json"))
+        video_tasks = [t + (probes[str(t[0])],) for t in video_tasks]
+
         # 병렬 처리
         start_time = time.time()
         with Pool(processes=num_workers) as pool:
@@ -1,4 +1,4 @@
-import os, json, zipfile, argparse, torch, time
+import os, sys, json, argparse, torch, time
 from pathlib import Path
 from ultralytics import YOLO
 from PIL import Image
@@ -11,6 +11,12 @@ import pandas as pd
 import csv
 from itertools import cycle
 
+# core/ 공용 모듈 (Task 데이터 스트리밍 / TUS 업로드, 사용자 디렉터리 캐시, Job 일괄 PATCH)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core"))
+from cvat_upload import upload_task_data  # noqa: E402
+from cvat_users import get_user_directory  # noqa: E402
+from cvat_bulk import BulkJobExecutor  # noqa: E402
+
 # ====== ENV ======
 env_path = Path(__file__).resolve().parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -19,6 +25,7 @@ TOKEN = os.getenv("TOKEN_2")
 ORGANIZATIONS = [org.strip() for org in os.getenv("ORGANIZATIONS", "").split(",")]
 ASSIGN_LOG_PATH = Path(f"./logs/assignments_log.csv")
 ASSIGN_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
 
 # ====== Utils ======
 def hsv_to_hex(h, s, v):
@@ -118,8 +125,12 @@ def create_project(name, labels, headers, org_slug):
             last_err = e
     raise last_err
 
-def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
-    """Task 생성 + ZIP 업로드. org 쿼리 병행 및 트레일링 슬래시 호환."""
+def create_task_with_images(name, project_id, image_paths, headers, org_slug):
+    """
+    Task 생성 + 이미지 업로드. org 쿼리 병행 및 트레일링 슬래시 호환.
+    - 디스크에 임시 ZIP 을 만들지 않고 STORED ZIP 을 요청 본문에서 즉석 생성 (cvat_upload.upload_task_data)
+    - .env CVAT_UPLOAD_MODE=tus 이면 청크 단위 재개 가능 업로드
+    """
     base = f"{CVAT_URL}/api/tasks"
     url_candidates = [f"{base}/?org={org_slug}", f"{base}?org={org_slug}", f"{base}/", base]
     payload = {
@@ -145,24 +156,20 @@ def create_task_with_zip(name, project_id, zip_path, headers, org_slug):
     if task_id is None:
         raise last_err
 
-    # ---- 데이터 업로드 (files 업로드 시 Content-Type 제거 필수) ----
-    upload_headers = headers.copy()
-    upload_headers.pop("Content-Type", None)
-    with open(zip_path, "rb") as zip_file:
-        files = {"client_files[0]": (os.path.basename(zip_path), zip_file, "application/zip")}
-        data = {
-            "image_quality": 100,
-            "use_zip_chunks": "false",
-            "use_cache": "false",
-            "sorting_method": "lexicographical",
-            "upload_format": "zip"
-        }
-        data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
-        res = requests.post(data_url, headers=upload_headers, files=files, data=data)
-        if res.status_code >= 400:
-            _debug_http_error("Task data upload", res)
-        res.raise_for_status()
-        print(f"📦 Uploaded ZIP to task {task_id}")
+    # ---- 데이터 업로드 (Content-Type 은 multipart boundary 로 교체됨) ----
+    data = {
+        "image_quality": 100,
+        "use_zip_chunks": "false",
+        "use_cache": "false",
+        "sorting_method": "lexicographical",
+        "upload_format": "zip"
+    }
+    data_url = f"{CVAT_URL}/api/tasks/{task_id}/data?org={org_slug}"
+    res = upload_task_data(data_url, headers, data, image_paths=image_paths, zip_name=f"{name}.zip")
+    if res.status_code >= 400:
+        _debug_http_error("Task data upload", res)
+    res.raise_for_status()
+    print(f"📦 Uploaded {len(image_paths)} images to task {task_id}")
 
     return task_id
 
@@ -233,31 +240,20 @@ def get_jobs(task_id, headers, org_slug):
     return res.json().get("results", [])
 
 def get_user_id(username, headers, org_slug):
-    res = requests.get(f"{CVAT_URL}/api/users?org={org_slug}", headers=headers)
-    res.raise_for_status()
-    for user in res.json().get("results", []):
-        if user["username"] == username:
-            return user["id"]
-    return None
+    """특정 username 에 해당하는 user.id 반환 (조직 사용자 디렉터리 캐시 사용)."""
+    return get_user_directory(CVAT_URL, headers, org_slug).get_id(username)
 
 def assign_jobs_to_one_user(jobs, headers, assignee_name, org_slug):
     user_id = get_user_id(assignee_name, headers, org_slug)
     if not user_id:
         print(f"❌ 사용자 '{assignee_name}'를 찾을 수 없습니다.")
         return
+    # 미할당 Job 만 모아 병렬 PATCH (재시도/속도 제한은 BulkJobExecutor)
+    bulk = BulkJobExecutor(CVAT_URL, headers, org_slug)
     for job in jobs:
-        if job.get("assignee"): 
-            continue
-        try:
-            res = requests.patch(
-                f"{CVAT_URL}/api/jobs/{job['id']}?org={org_slug}",
-                headers=headers,
-                json={"assignee": user_id}
-            )
-            res.raise_for_status()
-            print(f"✅ Job {job['id']} → '{assignee_name}' 할당 완료")
-        except requests.HTTPError as e:
-            print(f"⚠️ 할당 실패: {e.response.status_code} - {e.response.text}")
+        if not job.get("assignee"):
+            bulk.patch(job["id"], {"assignee": user_id}, label=f"→ '{assignee_name}'")
+    bulk.run()
 
 def get_user_display_name(username):
     return os.getenv(f"USERMAP_{username}", username)
@@ -382,27 +378,20 @@ def compress_and_upload_all(image_root_dir: Path, project_id, headers, assignees
             print(f"⏩ 스킵: {group_dir} (하위에 bboxes 또는 keypoints 폴더 존재)")
             continue
         
-        image_files = sorted([f for f in group_dir.glob("*") if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".bmp"]])
+        image_files = sorted([f for f in group_dir.glob("*") if f.suffix.lower() in IMAGE_EXTS])
         if not image_files:
             continue
         
         num_batches = ceil(len(image_files) / batch_size)
         for i in range(num_batches):
             batch_files = image_files[i * batch_size : (i + 1) * batch_size]
-            zip_filename = f"{group_dir.name}_{i+1:02d}.zip"
-            json_filename = f"{group_dir.name}_{i+1:02d}.json"
-            zip_path = group_dir / zip_filename
-            json_path = group_dir / json_filename
+            task_name = f"{group_dir.name}_{i+1:02d}"
+            json_path = group_dir / f"{task_name}.json"
             
             run_yolo_and_create_json_parallel(batch_files, json_path, model0, model1)
             
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for img_path in batch_files:
-                    zipf.write(img_path, arcname=img_path.name)
-            print(f"[Batch] {zip_filename} created with {len(batch_files)} images")
-            
-            task_name = zip_path.stem
-            task_id = create_task_with_zip(task_name, project_id, zip_path, headers, org_slug=org_slug)
+            # 임시 ZIP 없이 배치 이미지를 바로 업로드 (STORED ZIP 스트림)
+            task_id = create_task_with_images(task_name, project_id, batch_files, headers, org_slug=org_slug)
             if wait_until_task_ready(task_id, headers, org_slug):
                 ok = upload_annotations(task_id, json_path, headers, org_slug)
                 if not ok:
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+트리거 → 프레임 추출 → 자동 라벨링 사이의 영속 작업 큐 (SQLite)
+
+배경
+- detect_new_dirs_trigger.main 이 카테고리마다 image_extract_2.py → import_autolabeling_2.py 를 순서대로 blocking 실행
+  → 실패는 출력만 하고 스냅샷은 그대로 저장되어 작업이 사라지고, A 의 업로드가 끝나야 B 의 추출이 시작됨
+동작
+- jobs 테이블: (target, stage, state, attempts, next_run, owner, error)
+  · state: queued → running → done / (재시도 대기 queued) / failed(max_attempts 초과)
+  · 같은 (target, stage) 의 queued 는 하나만 (중복 등록 무시), 실행 중에 다시 등록되면 끝난 뒤 한 번 더 실행
+- 단계 순서(stages)대로: 한 단계가 끝나면 같은 target 의 다음 단계를 같은 트랜잭션에서 등록
+- 단계별 동시 실행 수(StageWorkers) → 카테고리 B 추출과 카테고리 A 자동 라벨링이 겹쳐서 진행
+  (같은 target 은 단계와 관계없이 한 번에 하나만 실행)
+- 실패 시 retry_base_sec × 2^(시도-1) 뒤 재시도, 작업 중 프로세스가 죽으면(owner pid 없음) 다음 시작 때 재시도로 돌림
+- 여러 프로세스(cron 트리거, 감시 데몬)가 같은 DB 를 써도 작업 가져가기는 BEGIN IMMEDIATE 트랜잭션으로 원자적
+
+사용 예)  (utils/ 에서 실행)
+    python trigger/work_queue.py                  # 단계/상태별 현황 + 최근 실패
+    python trigger/work_queue.py --retry_failed   # failed 작업을 다시 대기열로
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    target   TEXT    NOT NULL,
+    stage    TEXT    NOT NULL,
+    state    TEXT    NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run REAL    NOT NULL,
+    owner    INTEGER,
+    error    TEXT,
+    created  REAL    NOT NULL,
+    updated  REAL    NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_queued ON jobs(target, stage) WHERE state = 'queued';
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs(state, stage, next_run);
+"""
+
+
+def log(msg: str) -> None:
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorkQueue:
+    """
+    - enqueue(target, stage=None) : 대기열 등록 (stage 미지정 시 첫 단계), 새로 등록됐으면 True
+    - claim(stage)                : 실행 가능한 작업 1건을 running 으로 가져옴 (없으면 None)
+    - complete(job) / fail(job, error)
+    """
+
+    def __init__(self, db_path: Path, stages: Sequence[str], max_attempts: int = 3, retry_base_sec: float = 300.0):
+        self.db_path = Path(db_path)
+        self.stages = list(stages)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_sec = retry_base_sec
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+        self.recover()
+
+    @contextmanager
+    def _tx(self):
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def _insert(self, conn, target: str, stage: str, now: float) -> bool:
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO jobs (target, stage, state, next_run, created, updated) "
+            "VALUES (?, ?, 'queued', ?, ?, ?)", (target, stage, now, now, now))
+        return cur.rowcount == 1
+
+    def enqueue(self, target: str, stage: Optional[str] = None) -> bool:
+        with self._tx() as conn:
+            return self._insert(conn, target, stage or self.stages[0], time.time())
+
+    def claim(self, stage: str) -> Optional[dict]:
+        now = time.time()
+        with self._tx() as conn:
+            row = conn.execute(
+                "SELECT id, target, attempts FROM jobs "
+                "WHERE stage = ? AND state = 'queued' AND next_run <= ? "
+                "AND target NOT IN (SELECT target FROM jobs WHERE state = 'running') "
+                "ORDER BY next_run, id LIMIT 1", (stage, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE jobs SET state = 'running', owner = ?, attempts = attempts + 1, updated = ? "
+                         "WHERE id = ?", (os.getpid(), now, row[0]))
+        return {"id": row[0], "target": row[1], "stage": stage, "attempts": row[2] + 1}
+
+    def complete(self, job: dict) -> None:
+        now = time.time()
+        with self._tx() as conn:
+            conn.execute("UPDATE jobs SET state = 'done', error = NULL, updated = ? WHERE id = ?", (now, job["id"]))
+            idx = self.stages.index(job["stage"])
+            if idx + 1 < len(self.stages):
+                self._insert(conn, job["target"], self.stages[idx + 1], now)
+
+    def _fail(self, conn, job_id: int, attempts: int, error: str, now: float) -> str:
+        if attempts >= self.max_attempts:
+            state, next_run = "failed", now
+        else:
+            state, next_run = "queued", now + self.retry_base_sec * (2 ** (attempts - 1))
+        try:
+            conn.execute("UPDATE jobs SET state = ?, next_run = ?, error = ?, owner = NULL, updated = ? WHERE id = ?",
+                         (state, next_run, error, now, job_id))
+        except sqlite3.IntegrityError:
+            # 실행 중에 같은 작업이 다시 등록됨 → 그 대기 작업이 대신 실행
+            state = "superseded"
+            conn.execute("UPDATE jobs SET state = ?, error = ?, owner = NULL, updated = ? WHERE id = ?",
+                         (state, error, now, job_id))
+        return state
+
+    def fail(self, job: dict, error: str) -> str:
+        """실패 기록 → 'queued'(재시도 대기) / 'failed' / 'superseded' 반환"""
+        with self._tx() as conn:
+            return self._fail(conn, job["id"], job["attempts"], error, time.time())
+
+    def recover(self) -> int:
+        """owner 프로세스가 없어진 running 작업을 실패 1회로 처리 (재시도 대기 또는 failed)"""
+        now = time.time()
+        count = 0
+        with self._tx() as conn:
+            rows = conn.execute("SELECT id, attempts, owner FROM jobs WHERE state = 'running'").fetchall()
+            for job_id, attempts, owner in rows:
+                if _pid_alive(owner):
+                    continue
+                self._fail(conn, job_id, attempts, f"작업 프로세스(pid={owner}) 종료", now)
+                count += 1
+        if count:
+            log(f"[WARN] 중단된 작업 {count}건을 재시도 대기로 돌렸습니다.")
+        return count
+
+    def retry_failed(self) -> int:
+        with self._tx() as conn:
+            cur = conn.execute("UPDATE OR IGNORE jobs SET state = 'queued', attempts = 0, next_run = ?, updated = ? "
+                               "WHERE state = 'failed'", (time.time(), time.time()))
+            return cur.rowcount
+
+    def due_count(self) -> int:
+        """지금 실행 가능한(next_run 도래) 대기 작업 수"""
+        with self._tx() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE state = 'queued' AND next_run <= ?",
+                                (time.time(),)).fetchone()[0]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        with self._tx() as conn:
+            rows = conn.execute("SELECT stage, state, COUNT(*) FROM jobs GROUP BY stage, state").fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for stage, state, n in rows:
+            result.setdefault(stage, {})[state] = n
+        return result
+
+    def recent_failures(self, limit: int = 20) -> List[tuple]:
+        with self._tx() as conn:
+            return conn.execute("SELECT target, stage, attempts, error, updated FROM jobs WHERE state = 'failed' "
+                                "ORDER BY updated DESC LIMIT ?", (limit,)).fetchall()
+
+
+class StageWorkers:
+    """
+    단계별 작업 스레드 (handlers[stage](target) 실행, 예외 = 실패)
+    - start(stop, drain=False) : drain=True 면 실행 가능한 작업이 없고 모두 쉬고 있을 때 종료 (cron 실행용)
+    - join()
+    """
+
+    def __init__(self, queue: WorkQueue, handlers: Dict[str, Callable[[str], None]],
+                 concurrency: Dict[str, int], poll_sec: float = 2.0):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_sec = poll_sec
+        self.busy = 0
+        self.lock = threading.Lock()
+        self.threads: List[threading.Thread] = []
+
+    def _idle(self) -> bool:
+        with self.lock:
+            if self.busy:
+                return False
+        return self.queue.due_count() == 0
+
+    def _run(self, stage: str, stop: threading.Event, drain: bool) -> None:
+        handler = self.handlers[stage]
+        while not stop.is_set():
+            # claim 전에 busy 를 올려 둠: claim 이 작업을 running 으로 바꾼 뒤 busy 에 반영되기 전
+            # 사이에 다른 drain 스레드가 "대기 작업 없음 + 모두 쉼" 으로 보고 종료하는 경쟁 방지
+            with self.lock:
+                self.busy += 1
+            try:
+                job = self.queue.claim(stage)
+            except BaseException:
+                with self.lock:
+                    self.busy -= 1
+                raise
+            if job is None:
+                with self.lock:
+                    self.busy -= 1
+                if drain and self._idle():
+                    return
+                stop.wait(self.poll_sec)
+                continue
+            try:
+                log(f"▶️ [{stage}] 시작 ({job['attempts']}회차): {job['target']}")
+                try:
+                    handler(job["target"])
+                except Exception as e:
+                    state = self.queue.fail(job, f"{type(e).__name__}: {e}")
+                    log(f"❌ [{stage}] 실패 → {state}: {job['target']} | {e}")
+                else:
+                    self.queue.complete(job)
+                    log(f"✅ [{stage}] 완료: {job['target']}")
+            finally:
+                with self.lock:
+                    self.busy -= 1
+
+    def start(self, stop: threading.Event, drain: bool = False) -> None:
+        for stage in self.queue.stages:
+            for i in range(max(1, self.concurrency.get(stage, 1))):
+                t = threading.Thread(target=self._run, args=(stage, stop, drain), name=f"{stage}-{i}", daemon=True)
+                t.start()
+                self.threads.append(t)
+
+    def join(self) -> None:
+        for t in self.threads:
+            t.join()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="작업 큐 현황 / 실패 작업 재등록")
+    parser.add_argument("--db", type=Path, default=Path("work_queue.db"), help="작업 큐 DB 경로")
+    parser.add_argument("--retry_failed", action="store_true", help="failed 작업을 다시 대기열로")
+    args = parser.parse_args()
+
+    if not args.db.exists():
+        print(f"[INFO] 작업 큐 DB 가 없습니다: {args.db}")
+        return
+    # 현황 조회만 하므로 단계 순서는 DB 에 있는 그대로 사용
+    conn = sqlite3.connect(str(args.db), timeout=30)
+    try:
+        stages = [r[0] for r in conn.execute("SELECT stage FROM jobs GROUP BY stage ORDER BY MIN(id)")]
+    finally:
+        conn.close()
+    queue = WorkQueue(args.db, stages or ["-"])
+    if args.retry_failed:
+        print(f"🔁 재등록: {queue.retry_failed()}건")
+    for stage, states in queue.counts().items():
+        print(f"[{stage}] " + ", ".join(f"{k}={v}" for k, v in sorted(states.items())))
+    for target, stage, attempts, error, updated in queue.recent_failures():
+        ts = datetime.fromtimestamp(updated).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"  ❌ {ts} [{stage}] {target} ({attempts}회) | {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+비디오 프레임 접근 엔진 (순차 grab/retrieve ↔ 키프레임 seek 자동 선택)
+
+배경
+- cap.set(CAP_PROP_POS_FRAMES, idx) 는 H.264 등에서 직전 키프레임부터 다시 디코딩 → 촘촘한 샘플링에서 매우 느림
+- 반대로 간격이 GOP 보다 훨씬 크면 사이 프레임을 모두 디코딩하는 순차 방식이 손해
+
+동작
+- 목표 프레임까지의 간격이 seek_threshold 이하이면 grab() 으로 건너뛰고(색변환/복사 없음),
+  목표 프레임에서만 retrieve() → 필요한 프레임만 BGR 로 변환
+- 간격이 크면 seek (키프레임부터 디코딩 비용 ≈ GOP/2 이므로 기준값은 GOP 크기)
+- GOP 크기는 ffprobe 로 앞부분 키프레임 간격을 측정, 실패 시 .env VIDEO_GOP_FRAMES (기본 250)
+
+사용 예)
+    for idx, frame in iter_frames(video_path, range(0, total, 30)):
+        cv2.imwrite(..., frame)
+
+- 프레임을 전부 훑어야 하는 탐지 패스는 FrameSampler 로 샘플 여부를 먼저 판정하고
+  grab() 만 한 프레임 중 샘플 대상만 retrieve() (프레임 간격 또는 초 간격)
+
+벤치마크: python benchmark_extract.py access --video_dir <dir>
+"""
+
+import json
+import os
+import subprocess
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import cv2
+from dotenv import load_dotenv
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+DEFAULT_GOP_FRAMES = int(os.getenv("VIDEO_GOP_FRAMES", "250"))
+# 0 이하이면 GOP 크기를 기준으로 자동 결정
+SEEK_THRESHOLD_FRAMES = int(os.getenv("FRAME_SEEK_THRESHOLD", "0"))
+
+
+def estimate_gop(video_path: str, probe_sec: float = 30.0, fps: float = 0.0) -> int:
+    """앞부분 probe_sec 초의 키프레임 간격 중앙값(프레임 수). ffprobe 가 없으면 기본값 (fps 를 알면 넘겨서 재오픈 생략)"""
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0", "-skip_frame", "nokey",
+        "-read_intervals", f"%+{probe_sec}", "-show_entries", "frame=pts_time",
+        "-of", "json", str(video_path),
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=30, check=True).stdout
+        times = [float(f["pts_time"]) for f in json.loads(out).get("frames", []) if "pts_time" in f]
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return DEFAULT_GOP_FRAMES
+    if len(times) < 2:
+        return DEFAULT_GOP_FRAMES
+
+    if fps <= 0:
+        cap = cv2.VideoCapture(str(video_path))
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        cap.release()
+    if fps <= 0:
+        return DEFAULT_GOP_FRAMES
+    gaps = sorted(b - a for a, b in zip(times, times[1:]) if b > a)
+    if not gaps:
+        return DEFAULT_GOP_FRAMES
+    return max(1, int(round(gaps[len(gaps) // 2] * fps)))
+
+
+def keyframe_indices(video_path: str, fps: float, timeout: float = 300) -> List[int]:
+    """
+    전체 키프레임 위치(프레임 번호). 디코딩 없이 패킷 플래그(K)만 읽으므로 긴 영상도 빠름
+    ffprobe 가 없거나 실패하면 빈 리스트
+    """
+    if fps <= 0:
+        return []
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,flags", "-of", "csv=p=0", str(video_path),
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return []
+    frames = set()
+    for line in out.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 2 or "K" not in parts[1]:
+            continue
+        try:
+            frames.add(int(round(float(parts[0]) * fps)))
+        except ValueError:
+            continue
+    return sorted(frames)
+
+
+def split_at_keyframes(indices: List[int], segment_frames: int, keyframes: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    정렬된 프레임 번호들을 약 segment_frames 길이의 구간으로 분할
+    - 경계는 segment_frames 격자점 이하의 가장 가까운 키프레임으로 당김 → 각 구간의 첫 seek 가 키프레임에서 바로 시작
+    - keyframes 가 없으면 격자점 그대로 사용
+    """
+    if not indices:
+        return []
+    if segment_frames <= 0 or indices[-1] - indices[0] < segment_frames:
+        return [list(indices)]
+    bounds = []
+    for b in range(indices[0] + segment_frames, indices[-1] + 1, segment_frames):
+        if keyframes:
+            k = bisect_right(keyframes, b) - 1
+            b = keyframes[k] if k >= 0 else b
+        if b > (bounds[-1] if bounds else indices[0]):
+            bounds.append(b)
+    segments, lo = [], 0
+    for b in bounds:
+        hi = bisect_left(indices, b, lo)
+        if hi > lo:
+            segments.append(indices[lo:hi])
+        lo = hi
+    if lo < len(indices):
+        segments.append(indices[lo:])
+    return segments
+
+
+class FrameCursor:
+    """
+    VideoCapture 위의 전진 전용 커서
+    - read_at(idx): idx 프레임 반환 (간격에 따라 grab 또는 seek 선택), 실패 시 None
+      (실패 후에는 위치를 알 수 없으므로 다음 read_at 은 seek 로 다시 위치를 잡음)
+    - 통계: grabbed(건너뛴 프레임), retrieved(변환한 프레임), seeks, failed
+    """
+
+    def __init__(self, cap: "cv2.VideoCapture", seek_threshold: Optional[int] = None, start: int = 0):
+        self.cap = cap
+        self.seek_threshold = seek_threshold if seek_threshold is not None else DEFAULT_GOP_FRAMES
+        self.pos = 0            # 다음 grab() 이 가져올 프레임 번호
+        self.grabbed = 0
+        self.retrieved = 0
+        self.seeks = 0
+        self.failed = 0
+        self.lost = False       # 읽기 실패 후 위치 불명 → 다음 이동은 seek
+        if start > 0:
+            self._seek(start)
+
+    def _seek(self, idx: int):
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+        self.pos = idx
+        self.seeks += 1
+        self.lost = False
+
+    def skip_to(self, idx: int) -> bool:
+        """idx 직전까지 이동 (디코딩만, 변환 없음). 끝에 도달하면 False"""
+        gap = idx - self.pos
+        if self.lost or gap < 0 or gap > self.seek_threshold:
+            self._seek(idx)
+            return True
+        for _ in range(gap):
+            if not self.cap.grab():
+                return False
+            self.pos += 1
+            self.grabbed += 1
+        return True
+
+    def read_at(self, idx: int):
+        frame = None
+        if self.skip_to(idx) and self.cap.grab():
+            self.pos += 1
+            ok, frame = self.cap.retrieve()
+            if not ok:
+                frame = None
+        if frame is None:
+            self.failed += 1
+            self.lost = True
+            return None
+        self.retrieved += 1
+        return frame
+
+    def stats(self) -> dict:
+        return {"grabbed": self.grabbed, "retrieved": self.retrieved, "seeks": self.seeks, "failed": self.failed}
+
+
+def is_second_start(frame_idx: int, fps: float) -> bool:
+    """
+    frame_idx 가 자기 초(int(frame_idx / fps))의 첫 프레임인지
+    - frame_idx == int(sec * fps) 비교는 sec * fps 가 정수일 때만 맞아서 29.97/23.976/59.94fps 는 대부분의 초를 놓침
+    - 직전 프레임과 초가 달라지는 지점을 보면 fps 와 관계없이 초마다 정확히 1프레임
+    """
+    if fps <= 0:
+        return False
+    return frame_idx == 0 or int(frame_idx / fps) != int((frame_idx - 1) / fps)
+
+
+class FrameSampler:
+    """
+    순차 grab() 루프용 샘플링 판정
+    - every_sec > 0 : 타임스탬프(CAP_PROP_POS_MSEC) 기준 every_sec 초마다 1프레임 → 가변 fps 영상도 시간 기준 균일
+    - 그 외         : frame_idx % every_frames == 0 (기존 PERSON_SAMPLING_RATE 방식)
+    hit() 은 grab() 직후 호출해야 함 (POS_MSEC 가 방금 grab 한 프레임의 시각을 가리킴)
+    """
+
+    def __init__(self, every_frames: int = 1, every_sec: float = 0.0, fps: float = 0.0):
+        self.every_frames = max(1, int(every_frames or 1))
+        self.every_sec = float(every_sec or 0.0)
+        self.fps = fps
+        self.next_t = None
+        self.sampled = 0
+        self.skipped = 0
+
+    def _timestamp(self, cap, frame_idx: int) -> float:
+        t = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        # 일부 백엔드/컨테이너는 타임스탬프를 주지 않음 → 명목 fps 로 대체
+        if t <= 0 and frame_idx > 0 and self.fps > 0:
+            t = frame_idx / self.fps
+        return t
+
+    def hit(self, cap: "cv2.VideoCapture", frame_idx: int) -> bool:
+        if self.every_sec > 0:
+            t = self._timestamp(cap, frame_idx)
+            ok = self.next_t is None or t >= self.next_t
+            if ok:
+                base = t if self.next_t is None else self.next_t
+                # 긴 공백(프레임 드롭) 뒤에도 몰아서 샘플하지 않도록 현재 시각 이후로 당김
+                self.next_t = base + self.every_sec
+                while self.next_t <= t:
+                    self.next_t += self.every_sec
+        else:
+            ok = frame_idx % self.every_frames == 0
+        if ok:
+            self.sampled += 1
+        else:
+            self.skipped += 1
+        return ok
+
+    def stats(self) -> dict:
+        return {"sampled": self.sampled, "skipped": self.skipped}
+
+
+def iter_frames(video_path: str, indices: Iterable[int], seek_threshold: Optional[int] = None,
+                cursor_stats: Optional[dict] = None) -> Iterator[Tuple[int, "cv2.Mat"]]:
+    """
+    정렬된 프레임 번호들을 (idx, frame) 으로 반환. 읽기 실패한 프레임은 건너뛰고 계속
+    (프레임별 seek 방식과 동일, 깨진 구간 뒤의 프레임도 추출)
+    - seek_threshold: None → .env FRAME_SEEK_THRESHOLD, 그것도 0 이면 estimate_gop()
+    - cursor_stats  : dict 를 넘기면 종료 시 grab/retrieve/seek 통계를 채워 줌
+    """
+    if seek_threshold is None:
+        seek_threshold = SEEK_THRESHOLD_FRAMES if SEEK_THRESHOLD_FRAMES > 0 else estimate_gop(video_path)
+
+    cap = cv2.VideoCapture(str(video_path))
+    cursor = FrameCursor(cap, seek_threshold)
+    try:
+        for idx in indices:
+            frame = cursor.read_at(idx)
+            if frame is None:
+                continue
+            yield idx, frame
+    finally:
+        cap.release()
+        if cursor_stats is not None:
+            cursor_stats.update(cursor.stats())
@@ -0,0 +1,192 @@
+"""
+영상 메타데이터 프로브 캐시 (fps / 프레임 수 / 길이 / 코덱 / 해상도 / 키프레임 간격)
+
+배경
+- 추출기마다 FPS, 프레임 수를 읽으려고 영상마다 cv2.VideoCapture 를 열고(_probe, get_video_info, 스케줄러 루프)
+  재실행/워커마다 같은 일을 반복, 키프레임 간격은 ffprobe 로 매번 다시 측정
+동작
+- (절대경로, 파일 크기, mtime) 를 키로 JSON 파일에 저장 → 파일이 바뀌지 않았으면 재실행 시 바로 사용
+- 시작 시 probe_videos(paths) 로 캐시에 없는 영상만 스레드 풀에서 병렬 프로브
+  (cv2 메타 읽기/ffprobe 는 GIL 밖에서 실행) 후 캐시 저장 → 스케줄링 단계에서 디코딩 없음
+- 워커 프로세스는 get_probe(path) 로 같은 캐시 파일을 1회 읽어 재사용
+
+사용 예)
+    probes = probe_videos(video_paths)          # {path: info}
+    info = probes[video_path]                   # {"fps", "frames", "duration", "codec", "width", "height", "gop"}
+    for idx, frame in iter_frames(video_path, indices, seek_threshold=seek_threshold(info)):
+        ...
+
+.env
+    VIDEO_PROBE_CACHE=./video_probe_cache.json  # 캐시 파일 (미지정 시 ASSIGN_LOG_DIR 아래)
+    VIDEO_PROBE_WORKERS=8                       # 프로브 스레드 수
+    VIDEO_PROBE_GOP=1                           # 0 이면 ffprobe 키프레임 간격 측정 생략 (VIDEO_GOP_FRAMES 사용)
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import cv2
+from dotenv import load_dotenv
+
+from video_frames import DEFAULT_GOP_FRAMES, SEEK_THRESHOLD_FRAMES, estimate_gop
+
+env_path = Path(__file__).resolve().parent.parent / ".env"
+load_dotenv(dotenv_path=env_path)
+
+VIDEO_PROBE_WORKERS = max(1, int(os.getenv("VIDEO_PROBE_WORKERS", "8")))
+VIDEO_PROBE_GOP = os.getenv("VIDEO_PROBE_GOP", "1") in ("1", "true", "True")
+
+# 캐시 형식이 바뀌면 올려서 이전 항목을 무효화
+_VERSION = 1
+
+
+def default_cache_path() -> str:
+    """호출 시점의 환경변수 기준 (ASSIGN_LOG_DIR 를 CLI 등에서 바꿔도 반영)"""
+    return os.getenv("VIDEO_PROBE_CACHE") or os.path.join(os.getenv("ASSIGN_LOG_DIR", "."), "video_probe_cache.json")
+
+
+def _fourcc(value: float) -> str:
+    code = int(value)
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ")
+
+
+def probe_video(video_path: str, with_gop: bool = VIDEO_PROBE_GOP) -> dict:
+    """영상 1개 프로브 (열 수 없으면 frames=0)"""
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        if not cap.isOpened():
+            return {"fps": 0.0, "frames": 0, "duration": 0.0, "codec": "", "width": 0, "height": 0,
+                    "gop": DEFAULT_GOP_FRAMES}
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frames = max(0, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))
+        info = {
+            "fps": fps,
+            "frames": frames,
+            "duration": round(frames / fps, 3) if fps > 0 else 0.0,
+            "codec": _fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        cap.release()
+    info["gop"] = estimate_gop(str(video_path), fps=fps) if with_gop and fps > 0 else DEFAULT_GOP_FRAMES
+    return info
+
+
+def _file_key(video_path: str):
+    st = os.stat(video_path)
+    return os.path.abspath(video_path), st.st_size, st.st_mtime_ns
+
+
+class ProbeCache:
+    """
+    JSON 프로브 캐시
+    - get(path)  : 크기/mtime 이 같을 때만 캐시 값, 아니면 None
+    - put(path, info), save() : 임시파일 → os.replace 로 원자적 저장
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_cache_path()
+        self.lock = threading.Lock()
+        self.entries: Dict[str, dict] = {}
+        self.dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == _VERSION:
+                self.entries = data.get("videos", {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, video_path: str) -> Optional[dict]:
+        try:
+            key, size, mtime = _file_key(video_path)
+        except OSError:
+            return None
+        entry = self.entries.get(key)
+        if entry is None or entry.get("size") != size or entry.get("mtime_ns") != mtime:
+            return None
+        return entry["info"]
+
+    def put(self, video_path: str, info: dict):
+        key, size, mtime = _file_key(video_path)
+        with self.lock:
+            self.entries[key] = {"size": size, "mtime_ns": mtime, "info": info}
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with self.lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": _VERSION, "videos": self.entries}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.dirty = False
+
+
+def probe_videos(paths: Iterable[str], cache_path: Optional[str] = None, workers: int = VIDEO_PROBE_WORKERS,
+                 with_gop: bool = VIDEO_PROBE_GOP, verbose: bool = True) -> Dict[str, dict]:
+    """캐시에 없는(또는 바뀐) 영상만 스레드 풀에서 프로브 → {path: info}, 캐시 파일 갱신"""
+    t0 = time.perf_counter()
+    cache = ProbeCache(cache_path)
+    result, missing = {}, []
+    for p in dict.fromkeys(str(p) for p in paths):
+        info = cache.get(p)
+        if info is None:
+            missing.append(p)
+        else:
+            result[p] = info
+
+    def _probe(p):
+        info = probe_video(p, with_gop)
+        try:
+            cache.put(p, info)
+        except OSError:     # 프로브 중 파일이 사라짐
+            pass
+        return p, info
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(workers, len(missing))) as ex:
+            for p, info in ex.map(_probe, missing):
+                result[p] = info
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"⚠️ 프로브 캐시 저장 실패: {cache.path} | {e}")
+
+    if verbose:
+        print(f"🔎 영상 프로브: {len(result)}개 (캐시 {len(result) - len(missing)} / 신규 {len(missing)}) "
+              f"| {time.perf_counter() - t0:.2f}초")
+    return result
+
+
+# 워커 프로세스용 (프로세스당 캐시 파일 1회 로드)
+_PROCESS_CACHE: Optional[ProbeCache] = None
+
+
+def get_probe(video_path: str) -> dict:
+    """캐시에 있으면 그대로, 없으면 즉석 프로브 (워커에서는 캐시 파일에 쓰지 않음)"""
+    global _PROCESS_CACHE
+    if _PROCESS_CACHE is None:
+        _PROCESS_CACHE = ProbeCache()
+    info = _PROCESS_CACHE.get(str(video_path))
+    if info is None:
+        info = probe_video(str(video_path))
+        try:
+            _PROCESS_CACHE.put(str(video_path), info)
+        except OSError:
+            pass
+    return info
+
+
+def seek_threshold(info: dict) -> int:
+    """iter_frames 의 seek 기준: .env FRAME_SEEK_THRESHOLD 가 있으면 그 값, 없으면 프로브한 GOP"""
+    return SEEK_THRESHOLD_FRAMES if SEEK_THRESHOLD_FRAMES > 0 else int(info.get("gop") or DEFAULT_GOP_FRAMES)